@@ -10,7 +10,9 @@
 
 WITH source AS (
     SELECT *
-    FROM read_parquet('s3://bronze/heavy_industry/facilities/*/facilities.parquet')
+    FROM read_parquet('s3://bronze/heavy_industry/facilities/*/facilities.parquet', filename = true)
+    -- Snapshot folders are dated, so the greatest path is the latest snapshot
+    QUALIFY filename = MAX(filename) OVER ()
 ),
 
 renamed AS (
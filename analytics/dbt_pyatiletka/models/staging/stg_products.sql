@@ -0,0 +1,31 @@
+{{
+    config(
+        materialized='view',
+        tags=['staging', 'heavy_industry']
+    )
+}}
+
+WITH source AS (
+    SELECT *
+    FROM read_parquet('s3://bronze/heavy_industry/products/*/products.parquet', filename = true)
+    -- Snapshot folders are dated, so the greatest path is the latest snapshot
+    QUALIFY filename = MAX(filename) OVER ()
+),
+
+renamed AS (
+    SELECT
+        product_id,
+        product_code,
+        product_name,
+        product_category,
+        unit_of_measure,
+        description,
+
+        -- Metadata
+        CURRENT_TIMESTAMP AS dbt_loaded_at,
+        'bronze' AS source_layer
+
+    FROM source
+)
+
+SELECT * FROM renamed
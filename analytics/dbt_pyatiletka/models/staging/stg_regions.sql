@@ -7,7 +7,9 @@
 
 WITH source AS (
     SELECT *
-    FROM read_parquet('s3://bronze/heavy_industry/regions/*/regions.parquet')
+    FROM read_parquet('s3://bronze/heavy_industry/regions/*/regions.parquet', filename = true)
+    -- Snapshot folders are dated, so the greatest path is the latest snapshot
+    QUALIFY filename = MAX(filename) OVER ()
 ),
 
 renamed AS (
@@ -0,0 +1,86 @@
+"""
+Concurrent load generator for the Heavy Industry API
+Pyatiletka Project
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import requests
+
+from stats import summarize
+
+# Endpoint mix exercised by every run; paths are relative to the API base URL
+DEFAULT_ENDPOINTS = [
+    "/facilities",
+    "/facilities/1",
+    "/products",
+    "/regions",
+    "/stats",
+    "/analytics/facilities/performance?plan_year=1986",
+    "/regions/rollup?level=REPUBLIC&plan_year=1986",
+]
+
+_thread_state = threading.local()
+
+
+def _session() -> requests.Session:
+    # One keep-alive session per worker thread
+    if not hasattr(_thread_state, "session"):
+        _thread_state.session = requests.Session()
+    return _thread_state.session
+
+
+def _timed_get(url: str, timeout: float):
+    start = time.perf_counter()
+    try:
+        response = _session().get(url, timeout=timeout)
+        ok = response.status_code < 400
+        size = len(response.content)
+    except requests.RequestException:
+        ok, size = False, 0
+    return time.perf_counter() - start, ok, size
+
+
+def run_endpoint(base_url: str, path: str, concurrency: int, requests_per_endpoint: int,
+                 warmup: int = 5, timeout: float = 30.0) -> Dict:
+    """Hit one endpoint requests_per_endpoint times from concurrency threads"""
+    url = base_url.rstrip("/") + path
+
+    for _ in range(warmup):
+        _timed_get(url, timeout)
+
+    latencies: List[float] = []
+    errors = 0
+    total_bytes = 0
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for elapsed, ok, size in pool.map(lambda _: _timed_get(url, timeout), range(requests_per_endpoint)):
+            if ok:
+                latencies.append(elapsed)
+                total_bytes += size
+            else:
+                errors += 1
+    wall_seconds = time.perf_counter() - wall_start
+
+    result = summarize(latencies)
+    result.update({
+        "requests": requests_per_endpoint,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall_seconds, 2) if wall_seconds else 0.0,
+        "avg_response_bytes": total_bytes // len(latencies) if latencies else 0,
+    })
+    return result
+
+
+def run_api_load(base_url: str, concurrency: int = 8, requests_per_endpoint: int = 200,
+                 endpoints: List[str] = None) -> Dict[str, Dict]:
+    """Load-test each endpoint in turn and return per-endpoint statistics"""
+    results = {}
+    for path in endpoints or DEFAULT_ENDPOINTS:
+        print(f"  {path} x{requests_per_endpoint} @ concurrency {concurrency}")
+        results[path] = run_endpoint(base_url, path, concurrency, requests_per_endpoint)
+    return results
@@ -0,0 +1,78 @@
+"""
+Stage timings for the bronze ETL path
+Pyatiletka Project
+
+Repeats the same steps as heavy_industry_to_bronze (API extract → DataFrame/Arrow
+serialization → Parquet write → MinIO upload) and times each one separately.
+Objects are written under a _benchmarks/ prefix so real bronze data is untouched.
+"""
+
+import time
+from io import BytesIO
+from typing import Dict
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
+from minio import Minio
+
+from stats import summarize
+
+ETL_TABLES = ["facilities", "products", "regions"]
+
+STAGES = ["extract", "serialize", "parquet_write", "upload"]
+
+
+def run_etl_stages(api_url: str, minio_endpoint: str, access_key: str, secret_key: str,
+                   bucket: str = "bronze", iterations: int = 10) -> Dict[str, Dict]:
+    """Time every ETL stage per table over several iterations"""
+    minio_client = Minio(minio_endpoint, access_key=access_key, secret_key=secret_key, secure=False)
+    session = requests.Session()
+
+    results = {}
+    for table in ETL_TABLES:
+        timings = {stage: [] for stage in STAGES}
+        rows = parquet_bytes = 0
+
+        for iteration in range(iterations):
+            start = time.perf_counter()
+            response = session.get(f"{api_url.rstrip('/')}/{table}")
+            response.raise_for_status()
+            data = response.json()
+            timings["extract"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            arrow_table = pa.Table.from_pandas(pd.DataFrame(data))
+            timings["serialize"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            buffer = BytesIO()
+            pq.write_table(arrow_table, buffer)
+            buffer.seek(0)
+            timings["parquet_write"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            minio_client.put_object(
+                bucket_name=bucket,
+                object_name=f"_benchmarks/{table}/iteration={iteration}/{table}.parquet",
+                data=buffer,
+                length=buffer.getbuffer().nbytes,
+                content_type='application/octet-stream'
+            )
+            timings["upload"].append(time.perf_counter() - start)
+
+            rows = len(data)
+            parquet_bytes = buffer.getbuffer().nbytes
+
+        table_result = {"rows": rows, "parquet_bytes": parquet_bytes}
+        for stage, seconds in timings.items():
+            stage_result = summarize(seconds)
+            total = sum(seconds)
+            stage_result["rows_per_second"] = round(rows * len(seconds) / total, 1) if total else 0.0
+            table_result[stage] = stage_result
+
+        print(f"  {table}: {rows} rows, {parquet_bytes} parquet bytes")
+        results[table] = table_result
+
+    return results
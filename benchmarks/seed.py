@@ -0,0 +1,84 @@
+"""
+Deterministic benchmark dataset
+Pyatiletka Project
+
+Seeds production targets and shift records with the same ProductionDataGenerator
+used for the real load, but from a fixed random seed, so every benchmark run
+measures against identical data.
+"""
+
+import importlib.util
+import random
+from datetime import datetime
+from pathlib import Path
+
+import psycopg2
+
+GENERATOR_PATH = Path(__file__).resolve().parent.parent / "scripts" / "data-generators" / "data-generator.py"
+
+# Dataset sizes: (first day, last day) of generated production
+DATASET_SIZES = {
+    "small": (datetime(1986, 1, 1), datetime(1986, 3, 31)),    # one quarter
+    "medium": (datetime(1986, 1, 1), datetime(1986, 12, 31)),  # one plan year
+    "large": (datetime(1986, 1, 1), datetime(1990, 12, 31)),   # full five-year plan
+}
+
+
+def load_generator_module():
+    """Import data-generator.py, whose file name is not a valid module name"""
+    spec = importlib.util.spec_from_file_location("data_generator", GENERATOR_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def seed_dataset(database_url: str, size: str = "small", seed: int = 1986, reset: bool = True) -> dict:
+    """
+    Load a deterministic dataset of the given size
+
+    With reset, existing production records and targets are removed first so
+    that repeated runs produce exactly the same tables.
+    """
+    start_date, end_date = DATASET_SIZES[size]
+    module = load_generator_module()
+
+    conn = psycopg2.connect(database_url)
+    try:
+        if reset:
+            with conn.cursor() as cursor:
+                cursor.execute("TRUNCATE actual_production, production_targets RESTART IDENTITY;")
+            conn.commit()
+
+        # The generator draws from the global random module
+        random.seed(seed)
+        generator = module.ProductionDataGenerator(conn)
+        facility_products = generator.get_facilities_and_products()
+
+        targets = []
+        for fp in facility_products:
+            for year in range(start_date.year, end_date.year + 1):
+                targets.extend(generator.generate_targets(fp, year))
+        generator.insert_targets_batch(targets)
+
+        production_rows = 0
+        for fp in facility_products:
+            profile = random.choice(module.PROFILES)
+            records = generator.generate_production_records(fp, start_date, end_date, profile)
+            generator.insert_production_batch(records)
+            production_rows += len(records)
+
+        with conn.cursor() as cursor:
+            cursor.execute("ANALYZE actual_production; ANALYZE production_targets;")
+        conn.commit()
+    finally:
+        conn.close()
+
+    return {
+        "size": size,
+        "seed": seed,
+        "start_date": start_date.date().isoformat(),
+        "end_date": end_date.date().isoformat(),
+        "facility_products": len(facility_products),
+        "production_rows": production_rows,
+        "target_rows": len(targets),
+    }
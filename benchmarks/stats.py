@@ -0,0 +1,86 @@
+"""
+Latency statistics and baseline comparison
+Pyatiletka Project
+"""
+
+import math
+import resource
+import sys
+from typing import Dict, List
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(seconds: List[float]) -> Dict:
+    """p50/p95/p99 and mean of a list of durations, in milliseconds"""
+    values = sorted(seconds)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+    }
+
+
+def peak_rss_bytes(pid: int = None) -> int:
+    """Peak resident set size of this process, or of another local process by pid"""
+    if pid is not None:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+# Metrics where a larger value is an improvement; everything else is a latency or a cost
+HIGHER_IS_BETTER = {"throughput_rps", "rows_per_second"}
+COMPARED_METRICS = {"p50_ms", "p95_ms", "p99_ms", "throughput_rps", "rows_per_second", "peak_rss_bytes"}
+
+
+def _flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path + "."))
+        elif key in COMPARED_METRICS and isinstance(value, (int, float)):
+            flat[path] = value
+    return flat
+
+
+def compare_to_baseline(current: Dict, baseline: Dict, tolerance: float = 0.10) -> List[Dict]:
+    """
+    List every metric that got worse than the baseline by more than tolerance
+
+    Only sections present in both runs are compared.
+    """
+    current_flat = _flatten({k: current[k] for k in ("api", "etl", "process") if k in current})
+    baseline_flat = _flatten({k: baseline[k] for k in ("api", "etl", "process") if k in baseline})
+
+    regressions = []
+    for metric, base_value in baseline_flat.items():
+        value = current_flat.get(metric)
+        if value is None or not base_value:
+            continue
+
+        change = (value - base_value) / base_value
+        higher_is_better = metric.rsplit(".", 1)[-1] in HIGHER_IS_BETTER
+        if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+            regressions.append({
+                "metric": metric,
+                "baseline": base_value,
+                "current": value,
+                "change_pct": round(change * 100, 1),
+            })
+    return regressions
@@ -0,0 +1,362 @@
+"""
+Facility performance analytics
+Pyatiletka Project
+
+Rankings, rolling output, defect rates, downtime and plan completion are
+computed in Postgres in a single pass with window functions, then cached per
+(facility, period) so dashboards never pull raw shift rows.
+"""
+
+from calendar import monthrange
+from datetime import date, timedelta
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+
+from cache import TTLCache
+from database import get_routed_db
+from schemas import DailyProductionSummary, FacilityPerformance, PlanVsActualResponse
+
+ANALYTICS_CACHE_TTL_SECONDS = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "300"))
+
+# Longest rolling window; its lead-in days are read before the period start
+ROLLING_WINDOW_DAYS = 30
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+analytics_cache = TTLCache(ttl_seconds=ANALYTICS_CACHE_TTL_SECONDS)
+
+
+# Quality score per shift: grade A = 100, B = 60, C = 20
+FACILITY_PERFORMANCE_SQL = text("""
+    WITH daily AS (
+        SELECT
+            ap.facility_id,
+            ap.production_date,
+            SUM(ap.quantity_produced) AS quantity,
+            SUM(ap.defect_count) AS defects,
+            SUM(ap.equipment_downtime_hours) AS downtime,
+            SUM(CASE ap.quality_grade WHEN 'A' THEN 100 WHEN 'B' THEN 60 ELSE 20 END) AS quality_points,
+            COUNT(*) AS shifts
+        FROM actual_production ap
+        WHERE ap.production_date BETWEEN :window_start AND :period_end
+        GROUP BY ap.facility_id, ap.production_date
+    ),
+    windowed AS (
+        SELECT
+            daily.*,
+            SUM(quantity) OVER w7 AS rolling_7d,
+            SUM(quantity) OVER w30 AS rolling_30d,
+            ROW_NUMBER() OVER (PARTITION BY facility_id ORDER BY production_date DESC) AS recency
+        FROM daily
+        WINDOW
+            w7 AS (PARTITION BY facility_id ORDER BY production_date
+                   RANGE BETWEEN INTERVAL '6 days' PRECEDING AND CURRENT ROW),
+            w30 AS (PARTITION BY facility_id ORDER BY production_date
+                    RANGE BETWEEN INTERVAL '29 days' PRECEDING AND CURRENT ROW)
+    ),
+    totals AS (
+        SELECT
+            facility_id,
+            SUM(quantity) FILTER (WHERE production_date >= :period_start) AS total_production,
+            SUM(defects) FILTER (WHERE production_date >= :period_start) AS total_defects,
+            SUM(downtime) FILTER (WHERE production_date >= :period_start) AS total_downtime,
+            SUM(quality_points) FILTER (WHERE production_date >= :period_start)
+                / NULLIF(SUM(shifts) FILTER (WHERE production_date >= :period_start), 0) AS quality_score,
+            MAX(rolling_7d) FILTER (WHERE recency = 1) AS rolling_7d,
+            MAX(rolling_30d) FILTER (WHERE recency = 1) AS rolling_30d
+        FROM windowed
+        GROUP BY facility_id
+    ),
+    monthly_actual AS (
+        SELECT
+            facility_id,
+            DATE_TRUNC('month', production_date)::date AS month_start,
+            SUM(quantity) AS actual
+        FROM daily
+        WHERE production_date >= :period_start
+        GROUP BY facility_id, DATE_TRUNC('month', production_date)
+    ),
+    monthly_plan AS (
+        SELECT
+            facility_id,
+            MAKE_DATE(plan_year, month, 1) AS month_start,
+            SUM(target_quantity) AS planned
+        FROM production_targets
+        WHERE plan_year = :plan_year AND month BETWEEN :first_month AND :last_month
+        GROUP BY facility_id, plan_year, month
+    ),
+    completion AS (
+        SELECT
+            mp.facility_id,
+            AVG(COALESCE(ma.actual, 0) / mp.planned * 100) AS avg_completion_rate
+        FROM monthly_plan mp
+        LEFT JOIN monthly_actual ma
+            ON ma.facility_id = mp.facility_id AND ma.month_start = mp.month_start
+        GROUP BY mp.facility_id
+    )
+    SELECT
+        f.facility_id,
+        f.facility_name,
+        COALESCE(c.avg_completion_rate, 0) AS avg_completion_rate,
+        COALESCE(t.total_production, 0) AS total_production,
+        COALESCE(t.quality_score, 0) AS avg_quality_score,
+        RANK() OVER (
+            ORDER BY COALESCE(c.avg_completion_rate, 0) DESC, COALESCE(t.total_production, 0) DESC
+        ) AS rank,
+        t.rolling_7d AS rolling_7d_output,
+        t.rolling_30d AS rolling_30d_output,
+        t.total_defects / NULLIF(t.total_production, 0) AS defect_rate,
+        t.total_downtime AS total_downtime_hours
+    FROM facilities f
+    LEFT JOIN totals t ON t.facility_id = f.facility_id
+    LEFT JOIN completion c ON c.facility_id = f.facility_id
+    WHERE t.facility_id IS NOT NULL OR c.facility_id IS NOT NULL
+    ORDER BY rank, f.facility_id
+""")
+
+
+FACILITY_DAILY_SQL = text("""
+    WITH daily AS (
+        SELECT
+            ap.product_id,
+            ap.production_date,
+            SUM(ap.quantity_produced) AS total_quantity,
+            AVG(ap.equipment_downtime_hours) AS avg_downtime,
+            COALESCE(SUM(ap.defect_count), 0) AS total_defects,
+            COUNT(*) AS shift_count
+        FROM actual_production ap
+        WHERE ap.facility_id = :facility_id
+          AND ap.production_date BETWEEN :window_start AND :period_end
+        GROUP BY ap.product_id, ap.production_date
+    ),
+    windowed AS (
+        SELECT
+            daily.*,
+            SUM(total_quantity) OVER (
+                PARTITION BY product_id ORDER BY production_date
+                RANGE BETWEEN INTERVAL '6 days' PRECEDING AND CURRENT ROW
+            ) AS rolling_7d_quantity,
+            SUM(total_quantity) OVER (
+                PARTITION BY product_id ORDER BY production_date
+                RANGE BETWEEN INTERVAL '29 days' PRECEDING AND CURRENT ROW
+            ) AS rolling_30d_quantity
+        FROM daily
+    )
+    SELECT
+        w.production_date,
+        f.facility_name,
+        p.product_name,
+        p.product_category,
+        w.total_quantity,
+        w.avg_downtime,
+        w.total_defects,
+        w.shift_count,
+        w.rolling_7d_quantity,
+        w.rolling_30d_quantity
+    FROM windowed w
+    JOIN products p ON p.product_id = w.product_id
+    JOIN facilities f ON f.facility_id = :facility_id
+    WHERE w.production_date >= :period_start
+    ORDER BY w.production_date, p.product_name
+""")
+
+
+# Monthly plan vs actual; the date range keeps the scan on idx_production_date
+# instead of the EXTRACT() join in the plan_vs_actual_monthly view
+PLAN_COMPLETION_SQL = text("""
+    WITH actual AS (
+        SELECT
+            facility_id,
+            product_id,
+            EXTRACT(MONTH FROM production_date)::int AS month,
+            SUM(quantity_produced) AS actual
+        FROM actual_production
+        WHERE production_date BETWEEN :period_start AND :period_end
+        GROUP BY facility_id, product_id, EXTRACT(MONTH FROM production_date)
+    )
+    SELECT
+        pt.plan_year,
+        pt.month,
+        f.facility_name,
+        p.product_name,
+        pt.target_quantity AS planned,
+        COALESCE(a.actual, 0) AS actual,
+        ROUND(COALESCE(a.actual, 0) / pt.target_quantity * 100, 2) AS completion_percentage
+    FROM production_targets pt
+    JOIN facilities f ON f.facility_id = pt.facility_id
+    JOIN products p ON p.product_id = pt.product_id
+    LEFT JOIN actual a
+        ON a.facility_id = pt.facility_id
+        AND a.product_id = pt.product_id
+        AND a.month = pt.month
+    WHERE pt.plan_year = :plan_year
+      AND pt.month BETWEEN :first_month AND :last_month
+    ORDER BY pt.month, f.facility_name, p.product_name
+""")
+
+
+def period_bounds(plan_year: int, month: Optional[int]) -> Dict:
+    """Date range and lead-in window for a plan year or a single month"""
+    first_month = month or 1
+    last_month = month or 12
+    period_start = date(plan_year, first_month, 1)
+    period_end = date(plan_year, last_month, monthrange(plan_year, last_month)[1])
+    return {
+        "plan_year": plan_year,
+        "first_month": first_month,
+        "last_month": last_month,
+        "period_start": period_start,
+        "period_end": period_end,
+        "window_start": period_start - timedelta(days=ROLLING_WINDOW_DAYS - 1),
+    }
+
+
+def _as_float(value):
+    return float(value) if value is not None else None
+
+
+def get_period_performance(db: Session, plan_year: int, month: Optional[int]) -> Dict[int, FacilityPerformance]:
+    """Performance of every facility for a period, keyed by facility_id (one query per period)"""
+
+    def compute():
+        rows = db.execute(FACILITY_PERFORMANCE_SQL, period_bounds(plan_year, month)).mappings().all()
+        return {
+            row["facility_id"]: FacilityPerformance(
+                facility_id=row["facility_id"],
+                facility_name=row["facility_name"],
+                avg_completion_rate=round(float(row["avg_completion_rate"]), 2),
+                total_production=float(row["total_production"]),
+                avg_quality_score=round(float(row["avg_quality_score"]), 2),
+                rank=row["rank"],
+                rolling_7d_output=_as_float(row["rolling_7d_output"]),
+                rolling_30d_output=_as_float(row["rolling_30d_output"]),
+                defect_rate=_as_float(row["defect_rate"]),
+                total_downtime_hours=_as_float(row["total_downtime_hours"])
+            )
+            for row in rows
+        }
+
+    return analytics_cache.get_or_compute(("performance", plan_year, month), compute)
+
+
+# ============================================================================
+# FACILITY PERFORMANCE ENDPOINTS
+# ============================================================================
+
+@router.get("/facilities/performance", response_model=List[FacilityPerformance])
+def get_facility_rankings(
+        plan_year: int = Query(..., ge=1986, le=1990, description="Plan year"),
+        month: Optional[int] = Query(None, ge=1, le=12, description="Restrict to one month"),
+        limit: int = Query(100, ge=1, le=500, description="Max facilities to return"),
+        db: Session = Depends(get_routed_db)
+):
+    """
+    Rank all facilities by plan completion for a year or month
+
+    Includes rolling 7/30-day output as of the period end, defect rate
+    (defects per unit produced), total downtime and average quality score.
+    """
+    performance = get_period_performance(db, plan_year, month)
+    return list(performance.values())[:limit]
+
+
+@router.get("/facilities/{facility_id}/performance", response_model=FacilityPerformance)
+def get_facility_performance(
+        facility_id: int,
+        plan_year: int = Query(..., ge=1986, le=1990, description="Plan year"),
+        month: Optional[int] = Query(None, ge=1, le=12, description="Restrict to one month"),
+        db: Session = Depends(get_routed_db)
+):
+    """
+    Performance and rank of a single facility for a year or month
+    """
+    performance = get_period_performance(db, plan_year, month)
+
+    if facility_id not in performance:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No production or targets for facility {facility_id} in this period"
+        )
+
+    return performance[facility_id]
+
+
+@router.get("/facilities/{facility_id}/daily", response_model=List[DailyProductionSummary])
+def get_facility_daily_summary(
+        facility_id: int,
+        plan_year: int = Query(..., ge=1986, le=1990, description="Plan year"),
+        month: Optional[int] = Query(None, ge=1, le=12, description="Restrict to one month"),
+        db: Session = Depends(get_routed_db)
+):
+    """
+    Daily production per product with rolling 7/30-day output
+    """
+
+    def compute():
+        params = period_bounds(plan_year, month)
+        params["facility_id"] = facility_id
+        rows = db.execute(FACILITY_DAILY_SQL, params).mappings().all()
+        return [
+            DailyProductionSummary(
+                production_date=row["production_date"],
+                facility_name=row["facility_name"],
+                product_name=row["product_name"],
+                product_category=row["product_category"],
+                total_quantity=float(row["total_quantity"]),
+                avg_downtime=_as_float(row["avg_downtime"]),
+                total_defects=row["total_defects"],
+                shift_count=row["shift_count"],
+                rolling_7d_quantity=_as_float(row["rolling_7d_quantity"]),
+                rolling_30d_quantity=_as_float(row["rolling_30d_quantity"])
+            )
+            for row in rows
+        ]
+
+    summary = analytics_cache.get_or_compute(("daily", facility_id, plan_year, month), compute)
+
+    if not summary:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No production for facility {facility_id} in this period"
+        )
+
+    return summary
+
+
+# ============================================================================
+# PLAN COMPLETION ENDPOINT
+# ============================================================================
+
+@router.get("/plan-completion", response_model=List[PlanVsActualResponse])
+def get_plan_completion(
+        plan_year: int = Query(..., ge=1986, le=1990, description="Plan year"),
+        month: Optional[int] = Query(None, ge=1, le=12, description="Restrict to one month"),
+        db: Session = Depends(get_routed_db)
+):
+    """
+    Monthly plan vs actual per facility and product
+
+    This is the domain's contribution to the cross-ministry plan-completion
+    view served by the Gosplan gateway.
+    """
+
+    def compute():
+        rows = db.execute(PLAN_COMPLETION_SQL, period_bounds(plan_year, month)).mappings().all()
+        return [
+            PlanVsActualResponse(
+                plan_year=row["plan_year"],
+                month=row["month"],
+                facility_name=row["facility_name"],
+                product_name=row["product_name"],
+                planned=float(row["planned"]),
+                actual=float(row["actual"]),
+                completion_percentage=float(row["completion_percentage"])
+            )
+            for row in rows
+        ]
+
+    return analytics_cache.get_or_compute(("plan_completion", plan_year, month), compute)
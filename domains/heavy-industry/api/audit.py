@@ -0,0 +1,132 @@
+"""
+Audit log queries
+Pyatiletka Project
+
+audit_log is partitioned by month. Recent partitions stay in Postgres; older
+ones are exported to MinIO as Parquet and dropped by the audit maintenance
+DAG, which records each in audit_log_archive. A query here reads the hot
+partitions through the ORM (changed_at bounds let Postgres prune partitions)
+and only opens the archived files whose month overlaps the requested range.
+"""
+
+from datetime import datetime, timedelta, timezone
+import json
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pyarrow import fs
+import pyarrow.parquet as pq
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from database import get_routed_db
+from models import AuditLog, AuditLogArchive
+from schemas import AuditLogEntry
+
+MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "minio:9000")
+MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY", "minio_admin")
+MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY", "minio_password")
+
+# Default lookback when no changed_from is given
+AUDIT_DEFAULT_LOOKBACK_DAYS = int(os.getenv("AUDIT_DEFAULT_LOOKBACK_DAYS", "30"))
+
+router = APIRouter(prefix="/audit", tags=["Audit"])
+
+
+def _archive_filesystem():
+    return fs.S3FileSystem(
+        access_key=MINIO_ACCESS_KEY,
+        secret_key=MINIO_SECRET_KEY,
+        endpoint_override=MINIO_ENDPOINT,
+        scheme="http"
+    )
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """changed_at is stored as naive UTC; aware query bounds are converted to match"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _json_value(value):
+    return json.loads(value) if value else None
+
+
+def read_archived(archives: List[AuditLogArchive], filters: list, limit: int) -> List[dict]:
+    """Matching rows from archived partitions, newest first"""
+    filesystem = _archive_filesystem()
+    rows = []
+    for archive in archives:
+        table = pq.read_table(f"{archive.bucket}/{archive.object_name}", filesystem=filesystem, filters=filters)
+        table = table.sort_by([("changed_at", "descending")]).slice(0, limit)
+        for row in table.to_pylist():
+            row["old_values"] = _json_value(row["old_values"])
+            row["new_values"] = _json_value(row["new_values"])
+            row["source"] = "archive"
+            rows.append(row)
+    return rows
+
+
+@router.get("", response_model=List[AuditLogEntry])
+def get_audit_log(
+        table_name: Optional[str] = Query(None, description="Audited table"),
+        record_id: Optional[int] = Query(None, description="Primary key of the audited row"),
+        operation: Optional[str] = Query(None, pattern="^(INSERT|UPDATE|DELETE)$", description="Operation"),
+        changed_from: Optional[datetime] = Query(None, description="Start of range (default: 30 days ago)"),
+        changed_to: Optional[datetime] = Query(None, description="End of range, exclusive (default: now)"),
+        limit: int = Query(100, ge=1, le=1000, description="Max entries to return"),
+        db: Session = Depends(get_routed_db)
+):
+    """
+    Audit trail across hot partitions and the MinIO archive, newest first
+
+    Each entry carries its source: 'hot' for rows still in Postgres and
+    'archive' for rows read back from Parquet.
+    """
+    changed_to = _naive_utc(changed_to) or datetime.utcnow()
+    changed_from = _naive_utc(changed_from) or changed_to - timedelta(days=AUDIT_DEFAULT_LOOKBACK_DAYS)
+    if changed_from >= changed_to:
+        raise HTTPException(status_code=400, detail="changed_from must be before changed_to")
+
+    query = db.query(AuditLog).filter(AuditLog.changed_at >= changed_from, AuditLog.changed_at < changed_to)
+    filters = [("changed_at", ">=", changed_from), ("changed_at", "<", changed_to)]
+    if table_name:
+        query = query.filter(AuditLog.table_name == table_name)
+        filters.append(("table_name", "=", table_name))
+    if record_id is not None:
+        query = query.filter(AuditLog.record_id == record_id)
+        filters.append(("record_id", "=", record_id))
+    if operation:
+        query = query.filter(AuditLog.operation == operation)
+        filters.append(("operation", "=", operation))
+
+    entries = [
+        {
+            "audit_id": row.audit_id,
+            "table_name": row.table_name,
+            "record_id": row.record_id,
+            "operation": row.operation,
+            "old_values": row.old_values,
+            "new_values": row.new_values,
+            "changed_by": row.changed_by,
+            "changed_at": row.changed_at,
+            "source": "hot",
+        }
+        for row in query.order_by(AuditLog.changed_at.desc()).limit(limit).all()
+    ]
+
+    archives = (
+        db.query(AuditLogArchive)
+        .filter(AuditLogArchive.range_start < changed_to, AuditLogArchive.range_end > changed_from)
+        .order_by(AuditLogArchive.range_start.desc())
+        .all()
+    )
+    if archives:
+        try:
+            entries.extend(read_archived(archives, filters, limit))
+        except OSError as exc:
+            raise HTTPException(status_code=503, detail=f"Audit archive unavailable: {exc}")
+
+    entries.sort(key=lambda entry: (entry["changed_at"], entry["audit_id"]), reverse=True)
+    return entries[:limit]
@@ -0,0 +1,75 @@
+"""
+In-process TTL cache for expensive read endpoints
+Pyatiletka Project
+"""
+
+import threading
+import time
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    """
+    Thread-safe cache with per-entry expiry and a bounded size.
+
+    Concurrent misses on the same key are collapsed: one caller computes the
+    value while the others wait for it, so a cold dashboard refresh does not
+    stampede the database.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                # Evict the entry closest to expiry
+                oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                del self._entries[oldest]
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing it at most once per expiry"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        try:
+            with key_lock:
+                value = self.get(key, missing)
+                if value is missing:
+                    value = compute()
+                    self.set(key, value)
+        finally:
+            # Also when compute() raised, so failing keys do not pile up
+            with self._lock:
+                self._key_locks.pop(key, None)
+        return value
+
+    def invalidate(self, predicate: Callable[[Hashable], bool] = None):
+        """Drop every entry, or only the keys matching predicate"""
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if predicate(k)]:
+                    del self._entries[key]
@@ -0,0 +1,233 @@
+"""
+Slow-query capture and per-request profiling
+Pyatiletka Project
+
+Both features are opt-in through the environment and install nothing when
+disabled, so they can stay configured in production:
+
+- SLOW_QUERY_THRESHOLD_MS: statements slower than this are logged with their
+  bind parameters. Read-only statements are then re-run in the background
+  under EXPLAIN (ANALYZE, BUFFERS), at most once per statement per
+  SLOW_QUERY_EXPLAIN_INTERVAL seconds, and the plan is logged too.
+- PROFILING_ENABLED: a request carrying an `X-Profile` header is run under
+  the pyinstrument sampling profiler. The response is replaced by the profile:
+  a speedscope flame graph (JSON, open at https://www.speedscope.app), or
+  HTML with `X-Profile: html`. If PROFILING_TOKEN is set, the request must
+  also send a matching `X-Profile-Token`.
+"""
+
+import contextvars
+import functools
+import hmac
+import inspect
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from starlette.responses import Response
+
+logger = logging.getLogger("heavy_industry.diagnostics")
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "0"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "60"))
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", "30000"))
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")
+PROFILING_INTERVAL = float(os.getenv("PROFILING_INTERVAL", "0.001"))
+
+# Statements that can be re-run under EXPLAIN ANALYZE without side effects
+READ_ONLY_STATEMENT = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+WRITE_KEYWORD = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|FOR\s+UPDATE)\b", re.IGNORECASE)
+
+
+# ============================================================================
+# SLOW QUERY CAPTURE
+# ============================================================================
+
+class SlowQueryRecorder:
+    """Logs slow statements and explains them off the request path"""
+
+    def __init__(self, threshold_ms: float):
+        self.threshold = threshold_ms / 1000
+        self._explained_at = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+
+    def instrument(self, name: str, engine):
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def start(conn, cursor, statement, parameters, context, executemany):
+            context._diagnostics_start = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def finish(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - context._diagnostics_start
+            if elapsed >= self.threshold:
+                self.record(name, engine, statement, parameters, executemany, elapsed)
+
+    def record(self, name, engine, statement, parameters, executemany, elapsed):
+        logger.warning(
+            "Slow query on %s: %.1f ms\n%s\nparameters: %r",
+            name, elapsed * 1000, statement.strip(), parameters
+        )
+
+        if not SLOW_QUERY_EXPLAIN or executemany or not self._is_read_only(statement):
+            return
+
+        with self._lock:
+            last = self._explained_at.get(statement, 0)
+            if time.monotonic() - last < SLOW_QUERY_EXPLAIN_INTERVAL:
+                return
+            self._explained_at[statement] = time.monotonic()
+
+        self._executor.submit(self._explain, name, engine, statement, parameters)
+
+    @staticmethod
+    def _is_read_only(statement: str) -> bool:
+        return bool(READ_ONLY_STATEMENT.match(statement)) and not WRITE_KEYWORD.search(statement)
+
+    @staticmethod
+    def _explain(name, engine, statement, parameters):
+        raw = engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            cursor.execute(f"SET LOCAL statement_timeout = {SLOW_QUERY_EXPLAIN_TIMEOUT_MS}")
+            cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            logger.warning("Plan for slow query on %s:\n%s\n%s", name, statement.strip(), plan)
+        except Exception as exc:
+            logger.warning("Could not explain slow query on %s: %s", name, exc)
+        finally:
+            # Never keep anything EXPLAIN ANALYZE executed
+            raw.rollback()
+            raw.close()
+
+
+# ============================================================================
+# REQUEST PROFILING
+# ============================================================================
+
+# Set for the duration of a profiled request; endpoints store their session in it
+_profile_request = contextvars.ContextVar("profile_request", default=None)
+
+
+def _profiled(call):
+    """Wrap an endpoint so it runs under the profiler when the request asks for it"""
+    from pyinstrument import Profiler
+
+    if inspect.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def async_wrapper(*args, **kwargs):
+            holder = _profile_request.get()
+            if holder is None:
+                return await call(*args, **kwargs)
+            profiler = Profiler(interval=PROFILING_INTERVAL, async_mode="enabled")
+            profiler.start()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                holder["session"] = profiler.stop()
+
+        return async_wrapper
+
+    # Sync endpoints run in a worker thread, so the profiler has to start there
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs):
+        holder = _profile_request.get()
+        if holder is None:
+            return call(*args, **kwargs)
+        profiler = Profiler(interval=PROFILING_INTERVAL)
+        profiler.start()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            holder["session"] = profiler.stop()
+
+    return wrapper
+
+
+class ProfilingMiddleware:
+    """Swaps the response of a profiled request for its flame graph"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _requested_format(self, scope):
+        headers = dict(scope["headers"])
+        mode = headers.get(b"x-profile")
+        if mode is None:
+            return None
+        if PROFILING_TOKEN and not hmac.compare_digest(
+                headers.get(b"x-profile-token", b""), PROFILING_TOKEN.encode()):
+            return None
+        return "html" if mode.strip().lower() == b"html" else "speedscope"
+
+    async def __call__(self, scope, receive, send):
+        output = self._requested_format(scope) if scope["type"] == "http" else None
+        if output is None:
+            await self.app(scope, receive, send)
+            return
+
+        holder = {}
+        passthrough = False
+
+        async def capture(message):
+            nonlocal passthrough
+            # Streams never finish, so they are passed through unprofiled
+            if message["type"] == "http.response.start":
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                passthrough = content_type.startswith(b"text/event-stream")
+            if passthrough:
+                await send(message)
+
+        token = _profile_request.set(holder)
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            _profile_request.reset(token)
+
+        if passthrough:
+            return
+
+        session = holder.get("session")
+        if session is None:
+            response = Response("No profile captured for this route\n", status_code=404)
+        elif output == "html":
+            from pyinstrument.renderers import HTMLRenderer
+            response = Response(HTMLRenderer().render(session), media_type="text/html")
+        else:
+            from pyinstrument.renderers import SpeedscopeRenderer
+            response = Response(
+                SpeedscopeRenderer().render(session),
+                media_type="application/json",
+                headers={"Content-Disposition": 'attachment; filename="profile.speedscope.json"'}
+            )
+        await response(scope, receive, send)
+
+
+def install(app, engines: dict):
+    """
+    Enable whichever diagnostics are configured
+
+    Must run after every route is registered, since profiling wraps the
+    endpoint callables in place.
+    """
+    if SLOW_QUERY_THRESHOLD_MS > 0:
+        recorder = SlowQueryRecorder(SLOW_QUERY_THRESHOLD_MS)
+        for name, engine in engines.items():
+            recorder.instrument(name, engine)
+        logger.info("Slow query capture enabled above %.0f ms", SLOW_QUERY_THRESHOLD_MS)
+
+    if PROFILING_ENABLED:
+        for route in app.routes:
+            if isinstance(route, APIRoute):
+                route.dependant.call = _profiled(route.dependant.call)
+        app.add_middleware(ProfilingMiddleware)
+        logger.info("Request profiling enabled via the X-Profile header")
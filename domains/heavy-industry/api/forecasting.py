@@ -0,0 +1,331 @@
+"""
+Monte Carlo plan-completion forecasts
+Pyatiletka Project
+
+Answers "will facility X meet its plan?" as a distribution rather than a point
+estimate. The production model is the one the data generator uses
+(ProductionDataGenerator.calculate_daily_production), rewritten for NumPy so
+a whole run of the remaining plan period is a few array operations:
+
+- seasonality, learning curve, weekends, year-end push and holidays are
+  deterministic per day
+- ±10% variance and a 2% breakdown chance are drawn per shift
+
+Each facility-product is calibrated on its actuals to date. The learning-curve
+profile is whichever one best explains the shape of the monthly output, and a
+capacity scale comes from total actual vs modelled output. Each simulation run
+draws its scale from that estimate's uncertainty, then simulates every
+remaining day. Facility-products are spread over a process pool, and results
+are cached per data version (trigger-maintained write counters for production
+and targets), so a forecast is only recomputed once production or targets
+are added or corrected.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+import multiprocessing
+import os
+import threading
+import zlib
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+
+from cache import TTLCache
+from database import get_routed_db
+from schemas import PlanCompletionForecast
+
+FORECAST_RUNS = int(os.getenv("FORECAST_RUNS", "5000"))
+# Per gunicorn worker: the cores are split between the WEB_CONCURRENCY processes
+FORECAST_WORKERS = int(os.getenv(
+    "FORECAST_WORKERS",
+    str(max(1, (os.cpu_count() or 1) // int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))))
+))
+# Runs simulated per array block; bounds memory at runs × days × shifts floats
+FORECAST_CHUNK_RUNS = int(os.getenv("FORECAST_CHUNK_RUNS", "1000"))
+# Entries are keyed by data version, so the TTL only bounds memory
+FORECAST_CACHE_TTL_SECONDS = float(os.getenv("FORECAST_CACHE_TTL_SECONDS", "3600"))
+# Capacity uncertainty for facility-products with too little history to calibrate
+FORECAST_PRIOR_CV = float(os.getenv("FORECAST_PRIOR_CV", "0.10"))
+
+router = APIRouter(prefix="/forecast", tags=["Forecasting"])
+
+forecast_cache = TTLCache(ttl_seconds=FORECAST_CACHE_TTL_SECONDS, max_entries=256)
+
+
+# ============================================================================
+# PRODUCTION MODEL (mirrors scripts/data-generators/data-generator.py)
+# ============================================================================
+
+PLAN_START = np.datetime64("1986-01-01")
+PLAN_END = np.datetime64("1990-12-31")
+
+SHIFTS = 3
+# Learning factor = start + plan progress * gain
+LEARNING_CURVES = {
+    "high_performer": (0.90, 0.20),
+    "average": (0.75, 0.20),
+    "struggling": (0.60, 0.25),
+}
+WEEKEND_FACTOR = 0.50
+VARIANCE_RANGE = (0.90, 1.10)
+BREAKDOWN_PROBABILITY = 0.02
+BREAKDOWN_FACTOR = 0.30
+YEAREND_PUSH = 1.15
+HOLIDAY_FACTOR = 0.40
+HOLIDAYS = [(1, 1), (5, 1), (5, 9), (11, 7)]
+# Capacity share of one product at a steel mill
+CATEGORY_CAPACITY = {"STEEL": 0.3}
+
+# Mean of the per-shift random factors
+EXPECTED_SHIFT_NOISE = 1.0 - BREAKDOWN_PROBABILITY * (1.0 - BREAKDOWN_FACTOR)
+
+
+def day_factors(days: np.ndarray, profile: str) -> np.ndarray:
+    """Deterministic daily output of a unit-capacity line, per datetime64[D] day"""
+    days = days.astype("datetime64[D]")
+    day_of_year = (days - days.astype("datetime64[Y]")).astype(int) + 1
+    month = days.astype("datetime64[M]").astype(int) % 12 + 1
+    day_of_month = (days - days.astype("datetime64[M]")).astype(int) + 1
+    weekday = (days.astype(int) + 3) % 7  # 1970-01-01 was a Thursday; Monday = 0
+    plan_progress = (days - PLAN_START).astype(int) / (PLAN_END - PLAN_START).astype(int)
+
+    start, gain = LEARNING_CURVES[profile]
+    is_holiday = np.zeros(days.shape, dtype=bool)
+    for holiday_month, holiday_day in HOLIDAYS:
+        is_holiday |= (month == holiday_month) & (day_of_month == holiday_day)
+
+    return (
+        (1.0 + 0.1 * np.sin(2 * np.pi * day_of_year / 365))
+        * (start + plan_progress * gain)
+        * np.where(weekday >= 5, WEEKEND_FACTOR, 1.0)
+        * np.where(month == 12, YEAREND_PUSH, 1.0)
+        * np.where(is_holiday, HOLIDAY_FACTOR, 1.0)
+    )
+
+
+def calibrate(days: np.ndarray, quantities: np.ndarray) -> Dict:
+    """
+    Fit a profile and capacity scale to a facility-product's daily actuals
+
+    The profile whose monthly actual/model ratio is flattest matches the
+    learning curve best. The scale is total actual over total modelled output,
+    and its standard error comes from the spread of the monthly ratios.
+    """
+    months = days.astype("datetime64[M]")
+    _, month_index = np.unique(months, return_inverse=True)
+    actual_by_month = np.bincount(month_index, weights=quantities)
+
+    best = None
+    for profile in LEARNING_CURVES:
+        expected = day_factors(days, profile) * EXPECTED_SHIFT_NOISE
+        ratios = actual_by_month / np.bincount(month_index, weights=expected)
+        spread = ratios.std() / ratios.mean() if ratios.mean() > 0 else np.inf
+        if best is None or spread < best["spread"]:
+            scale = quantities.sum() / expected.sum()
+            if len(ratios) > 1:
+                scale_sd = ratios.std(ddof=1) / np.sqrt(len(ratios))
+            else:
+                scale_sd = scale * FORECAST_PRIOR_CV
+            best = {"profile": profile, "scale": scale, "scale_sd": scale_sd, "spread": spread}
+    return best
+
+
+def simulate_completion(task: Dict) -> np.ndarray:
+    """
+    Completion percentage of one facility-product in each simulation run
+
+    Runs in a pool worker; task holds only arrays and numbers so it pickles cheaply.
+    """
+    rng = np.random.default_rng(task["seed"])
+    runs = task["runs"]
+    shift_factors = task["factors"][None, :, None] / SHIFTS
+    completion = np.empty(runs)
+
+    for start in range(0, runs, FORECAST_CHUNK_RUNS):
+        size = min(FORECAST_CHUNK_RUNS, runs - start)
+        shape = (size, len(task["factors"]), SHIFTS)
+        variance = rng.uniform(*VARIANCE_RANGE, size=shape)
+        breakdown = np.where(rng.random(shape) < BREAKDOWN_PROBABILITY, BREAKDOWN_FACTOR, 1.0)
+        remaining = (shift_factors * variance * breakdown).sum(axis=(1, 2))
+        scale = np.clip(rng.normal(task["scale"], task["scale_sd"], size=size), 0, None)
+        completion[start:start + size] = (task["actual_to_date"] + scale * remaining) / task["target"] * 100
+    return completion
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    """Shared worker pool, started on first use; None when forecasts run in-process"""
+    global _pool
+    if FORECAST_WORKERS <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a threaded server process can copy held locks
+            _pool = ProcessPoolExecutor(
+                max_workers=FORECAST_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+# ============================================================================
+# DATA
+# ============================================================================
+
+# Counters bumped by trigger on every write (07-data-versions.sql): a primary-key
+# lookup, where counting or MAX(updated_at) would scan actual_production. as_of
+# comes from the production_date index.
+DATA_VERSION_SQL = text("""
+    SELECT
+        (SELECT string_agg(table_name || ':' || version, ',' ORDER BY table_name)
+         FROM data_versions
+         WHERE table_name IN ('actual_production', 'production_targets')) AS data_version,
+        (SELECT MAX(production_date) FROM actual_production) AS as_of
+""")
+
+TARGETS_SQL = text("""
+    SELECT
+        pt.facility_id,
+        f.facility_name,
+        f.capacity_per_day,
+        pt.product_id,
+        p.product_name,
+        p.product_category,
+        SUM(pt.target_quantity) AS target
+    FROM production_targets pt
+    JOIN facilities f ON f.facility_id = pt.facility_id
+    JOIN products p ON p.product_id = pt.product_id
+    WHERE pt.plan_year = :plan_year
+      AND (CAST(:facility_id AS INTEGER) IS NULL OR pt.facility_id = :facility_id)
+      AND (CAST(:product_id AS INTEGER) IS NULL OR pt.product_id = :product_id)
+    GROUP BY pt.facility_id, f.facility_name, f.capacity_per_day, pt.product_id, p.product_name, p.product_category
+    ORDER BY pt.facility_id, pt.product_id
+""")
+
+DAILY_ACTUALS_SQL = text("""
+    SELECT facility_id, product_id, production_date, SUM(quantity_produced) AS quantity
+    FROM actual_production
+    WHERE production_date BETWEEN :plan_start AND :as_of
+      AND (CAST(:facility_id AS INTEGER) IS NULL OR facility_id = :facility_id)
+      AND (CAST(:product_id AS INTEGER) IS NULL OR product_id = :product_id)
+    GROUP BY facility_id, product_id, production_date
+    ORDER BY facility_id, product_id, production_date
+""")
+
+
+def load_daily_actuals(db: Session, as_of: date, facility_id: Optional[int], product_id: Optional[int]) -> Dict:
+    """Daily output per (facility_id, product_id) since the plan start, as (days, quantities) arrays"""
+    rows = db.execute(DAILY_ACTUALS_SQL, {
+        "plan_start": PLAN_START.item(),
+        "as_of": as_of,
+        "facility_id": facility_id,
+        "product_id": product_id,
+    }).all()
+
+    grouped = {}
+    for row in rows:
+        grouped.setdefault((row.facility_id, row.product_id), []).append((row.production_date, float(row.quantity)))
+    return {
+        key: (np.array([d for d, _ in values], dtype="datetime64[D]"), np.array([q for _, q in values]))
+        for key, values in grouped.items()
+    }
+
+
+def build_forecasts(db: Session, plan_year: int, facility_id: Optional[int], product_id: Optional[int],
+                    runs: int, data_version: str, as_of: Optional[date]) -> List[PlanCompletionForecast]:
+    targets = db.execute(TARGETS_SQL, {
+        "plan_year": plan_year, "facility_id": facility_id, "product_id": product_id
+    }).all()
+    actuals = load_daily_actuals(db, as_of, facility_id, product_id) if as_of else {}
+
+    year_start = np.datetime64(f"{plan_year}-01-01")
+    year_end = np.datetime64(f"{plan_year}-12-31")
+    first_remaining = max(year_start, np.datetime64(as_of + timedelta(days=1))) if as_of else year_start
+    remaining_days = np.arange(first_remaining, year_end + 1, dtype="datetime64[D]")
+
+    lines, tasks = [], []
+    for target in targets:
+        key = (target.facility_id, target.product_id)
+        days, quantities = actuals.get(key, (np.array([], dtype="datetime64[D]"), np.array([])))
+
+        if quantities.sum() > 0:
+            fit = calibrate(days, quantities)
+        else:
+            # No history: nominal capacity and the generator's most common profile
+            scale = float(target.capacity_per_day) * CATEGORY_CAPACITY.get(target.product_category, 1.0)
+            fit = {"profile": "average", "scale": scale, "scale_sd": scale * FORECAST_PRIOR_CV}
+
+        in_year = (days >= year_start) & (days <= year_end)
+        actual_to_date = float(quantities[in_year].sum())
+        lines.append((target, fit, actual_to_date))
+        tasks.append({
+            "factors": day_factors(remaining_days, fit["profile"]),
+            "scale": fit["scale"],
+            "scale_sd": fit["scale_sd"],
+            "actual_to_date": actual_to_date,
+            "target": float(target.target),
+            "runs": runs,
+            # Same data, same answer
+            "seed": [zlib.crc32(data_version.encode()), plan_year, target.facility_id, target.product_id],
+        })
+
+    pool = get_pool()
+    results = pool.map(simulate_completion, tasks) if pool and len(tasks) > 1 else map(simulate_completion, tasks)
+
+    forecasts = []
+    for (target, fit, actual_to_date), completion in zip(lines, results):
+        p10, p50, p90 = np.percentile(completion, [10, 50, 90])
+        forecasts.append(PlanCompletionForecast(
+            facility_id=target.facility_id,
+            facility_name=target.facility_name,
+            product_id=target.product_id,
+            product_name=target.product_name,
+            plan_year=plan_year,
+            as_of=as_of,
+            target=float(target.target),
+            actual_to_date=round(actual_to_date, 2),
+            profile=fit["profile"],
+            runs=runs,
+            p10_completion=round(float(p10), 2),
+            p50_completion=round(float(p50), 2),
+            p90_completion=round(float(p90), 2),
+            probability_meeting_target=round(float((completion >= 100).mean()), 4),
+            data_version=data_version,
+        ))
+    return forecasts
+
+
+# ============================================================================
+# ENDPOINT
+# ============================================================================
+
+@router.get("/plan-completion", response_model=List[PlanCompletionForecast])
+def get_plan_completion_forecast(
+        plan_year: int = Query(1990, ge=1986, le=1990, description="Plan year to forecast"),
+        facility_id: Optional[int] = Query(None, description="Restrict to one facility"),
+        product_id: Optional[int] = Query(None, description="Restrict to one product"),
+        runs: int = Query(FORECAST_RUNS, ge=100, le=50000, description="Simulation runs per facility-product"),
+        db: Session = Depends(get_routed_db)
+):
+    """
+    Distribution of annual plan completion per facility and product
+
+    P10/P50/P90 are completion percentages of the year's target; the
+    probability is the share of runs reaching 100%. Years already complete
+    in the data come back with a zero-width distribution.
+    """
+    version = db.execute(DATA_VERSION_SQL).one()
+    key = (plan_year, facility_id, product_id, runs, version.data_version)
+
+    forecasts = forecast_cache.get_or_compute(
+        key, lambda: build_forecasts(db, plan_year, facility_id, product_id, runs, version.data_version, version.as_of)
+    )
+    if not forecasts:
+        raise HTTPException(status_code=404, detail="No production targets match the filters")
+    return forecasts
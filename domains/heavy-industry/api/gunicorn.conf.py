@@ -0,0 +1,42 @@
+"""
+Gunicorn configuration for the Heavy Industry API
+Pyatiletka Project
+
+The app is imported once in the master (preload) and forked into
+WEB_CONCURRENCY uvicorn workers. Nothing touches the database at import time;
+each worker opens its own pool lazily after fork. Schema changes run separately
+through `alembic upgrade head`.
+"""
+
+import multiprocessing
+import os
+import shutil
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+keepalive = 5
+graceful_timeout = 30
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+accesslog = "-"
+
+
+def on_starting(server):
+    # Metrics files from a previous run would be summed into the new one
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def post_fork(server, worker):
+    # Never share pooled connections across processes
+    from database import dispose_engines
+    dispose_engines()
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,224 @@
+"""
+Metrics and tracing for the Heavy Industry API
+Pyatiletka Project
+
+Prometheus metrics (scraped from /metrics):
+- per-route request latency
+- per-statement SQL timing
+- connection pool saturation and checkout wait time
+
+Under gunicorn, set PROMETHEUS_MULTIPROC_DIR so every worker's metrics are
+aggregated into a single scrape.
+
+OpenTelemetry spans wrap each request and each SQL statement. Spans are only
+exported when OTEL_EXPORTER_OTLP_ENDPOINT is set; otherwise the tracer is a no-op.
+"""
+
+import os
+import time
+
+from fastapi import Response
+from opentelemetry import trace
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "heavy-industry-api")
+
+tracer = trace.get_tracer("heavy-industry-api")
+
+REQUEST_LATENCY = Histogram(
+    "heavy_industry_http_request_duration_seconds",
+    "Time from request received to response start, by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+
+QUERY_LATENCY = Histogram(
+    "heavy_industry_db_query_duration_seconds",
+    "SQL statement execution time",
+    ["engine", "operation"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+POOL_WAIT = Histogram(
+    "heavy_industry_db_pool_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+)
+
+
+def configure_tracing():
+    """Install an OTLP exporting tracer provider when an endpoint is configured"""
+    if not os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    provider = TracerProvider(resource=Resource.create({"service.name": OTEL_SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+
+
+# ============================================================================
+# DATABASE
+# ============================================================================
+
+# Pool gauges are driven by pool events rather than read at scrape time, so
+# they sum correctly across gunicorn workers in multiprocess mode
+POOL_SIZE = Gauge(
+    "heavy_industry_db_pool_size", "Configured pool size", ["engine"],
+    multiprocess_mode="livesum"
+)
+POOL_CHECKED_OUT = Gauge(
+    "heavy_industry_db_pool_checked_out", "Connections currently checked out", ["engine"],
+    multiprocess_mode="livesum"
+)
+POOL_CONNECTIONS = Gauge(
+    "heavy_industry_db_pool_connections", "Open connections, idle or checked out (above size = overflow)",
+    ["engine"], multiprocess_mode="livesum"
+)
+
+
+def instrument_engine(name: str, engine):
+    """Time SQL statements and pool checkouts for one engine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+        context._query_span = tracer.start_span(
+            "db.query",
+            attributes={"db.system": "postgresql", "db.name": str(engine.url.database),
+                        "db.statement": statement, "db.engine": name}
+        )
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_start
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+        QUERY_LATENCY.labels(name, operation).observe(elapsed)
+        context._query_span.set_attribute("db.operation", operation)
+        context._query_span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def end_failed_query(exception_context):
+        span = getattr(exception_context.execution_context, "_query_span", None)
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.set_status(trace.Status(trace.StatusCode.ERROR))
+            span.end()
+
+    @event.listens_for(engine, "checkout")
+    def count_checkout(dbapi_connection, connection_record, connection_proxy):
+        POOL_CHECKED_OUT.labels(name).inc()
+
+    @event.listens_for(engine, "checkin")
+    def count_checkin(dbapi_connection, connection_record):
+        POOL_CHECKED_OUT.labels(name).dec()
+
+    @event.listens_for(engine, "connect")
+    def count_connect(dbapi_connection, connection_record):
+        # Set from the process that owns the pool, so each worker reports its own size
+        POOL_SIZE.labels(name).set(engine.pool.size())
+        POOL_CONNECTIONS.labels(name).inc()
+
+    @event.listens_for(engine, "close")
+    def count_close(dbapi_connection, connection_record):
+        POOL_CONNECTIONS.labels(name).dec()
+
+    @event.listens_for(engine, "close_detached")
+    def count_close_detached(dbapi_connection):
+        POOL_CONNECTIONS.labels(name).dec()
+
+    # The pool has no "before checkout" event, so time the checkout call itself.
+    # Patched on the engine rather than the pool: dispose() after fork replaces the pool.
+    raw_connection = engine.raw_connection
+
+    def timed_raw_connection():
+        start = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            POOL_WAIT.labels(name).observe(time.perf_counter() - start)
+
+    engine.raw_connection = timed_raw_connection
+
+
+# ============================================================================
+# HTTP
+# ============================================================================
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency per route template and a span per request
+
+    Latency is measured to the start of the response, so long-lived streams
+    (e.g. /live/production) report their time to first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        start = time.perf_counter()
+        recorded = False
+
+        with tracer.start_as_current_span(f"{method} {scope['path']}", kind=trace.SpanKind.SERVER) as span:
+
+            async def send_wrapper(message):
+                nonlocal recorded
+                if message["type"] == "http.response.start" and not recorded:
+                    recorded = True
+                    route = _route_template(scope)
+                    status = message["status"]
+                    REQUEST_LATENCY.labels(method, route, str(status)).observe(time.perf_counter() - start)
+                    span.update_name(f"{method} {route}")
+                    span.set_attribute("http.method", method)
+                    span.set_attribute("http.route", route)
+                    span.set_attribute("http.status_code", status)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except Exception:
+                if not recorded:
+                    REQUEST_LATENCY.labels(method, _route_template(scope), "500").observe(
+                        time.perf_counter() - start)
+                raise
+
+
+def _route_template(scope) -> str:
+    # FastAPI stores the matched route in the scope; unmatched paths share one label
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+def metrics_endpoint():
+    """
+    Prometheus scrape endpoint
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # Under gunicorn, aggregate the metric files of every worker
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def install(app, engines: dict):
+    """Wire tracing, the metrics middleware, engine listeners and /metrics into the app"""
+    configure_tracing()
+    for name, engine in engines.items():
+        instrument_engine(name, engine)
+    app.add_middleware(MetricsMiddleware)
+    app.add_api_route("/metrics", metrics_endpoint, methods=["GET"], tags=["Health"], include_in_schema=False)
@@ -0,0 +1,303 @@
+"""
+Live production feed (Server-Sent Events)
+Pyatiletka Project
+
+Each API process holds a single LISTEN connection on the primary for the
+'production_events' channel (see 05-production-notify.sql). Notifications are
+batched, enriched with up-to-date plan completion for the affected
+facility/product/month, and fanned out to every connected subscriber whose
+filters match. Dashboards follow production live without polling.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+import psycopg2
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from database import engine, get_read_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+PRODUCTION_CHANNEL = "production_events"
+
+# Notifications arriving within this window are coalesced into one batch,
+# so a burst of shift reports costs one plan-completion query
+LIVE_BATCH_SECONDS = float(os.getenv("LIVE_BATCH_SECONDS", "0.5"))
+
+# Comment line sent to idle clients to keep proxies from closing the stream
+LIVE_HEARTBEAT_SECONDS = float(os.getenv("LIVE_HEARTBEAT_SECONDS", "15"))
+
+# Events buffered per subscriber before the oldest are dropped
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "1000"))
+
+PLAN_COMPLETION_SQL = """
+    SELECT
+        k.facility_id,
+        k.product_id,
+        k.plan_year,
+        k.month,
+        pt.target_quantity,
+        COALESCE(SUM(ap.quantity_produced), 0) AS actual
+    FROM unnest(%s::int[], %s::int[], %s::int[], %s::int[]) AS k(facility_id, product_id, plan_year, month)
+    JOIN production_targets pt
+        ON pt.facility_id = k.facility_id
+        AND pt.product_id = k.product_id
+        AND pt.plan_year = k.plan_year
+        AND pt.month = k.month
+    LEFT JOIN actual_production ap
+        ON ap.facility_id = k.facility_id
+        AND ap.product_id = k.product_id
+        AND ap.production_date >= MAKE_DATE(k.plan_year, k.month, 1)
+        AND ap.production_date < MAKE_DATE(k.plan_year, k.month, 1) + INTERVAL '1 month'
+    GROUP BY k.facility_id, k.product_id, k.plan_year, k.month, pt.target_quantity
+"""
+
+router = APIRouter(prefix="/live", tags=["Live"])
+
+
+@dataclass(eq=False)
+class Subscription:
+    """One connected client: its filters and the queue the hub feeds"""
+    loop: asyncio.AbstractEventLoop
+    facility_ids: Optional[Set[int]] = None
+    product_ids: Optional[Set[int]] = None
+    region_ids: Optional[Set[int]] = None
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=LIVE_QUEUE_SIZE))
+
+    def matches(self, event: Dict) -> bool:
+        if self.facility_ids is not None and event.get("facility_id") not in self.facility_ids:
+            return False
+        if self.product_ids is not None and event.get("product_id") not in self.product_ids:
+            return False
+        if self.region_ids is not None and event.get("region_id") not in self.region_ids:
+            return False
+        return True
+
+    def offer(self, event: Dict):
+        """Called on the subscriber's event loop; drops the oldest event when full"""
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+
+class ProductionEventHub:
+    """
+    Shared LISTEN subscription for the whole process.
+
+    The listener thread starts with the first subscriber and reconnects with
+    backoff if the primary goes away.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def subscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.add(subscription)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="production-event-hub", daemon=True)
+                self._thread.start()
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def _connect(self):
+        # LISTEN must run on the primary; notifications are not replicated
+        params = engine.url.translate_connect_args(username="user", database="dbname")
+        params.update(engine.url.query)
+        conn = psycopg2.connect(**params)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {PRODUCTION_CHANNEL};")
+        logger.info("Listening on %s", PRODUCTION_CHANNEL)
+        return conn
+
+    def _run(self):
+        backoff = 1
+        while not self._stopping.is_set():
+            try:
+                conn = self._connect()
+                backoff = 1
+                try:
+                    self._listen(conn)
+                finally:
+                    conn.close()
+            except psycopg2.Error as exc:
+                logger.warning("Production event listener lost its connection: %s", exc)
+            except Exception:
+                # Anything else (a bad batch, a closed subscriber loop) must not
+                # end the thread and silently stall every connected client
+                logger.exception("Production event listener failed; reconnecting")
+            else:
+                continue
+            self._stopping.wait(backoff)
+            backoff = min(backoff * 2, 30)
+
+    def _listen(self, conn):
+        while not self._stopping.is_set():
+            if select.select([conn], [], [], 1.0) == ([], [], []):
+                continue
+
+            # Keep draining for the batch window so bursts collapse into one dispatch
+            deadline = time.monotonic() + LIVE_BATCH_SECONDS
+            events = []
+            while True:
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    try:
+                        payload = json.loads(notify.payload)
+                    except ValueError:
+                        logger.warning("Ignoring malformed notification: %s", notify.payload)
+                        continue
+                    # The triggers publish arrays of events, one per statement chunk
+                    events.extend(payload if isinstance(payload, list) else [payload])
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                select.select([conn], [], [], remaining)
+
+            if events:
+                self._dispatch(conn, events)
+
+    def _plan_completion(self, conn, events: List[Dict]) -> List[Dict]:
+        """Current plan completion for each facility/product/month touched by the batch"""
+        keys = {
+            (e["facility_id"], e["product_id"], int(e["production_date"][:4]), int(e["production_date"][5:7]))
+            for e in events
+        }
+        columns = list(zip(*keys))
+        with conn.cursor() as cursor:
+            cursor.execute(PLAN_COMPLETION_SQL, [list(column) for column in columns])
+            rows = cursor.fetchall()
+
+        region_by_facility = {e["facility_id"]: e.get("region_id") for e in events}
+        return [
+            {
+                "facility_id": facility_id,
+                "product_id": product_id,
+                "region_id": region_by_facility.get(facility_id),
+                "plan_year": plan_year,
+                "month": month,
+                "planned": float(target),
+                "actual": float(actual),
+                "completion_percentage": round(float(actual) / float(target) * 100, 2) if target else None,
+            }
+            for facility_id, product_id, plan_year, month, target, actual in rows
+        ]
+
+    def _dispatch(self, conn, events: List[Dict]):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+
+        relevant = [e for e in events if any(s.matches(e) for s in subscribers)]
+        if not relevant:
+            return
+
+        outgoing = [("production", e) for e in relevant]
+        outgoing += [("plan_completion", c) for c in self._plan_completion(conn, relevant)]
+
+        for subscription in subscribers:
+            try:
+                for event_type, payload in outgoing:
+                    if subscription.matches(payload):
+                        subscription.loop.call_soon_threadsafe(subscription.offer, (event_type, payload))
+            except RuntimeError:
+                # The subscriber's event loop has closed; the client is gone
+                self.unsubscribe(subscription)
+
+
+hub = ProductionEventHub()
+
+
+def expand_regions(region_ids: List[int]) -> Set[int]:
+    """All regions at or beneath the given ones, via the region closure table"""
+    with get_read_sessionmaker()() as db:
+        rows = db.execute(
+            text("SELECT descendant_id FROM region_closure WHERE ancestor_id = ANY(:region_ids)"),
+            {"region_ids": region_ids}
+        ).all()
+    return {row.descendant_id for row in rows}
+
+
+def format_sse(event_type: str, payload: Dict) -> str:
+    lines = [f"event: {event_type}"]
+    if event_type == "production":
+        lines.append(f"id: {payload['production_id']}")
+    lines.append(f"data: {json.dumps(payload)}")
+    return "\n".join(lines) + "\n\n"
+
+
+# ============================================================================
+# LIVE FEED ENDPOINT
+# ============================================================================
+
+@router.get("/production")
+async def stream_production(
+        request: Request,
+        facility_id: Optional[List[int]] = Query(None, description="Only these facilities"),
+        product_id: Optional[List[int]] = Query(None, description="Only these products"),
+        region_id: Optional[List[int]] = Query(None, description="Only facilities in these regions (any level)")
+):
+    """
+    Server-Sent Events stream of new production records
+
+    Emits a `production` event per shift report and a `plan_completion` event
+    with the updated monthly completion of each affected facility/product.
+    Filters may be repeated, e.g. `?facility_id=1&facility_id=9&region_id=3`.
+    """
+    subscription = Subscription(
+        loop=asyncio.get_running_loop(),
+        facility_ids=set(facility_id) if facility_id else None,
+        product_ids=set(product_id) if product_id else None,
+        region_ids=await run_in_threadpool(expand_regions, region_id) if region_id else None
+    )
+
+    async def event_stream():
+        hub.subscribe(subscription)
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event_type, payload = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=LIVE_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event_type, payload)
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -6,21 +6,35 @@ Main FastAPI application
 """
 
 from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import functools
+import os
 
 # Import our modules
-from database import get_db, engine
-from models import Base, Facility, Product, Region, ActualProduction, ProductionTarget
+from database import get_routed_db, engine, all_engines, replicas
+from models import Facility, Product, Region, ActualProduction, ProductionTarget
 from schemas import (
     FacilityResponse,
     ProductResponse,
-    RegionResponse
+    RegionResponse,
+    ProductionRecordResponse,
+    ProductionTargetResponse
 )
-
-# Create database tables (if they don't exist)
-# This won't recreate existing tables
-Base.metadata.create_all(bind=engine)
+from serialization import FAST_RESPONSES, schema_fields, rows_response, row_response
+from analytics import router as analytics_router, period_bounds
+from rollups import router as rollups_router
+from live import router as live_router, hub as production_event_hub
+from audit import router as audit_router
+from forecasting import router as forecasting_router
+import instrumentation
+import diagnostics
+
+# The schema is managed by `alembic upgrade head`, run once per deploy;
+# nothing here touches the database, so workers start without a round trip.
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -31,6 +45,21 @@ app = FastAPI(
     redoc_url="/redoc"  # ReDoc UI
 )
 
+# Domain routers
+app.include_router(analytics_router)
+app.include_router(rollups_router)
+app.include_router(live_router)
+app.include_router(audit_router)
+app.include_router(forecasting_router)
+
+# Prometheus /metrics, request/SQL/pool metrics and OpenTelemetry spans
+instrumentation.install(app, all_engines())
+
+
+@app.on_event("shutdown")
+def stop_production_event_hub():
+    production_event_hub.stop()
+
 
 # ============================================================================
 # HEALTH CHECK ENDPOINT
@@ -49,6 +78,134 @@ def health_check():
     }
 
 
+@app.get("/health/live", tags=["Health"])
+def liveness():
+    """
+    Liveness probe: the worker is up and serving requests
+    """
+    return {"status": "alive"}
+
+
+@functools.lru_cache(maxsize=1)
+def expected_schema_revision() -> str:
+    """Head revision of the bundled Alembic migrations"""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+@app.get("/health/ready", tags=["Health"])
+def readiness():
+    """
+    Readiness probe: the primary is reachable and migrated to the expected revision
+
+    Replica health is reported but does not fail the probe; reads fall back to
+    the primary.
+    """
+    try:
+        with engine.connect() as conn:
+            revision = conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except SQLAlchemyError as exc:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "detail": str(exc.__class__.__name__)})
+
+    expected = expected_schema_revision()
+    if revision != expected:
+        return JSONResponse(status_code=503, content={
+            "status": "schema_mismatch", "schema_revision": revision, "expected_revision": expected
+        })
+
+    return {
+        "status": "ready",
+        "schema_revision": revision,
+        "replicas": {
+            str(replica.engine.url.host): {"healthy": replica.is_healthy(), "lag_seconds": replica.lag_seconds}
+            for replica in replicas
+        }
+    }
+
+
+# ============================================================================
+# RESPONSE COLUMNS
+# ============================================================================
+
+# Selected in response schema field order for the fast serialization path
+FACILITY_COLUMNS = (
+    Facility.facility_code,
+    Facility.facility_name,
+    Facility.facility_type,
+    Facility.capacity_per_day,
+    Facility.workforce_size,
+    Facility.status,
+    Facility.facility_id,
+    Region.region_name,
+    Facility.commissioned_date
+)
+FACILITY_FIELDS = schema_fields(FacilityResponse, FACILITY_COLUMNS)
+
+PRODUCT_COLUMNS = (
+    Product.product_code,
+    Product.product_name,
+    Product.product_category,
+    Product.unit_of_measure,
+    Product.description,
+    Product.product_id
+)
+PRODUCT_FIELDS = schema_fields(ProductResponse, PRODUCT_COLUMNS)
+
+REGION_COLUMNS = (
+    Region.region_id,
+    Region.region_code,
+    Region.region_name,
+    Region.region_type,
+    Region.parent_region_id
+)
+REGION_FIELDS = schema_fields(RegionResponse, REGION_COLUMNS)
+
+PRODUCTION_COLUMNS = (
+    ActualProduction.production_id,
+    Facility.facility_name,
+    Product.product_name,
+    ActualProduction.production_date,
+    ActualProduction.quantity_produced,
+    ActualProduction.quality_grade,
+    ActualProduction.shift_number,
+    ActualProduction.workers_on_shift,
+    ActualProduction.equipment_downtime_hours,
+    ActualProduction.defect_count,
+    ActualProduction.facility_id,
+    ActualProduction.product_id
+)
+PRODUCTION_FIELDS = schema_fields(ProductionRecordResponse, PRODUCTION_COLUMNS)
+
+TARGET_COLUMNS = (
+    ProductionTarget.target_id,
+    ProductionTarget.facility_id,
+    ProductionTarget.product_id,
+    ProductionTarget.plan_year,
+    ProductionTarget.quarter,
+    ProductionTarget.month,
+    ProductionTarget.target_quantity,
+    ProductionTarget.target_set_date
+)
+TARGET_FIELDS = schema_fields(ProductionTargetResponse, TARGET_COLUMNS)
+
+
+def to_facility_response(f) -> FacilityResponse:
+    return FacilityResponse(
+        facility_id=f.facility_id,
+        facility_code=f.facility_code,
+        facility_name=f.facility_name,
+        facility_type=f.facility_type,
+        capacity_per_day=float(f.capacity_per_day) if f.capacity_per_day else None,
+        workforce_size=f.workforce_size,
+        commissioned_date=f.commissioned_date,
+        status=f.status,
+        region_name=f.region_name
+    )
+
+
 # ============================================================================
 # FACILITIES ENDPOINTS
 # ============================================================================
@@ -59,7 +216,7 @@ def get_facilities(
         limit: int = Query(100, ge=1, le=500, description="Max records to return"),
         facility_type: Optional[str] = Query(None, description="Filter by facility type"),
         status: Optional[str] = Query(None, description="Filter by status"),
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_routed_db)
 ):
     """
     Get list of all facilities with optional filters
@@ -69,17 +226,7 @@ def get_facilities(
     - **facility_type**: Filter by STEEL_MILL, MACHINERY_FACTORY, TANK_PLANT
     - **status**: Filter by ACTIVE, MAINTENANCE, INACTIVE
     """
-    query = db.query(
-        Facility.facility_id,
-        Facility.facility_code,
-        Facility.facility_name,
-        Facility.facility_type,
-        Facility.capacity_per_day,
-        Facility.workforce_size,
-        Facility.commissioned_date,
-        Facility.status,
-        Region.region_name
-    ).join(Region, Facility.region_id == Region.region_id)
+    query = db.query(*FACILITY_COLUMNS).join(Region, Facility.region_id == Region.region_id)
 
     # Apply filters
     if facility_type:
@@ -87,62 +234,36 @@ def get_facilities(
     if status:
         query = query.filter(Facility.status == status)
 
-    # Get results
-    facilities = query.offset(skip).limit(limit).all()
+    # Get results; a stable order keeps skip/limit pages from overlapping
+    facilities = query.order_by(Facility.facility_id).offset(skip).limit(limit).all()
+
+    if FAST_RESPONSES:
+        return rows_response(facilities, FACILITY_FIELDS)
 
     # Convert to response model
-    return [
-        FacilityResponse(
-            facility_id=f.facility_id,
-            facility_code=f.facility_code,
-            facility_name=f.facility_name,
-            facility_type=f.facility_type,
-            capacity_per_day=float(f.capacity_per_day) if f.capacity_per_day else None,
-            workforce_size=f.workforce_size,
-            commissioned_date=f.commissioned_date,
-            status=f.status,
-            region_name=f.region_name
-        )
-        for f in facilities
-    ]
+    return [to_facility_response(f) for f in facilities]
 
 
 @app.get("/facilities/{facility_id}", response_model=FacilityResponse, tags=["Facilities"])
 def get_facility_by_id(
         facility_id: int,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_routed_db)
 ):
     """
     Get a specific facility by ID
     """
-    facility = db.query(
-        Facility.facility_id,
-        Facility.facility_code,
-        Facility.facility_name,
-        Facility.facility_type,
-        Facility.capacity_per_day,
-        Facility.workforce_size,
-        Facility.commissioned_date,
-        Facility.status,
-        Region.region_name
-    ).join(Region, Facility.region_id == Region.region_id) \
+    facility = db.query(*FACILITY_COLUMNS) \
+        .join(Region, Facility.region_id == Region.region_id) \
         .filter(Facility.facility_id == facility_id) \
         .first()
 
     if not facility:
         raise HTTPException(status_code=404, detail=f"Facility {facility_id} not found")
 
-    return FacilityResponse(
-        facility_id=facility.facility_id,
-        facility_code=facility.facility_code,
-        facility_name=facility.facility_name,
-        facility_type=facility.facility_type,
-        capacity_per_day=float(facility.capacity_per_day) if facility.capacity_per_day else None,
-        workforce_size=facility.workforce_size,
-        commissioned_date=facility.commissioned_date,
-        status=facility.status,
-        region_name=facility.region_name
-    )
+    if FAST_RESPONSES:
+        return row_response(facility, FACILITY_FIELDS)
+
+    return to_facility_response(facility)
 
 
 # ============================================================================
@@ -152,33 +273,40 @@ def get_facility_by_id(
 @app.get("/products", response_model=List[ProductResponse], tags=["Products"])
 def get_products(
         category: Optional[str] = Query(None, description="Filter by category (STEEL, MACHINERY, ARMAMENTS)"),
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_routed_db)
 ):
     """
     Get list of all products with optional category filter
     """
-    query = db.query(Product)
+    query = db.query(*PRODUCT_COLUMNS)
 
     if category:
         query = query.filter(Product.product_category == category)
 
     products = query.all()
+
+    if FAST_RESPONSES:
+        return rows_response(products, PRODUCT_FIELDS)
+
     return products
 
 
 @app.get("/products/{product_id}", response_model=ProductResponse, tags=["Products"])
 def get_product_by_id(
         product_id: int,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_routed_db)
 ):
     """
     Get a specific product by ID
     """
-    product = db.query(Product).filter(Product.product_id == product_id).first()
+    product = db.query(*PRODUCT_COLUMNS).filter(Product.product_id == product_id).first()
 
     if not product:
         raise HTTPException(status_code=404, detail=f"Product {product_id} not found")
 
+    if FAST_RESPONSES:
+        return row_response(product, PRODUCT_FIELDS)
+
     return product
 
 
@@ -189,26 +317,94 @@ def get_product_by_id(
 @app.get("/regions", response_model=List[RegionResponse], tags=["Regions"])
 def get_regions(
         region_type: Optional[str] = Query(None, description="Filter by type (USSR, REPUBLIC, OBLAST)"),
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_routed_db)
 ):
     """
     Get list of all regions
     """
-    query = db.query(Region)
+    query = db.query(*REGION_COLUMNS)
 
     if region_type:
         query = query.filter(Region.region_type == region_type)
 
     regions = query.order_by(Region.region_id).all()
+
+    if FAST_RESPONSES:
+        return rows_response(regions, REGION_FIELDS)
+
     return regions
 
 
+# ============================================================================
+# PRODUCTION ENDPOINTS
+# ============================================================================
+
+@app.get("/production", response_model=List[ProductionRecordResponse], tags=["Production"])
+def get_production(
+        plan_year: int = Query(..., ge=1986, le=1990, description="Plan year (1986-1990)"),
+        month: Optional[int] = Query(None, ge=1, le=12, description="Month (1-12); whole year if omitted"),
+        facility_id: Optional[int] = Query(None, description="Filter by facility"),
+        after_id: int = Query(0, ge=0, description="Return records with production_id above this"),
+        limit: int = Query(1000, ge=1, le=10000, description="Max records to return"),
+        db: Session = Depends(get_routed_db)
+):
+    """
+    Shift-level production records for a plan year or month
+
+    Paginated by keyset: pass the last production_id of a page as **after_id**
+    to get the next one. Unlike offset paging, every page costs the same, so
+    full extracts of a month stay linear.
+    """
+    bounds = period_bounds(plan_year, month)
+    query = db.query(*PRODUCTION_COLUMNS) \
+        .join(Facility, ActualProduction.facility_id == Facility.facility_id) \
+        .join(Product, ActualProduction.product_id == Product.product_id) \
+        .filter(ActualProduction.production_date.between(bounds["period_start"], bounds["period_end"])) \
+        .filter(ActualProduction.production_id > after_id)
+
+    if facility_id:
+        query = query.filter(ActualProduction.facility_id == facility_id)
+
+    records = query.order_by(ActualProduction.production_id).limit(limit).all()
+
+    if FAST_RESPONSES:
+        return rows_response(records, PRODUCTION_FIELDS)
+
+    return records
+
+
+@app.get("/targets", response_model=List[ProductionTargetResponse], tags=["Production"])
+def get_targets(
+        plan_year: int = Query(..., ge=1986, le=1990, description="Plan year (1986-1990)"),
+        month: Optional[int] = Query(None, ge=1, le=12, description="Month (1-12); whole year if omitted"),
+        after_id: int = Query(0, ge=0, description="Return targets with target_id above this"),
+        limit: int = Query(1000, ge=1, le=10000, description="Max records to return"),
+        db: Session = Depends(get_routed_db)
+):
+    """
+    Monthly production targets, paginated by keyset on target_id
+    """
+    query = db.query(*TARGET_COLUMNS) \
+        .filter(ProductionTarget.plan_year == plan_year) \
+        .filter(ProductionTarget.target_id > after_id)
+
+    if month:
+        query = query.filter(ProductionTarget.month == month)
+
+    targets = query.order_by(ProductionTarget.target_id).limit(limit).all()
+
+    if FAST_RESPONSES:
+        return rows_response(targets, TARGET_FIELDS)
+
+    return targets
+
+
 # ============================================================================
 # STATS ENDPOINT
 # ============================================================================
 
 @app.get("/stats", tags=["Statistics"])
-def get_stats(db: Session = Depends(get_db)):
+def get_stats(db: Session = Depends(get_routed_db)):
     """
     Get basic statistics about the database
     """
@@ -218,4 +414,12 @@ def get_stats(db: Session = Depends(get_db)):
         "total_regions": db.query(Region).count(),
         "total_production_records": db.query(ActualProduction).count(),
         "total_targets": db.query(ProductionTarget).count()
-    }
\ No newline at end of file
+    }
+
+
+# ============================================================================
+# DIAGNOSTICS (slow-query capture, X-Profile request profiling)
+# ============================================================================
+
+# Registered last: profiling wraps every route defined above
+diagnostics.install(app, all_engines())
@@ -0,0 +1,27 @@
+"""
+Init-script SQL for migrations
+Pyatiletka Project
+
+Objects created by infrastructure/init-scripts/heavy-industry are applied to
+existing databases by running the same script from a revision, so there is one
+copy of the SQL. Every script run this way must be safe to re-run.
+"""
+
+import os
+from pathlib import Path
+
+# The heavy-industry init scripts; compose mounts them into the migrate container.
+# Unset, they are found relative to a repository checkout.
+INIT_SCRIPTS_DIR = os.getenv('INIT_SCRIPTS_DIR')
+
+
+def init_scripts_dir() -> Path:
+    if INIT_SCRIPTS_DIR:
+        return Path(INIT_SCRIPTS_DIR)
+    return Path(__file__).resolve().parents[4] / 'infrastructure' / 'init-scripts' / 'heavy-industry'
+
+
+def run_init_script(conn, name: str):
+    sql = (init_scripts_dir() / name).read_text()
+    # Sent as-is: format() calls in the scripts use % and must not be treated as bind markers
+    conn.exec_driver_sql(sql)
@@ -0,0 +1,230 @@
+"""Baseline: the heavy_industry schema as of the first migration
+
+A frozen copy of the tables, indexes and views in
+infrastructure/init-scripts/heavy-industry/01-schema.sql at the time Alembic
+was introduced. It is written out here instead of being generated from the ORM
+models, so what the baseline creates never changes when models do; later
+schema changes belong to later revisions. Databases initialized by the init
+scripts already have every object, and each statement is IF NOT EXISTS, so
+this only fills in what is missing. It replaces the create_all() that main.py
+used to run in every worker at import time.
+
+The region closure table and its triggers, and the live production triggers,
+are added by 0004_region_closure and 0005_production_notify.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+TABLES_SQL = """
+    CREATE TABLE IF NOT EXISTS regions (
+        region_id SERIAL PRIMARY KEY,
+        region_code VARCHAR(10) UNIQUE NOT NULL,
+        region_name VARCHAR(255) NOT NULL,
+        region_type VARCHAR(50) NOT NULL,
+        parent_region_id INTEGER REFERENCES regions(region_id),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_regions_parent ON regions(parent_region_id);
+    CREATE INDEX IF NOT EXISTS idx_regions_type ON regions(region_type);
+
+    CREATE TABLE IF NOT EXISTS products (
+        product_id SERIAL PRIMARY KEY,
+        product_code VARCHAR(20) UNIQUE NOT NULL,
+        product_name VARCHAR(255) NOT NULL,
+        product_category VARCHAR(100) NOT NULL,
+        unit_of_measure VARCHAR(50) NOT NULL,
+        description TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_products_category ON products(product_category);
+
+    CREATE TABLE IF NOT EXISTS facilities (
+        facility_id SERIAL PRIMARY KEY,
+        facility_code VARCHAR(20) UNIQUE NOT NULL,
+        facility_name VARCHAR(255) NOT NULL,
+        facility_type VARCHAR(100) NOT NULL,
+        region_id INTEGER NOT NULL REFERENCES regions(region_id),
+        capacity_per_day DECIMAL(15, 2),
+        workforce_size INTEGER,
+        commissioned_date DATE,
+        status VARCHAR(50) DEFAULT 'ACTIVE',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT chk_capacity_positive CHECK (capacity_per_day > 0),
+        CONSTRAINT chk_workforce_positive CHECK (workforce_size >= 0)
+    );
+    CREATE INDEX IF NOT EXISTS idx_facilities_region ON facilities(region_id);
+    CREATE INDEX IF NOT EXISTS idx_facilities_type ON facilities(facility_type);
+    CREATE INDEX IF NOT EXISTS idx_facilities_status ON facilities(status);
+
+    CREATE TABLE IF NOT EXISTS equipment (
+        equipment_id SERIAL PRIMARY KEY,
+        facility_id INTEGER NOT NULL REFERENCES facilities(facility_id),
+        equipment_type VARCHAR(100) NOT NULL,
+        equipment_name VARCHAR(255) NOT NULL,
+        model VARCHAR(100),
+        install_date DATE,
+        last_maintenance_date DATE,
+        operational_status VARCHAR(50) DEFAULT 'OPERATIONAL',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_equipment_facility ON equipment(facility_id);
+    CREATE INDEX IF NOT EXISTS idx_equipment_status ON equipment(operational_status);
+
+    CREATE TABLE IF NOT EXISTS production_targets (
+        target_id SERIAL PRIMARY KEY,
+        facility_id INTEGER NOT NULL REFERENCES facilities(facility_id),
+        product_id INTEGER NOT NULL REFERENCES products(product_id),
+        plan_year INTEGER NOT NULL,
+        quarter INTEGER NOT NULL CHECK (quarter BETWEEN 1 AND 4),
+        month INTEGER CHECK (month BETWEEN 1 AND 12),
+        target_quantity DECIMAL(15, 2) NOT NULL,
+        target_set_date DATE NOT NULL,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT chk_target_positive CHECK (target_quantity > 0),
+        CONSTRAINT chk_plan_year CHECK (plan_year BETWEEN 1986 AND 1990),
+        CONSTRAINT uk_target UNIQUE (facility_id, product_id, plan_year, month)
+    );
+    CREATE INDEX IF NOT EXISTS idx_targets_facility ON production_targets(facility_id);
+    CREATE INDEX IF NOT EXISTS idx_targets_product ON production_targets(product_id);
+    CREATE INDEX IF NOT EXISTS idx_targets_year ON production_targets(plan_year);
+
+    CREATE TABLE IF NOT EXISTS actual_production (
+        production_id SERIAL PRIMARY KEY,
+        facility_id INTEGER NOT NULL REFERENCES facilities(facility_id),
+        product_id INTEGER NOT NULL REFERENCES products(product_id),
+        production_date DATE NOT NULL,
+        quantity_produced DECIMAL(15, 2) NOT NULL,
+        quality_grade VARCHAR(10) NOT NULL,
+        shift_number INTEGER CHECK (shift_number BETWEEN 1 AND 3),
+        workers_on_shift INTEGER,
+        equipment_downtime_hours DECIMAL(5, 2) DEFAULT 0,
+        defect_count INTEGER DEFAULT 0,
+        notes TEXT,
+        reported_by VARCHAR(255),
+        reported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT chk_quantity_positive CHECK (quantity_produced >= 0),
+        CONSTRAINT chk_quality_valid CHECK (quality_grade IN ('A', 'B', 'C')),
+        CONSTRAINT chk_workers_positive CHECK (workers_on_shift >= 0),
+        CONSTRAINT chk_downtime_valid CHECK (equipment_downtime_hours >= 0 AND equipment_downtime_hours <= 24),
+        CONSTRAINT chk_defects_positive CHECK (defect_count >= 0)
+    );
+    CREATE INDEX IF NOT EXISTS idx_production_facility ON actual_production(facility_id);
+    CREATE INDEX IF NOT EXISTS idx_production_product ON actual_production(product_id);
+    CREATE INDEX IF NOT EXISTS idx_production_date ON actual_production(production_date);
+    CREATE INDEX IF NOT EXISTS idx_production_quality ON actual_production(quality_grade);
+
+    CREATE TABLE IF NOT EXISTS maintenance_log (
+        maintenance_id SERIAL PRIMARY KEY,
+        equipment_id INTEGER NOT NULL REFERENCES equipment(equipment_id),
+        maintenance_date DATE NOT NULL,
+        maintenance_type VARCHAR(50) NOT NULL,
+        duration_hours DECIMAL(5, 2) NOT NULL,
+        technician_name VARCHAR(255),
+        description TEXT,
+        cost_rubles DECIMAL(12, 2),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT chk_duration_positive CHECK (duration_hours > 0)
+    );
+    CREATE INDEX IF NOT EXISTS idx_maintenance_equipment ON maintenance_log(equipment_id);
+    CREATE INDEX IF NOT EXISTS idx_maintenance_date ON maintenance_log(maintenance_date);
+
+    CREATE TABLE IF NOT EXISTS resource_consumption (
+        consumption_id SERIAL PRIMARY KEY,
+        facility_id INTEGER NOT NULL REFERENCES facilities(facility_id),
+        consumption_date DATE NOT NULL,
+        resource_type VARCHAR(100) NOT NULL,
+        quantity DECIMAL(15, 2) NOT NULL,
+        unit VARCHAR(50) NOT NULL,
+        cost_rubles DECIMAL(12, 2),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT chk_consumption_positive CHECK (quantity > 0)
+    );
+    CREATE INDEX IF NOT EXISTS idx_consumption_facility ON resource_consumption(facility_id);
+    CREATE INDEX IF NOT EXISTS idx_consumption_date ON resource_consumption(consumption_date);
+    CREATE INDEX IF NOT EXISTS idx_consumption_type ON resource_consumption(resource_type);
+
+    CREATE TABLE IF NOT EXISTS audit_log (
+        audit_id SERIAL PRIMARY KEY,
+        table_name VARCHAR(100) NOT NULL,
+        record_id INTEGER NOT NULL,
+        operation VARCHAR(20) NOT NULL,
+        old_values JSONB,
+        new_values JSONB,
+        changed_by VARCHAR(255),
+        changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_audit_table ON audit_log(table_name);
+    CREATE INDEX IF NOT EXISTS idx_audit_date ON audit_log(changed_at);
+"""
+
+VIEWS_SQL = """
+    CREATE OR REPLACE VIEW daily_production_summary AS
+    SELECT
+        ap.production_date,
+        f.facility_name,
+        r.region_name,
+        p.product_name,
+        p.product_category,
+        SUM(ap.quantity_produced) as total_quantity,
+        AVG(ap.equipment_downtime_hours) as avg_downtime,
+        SUM(ap.defect_count) as total_defects,
+        COUNT(*) as shift_count
+    FROM actual_production ap
+    JOIN facilities f ON ap.facility_id = f.facility_id
+    JOIN regions r ON f.region_id = r.region_id
+    JOIN products p ON ap.product_id = p.product_id
+    GROUP BY ap.production_date, f.facility_name, r.region_name, p.product_name, p.product_category;
+
+    CREATE OR REPLACE VIEW plan_vs_actual_monthly AS
+    SELECT
+        pt.plan_year,
+        pt.month,
+        f.facility_name,
+        r.region_name,
+        p.product_name,
+        pt.target_quantity as planned,
+        COALESCE(SUM(ap.quantity_produced), 0) as actual,
+        CASE
+            WHEN pt.target_quantity > 0 THEN
+                ROUND((COALESCE(SUM(ap.quantity_produced), 0) / pt.target_quantity * 100), 2)
+            ELSE 0
+        END as completion_percentage
+    FROM production_targets pt
+    LEFT JOIN actual_production ap ON
+        pt.facility_id = ap.facility_id
+        AND pt.product_id = ap.product_id
+        AND EXTRACT(YEAR FROM ap.production_date) = pt.plan_year
+        AND EXTRACT(MONTH FROM ap.production_date) = pt.month
+    JOIN facilities f ON pt.facility_id = f.facility_id
+    JOIN regions r ON f.region_id = r.region_id
+    JOIN products p ON pt.product_id = p.product_id
+    GROUP BY pt.plan_year, pt.month, f.facility_name, r.region_name,
+             p.product_name, pt.target_quantity;
+"""
+
+
+def upgrade():
+    op.execute(TABLES_SQL)
+    op.execute(VIEWS_SQL)
+
+
+def downgrade():
+    # The baseline adopts existing tables; dropping them is never automatic
+    pass
@@ -0,0 +1,45 @@
+"""Natural key on actual_production
+
+Re-running the data generator used to duplicate shift reports, because nothing
+made (facility, product, date, shift) unique. Duplicates are removed, keeping
+the first report of each shift, before the constraint is added. Databases
+initialized from the current 01-schema.sql already have the constraint.
+
+Revision ID: 0002_production_natural_key
+Revises: 0001_baseline
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = '0002_production_natural_key'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        DELETE FROM actual_production ap
+        USING actual_production keep
+        WHERE ap.facility_id = keep.facility_id
+          AND ap.product_id = keep.product_id
+          AND ap.production_date = keep.production_date
+          AND ap.shift_number = keep.shift_number
+          AND ap.production_id > keep.production_id
+    """)
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uk_production_shift') THEN
+                ALTER TABLE actual_production
+                    ADD CONSTRAINT uk_production_shift
+                    UNIQUE (facility_id, product_id, production_date, shift_number);
+            END IF;
+        END
+        $$;
+    """)
+
+
+def downgrade():
+    op.drop_constraint('uk_production_shift', 'actual_production', type_='unique')
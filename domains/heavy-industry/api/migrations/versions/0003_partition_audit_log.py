@@ -0,0 +1,94 @@
+"""Monthly range partitioning for audit_log
+
+Existing databases have a plain audit_log table. It is renamed aside, a
+partitioned audit_log is created in its place with a partition for every month
+that has rows, the rows are copied over and the old table is dropped. The id
+sequence is kept, so audit_id values continue where they left off.
+
+The archive catalog, the partition functions, the default partition and the
+upcoming months come from 06-audit-log-partitions.sql, which is read from
+INIT_SCRIPTS_DIR rather than copied here, so the init scripts and this
+revision cannot drift apart. The script is safe to re-run: databases
+initialized from the current init scripts are already partitioned, and for
+them this only (re)creates the functions.
+
+This revision is irreversible. Partitions past the hot window are exported to
+MinIO and dropped by the audit maintenance DAG, so folding audit_log back into
+one plain table would need a manual restore from the archive first;
+downgrade() refuses instead of silently losing that history.
+
+Revision ID: 0003_partition_audit_log
+Revises: 0002_production_natural_key
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+from migrations.init_scripts import run_init_script
+
+revision = '0003_partition_audit_log'
+down_revision = '0002_production_natural_key'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    relkind = conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass('audit_log')")).scalar()
+
+    if relkind == 'r':
+        # Move the plain table and its index/constraint names out of the way
+        op.execute("ALTER TABLE audit_log RENAME TO audit_log_unpartitioned")
+        op.execute("ALTER TABLE audit_log_unpartitioned RENAME CONSTRAINT audit_log_pkey TO audit_log_unpartitioned_pkey")
+        op.execute("DROP INDEX IF EXISTS idx_audit_table")
+        op.execute("DROP INDEX IF EXISTS idx_audit_date")
+
+        op.execute("""
+            CREATE TABLE audit_log (
+                audit_id BIGINT NOT NULL DEFAULT nextval('audit_log_audit_id_seq'),
+                table_name VARCHAR(100) NOT NULL,
+                record_id INTEGER NOT NULL,
+                operation VARCHAR(20) NOT NULL,
+                old_values JSONB,
+                new_values JSONB,
+                changed_by VARCHAR(255),
+                changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (audit_id, changed_at)
+            ) PARTITION BY RANGE (changed_at)
+        """)
+        op.execute("ALTER SEQUENCE audit_log_audit_id_seq AS BIGINT OWNED BY audit_log.audit_id")
+        op.execute("CREATE INDEX idx_audit_table ON audit_log(table_name, record_id)")
+        op.execute("CREATE INDEX idx_audit_date ON audit_log(changed_at)")
+    elif relkind is None:
+        raise RuntimeError("audit_log does not exist; run the baseline first")
+
+    run_init_script(conn, '06-audit-log-partitions.sql')
+
+    if relkind == 'r':
+        # A partition for every month with history, so nothing lands in the default partition
+        op.execute("""
+            SELECT create_audit_log_partition(month_start::date)
+            FROM (
+                SELECT DISTINCT date_trunc('month', changed_at) AS month_start
+                FROM audit_log_unpartitioned
+                WHERE changed_at IS NOT NULL
+            ) months
+        """)
+        op.execute("""
+            INSERT INTO audit_log (
+                audit_id, table_name, record_id, operation, old_values, new_values, changed_by, changed_at
+            )
+            SELECT audit_id, table_name, record_id, operation, old_values, new_values, changed_by,
+                   COALESCE(changed_at, CURRENT_TIMESTAMP)
+            FROM audit_log_unpartitioned
+        """)
+        op.execute("DROP TABLE audit_log_unpartitioned")
+
+
+def downgrade():
+    # Irreversible, see the module docstring
+    raise NotImplementedError(
+        "0003_partition_audit_log is irreversible: restore archived partitions from MinIO before "
+        "rebuilding audit_log by hand"
+    )
@@ -0,0 +1,34 @@
+"""Region hierarchy closure table
+
+Adds region_closure, the triggers that keep it in step with regions, and the
+covering production index used by roll-ups, then backfills the closure for
+existing regions. Runs 04-region-closure.sql from INIT_SCRIPTS_DIR; the script
+is safe to re-run, so databases initialized from the current init scripts are
+left as they are.
+
+Revision ID: 0004_region_closure
+Revises: 0003_partition_audit_log
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+from migrations.init_scripts import run_init_script
+
+revision = '0004_region_closure'
+down_revision = '0003_partition_audit_log'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    run_init_script(op.get_bind(), '04-region-closure.sql')
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_region_closure_move ON regions")
+    op.execute("DROP TRIGGER IF EXISTS trg_region_closure_insert ON regions")
+    op.execute("DROP FUNCTION IF EXISTS region_closure_on_move()")
+    op.execute("DROP FUNCTION IF EXISTS region_closure_on_insert()")
+    op.execute("DROP INDEX IF EXISTS idx_production_facility_date")
+    op.execute("DROP TABLE IF EXISTS region_closure")
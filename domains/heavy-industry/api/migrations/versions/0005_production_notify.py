@@ -0,0 +1,32 @@
+"""Live production notifications
+
+Adds the statement-level triggers on actual_production that publish new and
+corrected shift reports on the 'production_events' channel for the live feed.
+Runs 05-production-notify.sql from INIT_SCRIPTS_DIR; the script replaces the
+functions and recreates the triggers, so it is safe to re-run.
+
+Revision ID: 0005_production_notify
+Revises: 0004_region_closure
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+from migrations.init_scripts import run_init_script
+
+revision = '0005_production_notify'
+down_revision = '0004_region_closure'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    run_init_script(op.get_bind(), '05-production-notify.sql')
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_production_notify_update ON actual_production")
+    op.execute("DROP TRIGGER IF EXISTS trg_production_notify_insert ON actual_production")
+    op.execute("DROP FUNCTION IF EXISTS notify_production_updates()")
+    op.execute("DROP FUNCTION IF EXISTS notify_production_inserts()")
+    op.execute("DROP FUNCTION IF EXISTS publish_production_events(JSON[])")
@@ -0,0 +1,31 @@
+"""Per-table data version counters
+
+Adds data_versions and the statement-level triggers that bump it on every
+write to actual_production and production_targets, so the forecast cache can
+check for new data without scanning the table. Runs 07-data-versions.sql from
+INIT_SCRIPTS_DIR; the script is safe to re-run.
+
+Revision ID: 0006_data_versions
+Revises: 0005_production_notify
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+from migrations.init_scripts import run_init_script
+
+revision = '0006_data_versions'
+down_revision = '0005_production_notify'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    run_init_script(op.get_bind(), '07-data-versions.sql')
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_data_version ON production_targets")
+    op.execute("DROP TRIGGER IF EXISTS trg_data_version ON actual_production")
+    op.execute("DROP FUNCTION IF EXISTS bump_data_version()")
+    op.execute("DROP TABLE IF EXISTS data_versions")
@@ -3,7 +3,8 @@ SQLAlchemy ORM Models for Heavy Industry Domain
 Pyatiletka Project
 """
 
-from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, BigInteger, String, Numeric, Date, DateTime, ForeignKey, Text, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -24,6 +25,15 @@ class Region(Base):
     facilities = relationship("Facility", back_populates="region")
 
 
+class RegionClosure(Base):
+    __tablename__ = "region_closure"
+
+    # Maintained by triggers on regions (see 04-region-closure.sql)
+    ancestor_id = Column(Integer, ForeignKey('regions.region_id', ondelete='CASCADE'), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey('regions.region_id', ondelete='CASCADE'), primary_key=True, index=True)
+    depth = Column(Integer, nullable=False)
+
+
 class Product(Base):
     __tablename__ = "products"
 
@@ -103,6 +113,10 @@ class ProductionTarget(Base):
 
 class ActualProduction(Base):
     __tablename__ = "actual_production"
+    __table_args__ = (
+        UniqueConstraint('facility_id', 'product_id', 'production_date', 'shift_number',
+                         name='uk_production_shift'),
+    )
 
     production_id = Column(Integer, primary_key=True, index=True)
     facility_id = Column(Integer, ForeignKey('facilities.facility_id'), nullable=False)
@@ -122,4 +136,32 @@ class ActualProduction(Base):
 
     # Relationships
     facility = relationship("Facility", back_populates="production_records")
-    product = relationship("Product", back_populates="production_records")
\ No newline at end of file
+    product = relationship("Product", back_populates="production_records")
+
+
+class AuditLog(Base):
+    __tablename__ = "audit_log"
+    # Monthly partitions are managed outside the ORM (see 06-audit-log-partitions.sql)
+    __table_args__ = {"postgresql_partition_by": "RANGE (changed_at)"}
+
+    audit_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    table_name = Column(String(100), nullable=False)
+    record_id = Column(Integer, nullable=False)
+    operation = Column(String(20), nullable=False)
+    old_values = Column(JSONB)
+    new_values = Column(JSONB)
+    changed_by = Column(String(255))
+    changed_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+
+
+class AuditLogArchive(Base):
+    __tablename__ = "audit_log_archive"
+
+    # One row per audit_log partition exported to MinIO and dropped
+    partition_name = Column(String(63), primary_key=True)
+    range_start = Column(DateTime, nullable=False)
+    range_end = Column(DateTime, nullable=False)
+    bucket = Column(String(63), nullable=False)
+    object_name = Column(Text, nullable=False)
+    row_count = Column(BigInteger, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow)
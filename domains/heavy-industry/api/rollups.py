@@ -0,0 +1,175 @@
+"""
+Region hierarchy roll-ups
+Pyatiletka Project
+
+Aggregates production and plan completion at any level of the
+USSR → Republic → Oblast tree through the region_closure table: one indexed
+join from an ancestor region to every facility beneath it.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from analytics import analytics_cache, period_bounds
+from database import get_routed_db
+from schemas import RegionRollupResponse
+
+router = APIRouter(prefix="/regions", tags=["Regions"])
+
+# Quantities are only summed within a product category and unit of measure;
+# tons of steel and units of tanks do not add up.
+ROLLUP_SQL = """
+    WITH scope AS (
+        SELECT rc.ancestor_id, f.facility_id
+        FROM region_closure rc
+        JOIN regions anc ON anc.region_id = rc.ancestor_id
+        JOIN facilities f ON f.region_id = rc.descendant_id
+        WHERE {scope_filter}
+    ),
+    actual AS (
+        SELECT
+            s.ancestor_id,
+            p.product_category,
+            p.unit_of_measure,
+            SUM(ap.quantity_produced) AS actual_quantity,
+            COUNT(DISTINCT ap.facility_id) AS facility_count
+        FROM scope s
+        JOIN actual_production ap ON ap.facility_id = s.facility_id
+        JOIN products p ON p.product_id = ap.product_id
+        WHERE ap.production_date BETWEEN :period_start AND :period_end
+          AND {product_filter}
+        GROUP BY s.ancestor_id, p.product_category, p.unit_of_measure
+    ),
+    planned AS (
+        SELECT
+            s.ancestor_id,
+            p.product_category,
+            p.unit_of_measure,
+            SUM(pt.target_quantity) AS planned_quantity
+        FROM scope s
+        JOIN production_targets pt ON pt.facility_id = s.facility_id
+        JOIN products p ON p.product_id = pt.product_id
+        WHERE pt.plan_year = :plan_year
+          AND pt.month BETWEEN :first_month AND :last_month
+          AND {product_filter}
+        GROUP BY s.ancestor_id, p.product_category, p.unit_of_measure
+    )
+    SELECT
+        r.region_id,
+        r.region_code,
+        r.region_name,
+        r.region_type,
+        COALESCE(a.product_category, pl.product_category) AS product_category,
+        COALESCE(a.unit_of_measure, pl.unit_of_measure) AS unit_of_measure,
+        COALESCE(a.facility_count, 0) AS facility_count,
+        COALESCE(a.actual_quantity, 0) AS actual_quantity,
+        pl.planned_quantity,
+        ROUND(COALESCE(a.actual_quantity, 0) / NULLIF(pl.planned_quantity, 0) * 100, 2) AS completion_percentage
+    FROM actual a
+    FULL OUTER JOIN planned pl
+        ON pl.ancestor_id = a.ancestor_id
+        AND pl.product_category = a.product_category
+        AND pl.unit_of_measure = a.unit_of_measure
+    JOIN regions r ON r.region_id = COALESCE(a.ancestor_id, pl.ancestor_id)
+    ORDER BY r.region_id, product_category, unit_of_measure
+"""
+
+
+def run_rollup(db: Session, scope_filter: str, scope_params: dict, plan_year: int,
+               month: Optional[int], product_category: Optional[str],
+               product_id: Optional[int]) -> List[RegionRollupResponse]:
+    """Execute ROLLUP_SQL for a region scope and period, cached per argument set"""
+
+    def compute():
+        product_conditions = ["TRUE"]
+        params = period_bounds(plan_year, month)
+        params.update(scope_params)
+        if product_category:
+            product_conditions.append("p.product_category = :product_category")
+            params["product_category"] = product_category
+        if product_id:
+            product_conditions.append("p.product_id = :product_id")
+            params["product_id"] = product_id
+
+        query = text(ROLLUP_SQL.format(
+            scope_filter=scope_filter,
+            product_filter=" AND ".join(product_conditions)
+        ))
+        rows = db.execute(query, params).mappings().all()
+        return [
+            RegionRollupResponse(
+                region_id=row["region_id"],
+                region_code=row["region_code"],
+                region_name=row["region_name"],
+                region_type=row["region_type"],
+                product_category=row["product_category"],
+                unit_of_measure=row["unit_of_measure"],
+                plan_year=plan_year,
+                month=month,
+                facility_count=row["facility_count"],
+                actual_quantity=float(row["actual_quantity"]),
+                planned_quantity=float(row["planned_quantity"]) if row["planned_quantity"] is not None else None,
+                completion_percentage=float(row["completion_percentage"]) if row["completion_percentage"] is not None else None
+            )
+            for row in rows
+        ]
+
+    cache_key = ("rollup", scope_filter, tuple(sorted(scope_params.items())),
+                 plan_year, month, product_category, product_id)
+    return analytics_cache.get_or_compute(cache_key, compute)
+
+
+# ============================================================================
+# ROLL-UP ENDPOINTS
+# ============================================================================
+
+@router.get("/rollup", response_model=List[RegionRollupResponse])
+def get_rollup_by_level(
+        level: str = Query("REPUBLIC", description="Hierarchy level (USSR, REPUBLIC, OBLAST)"),
+        plan_year: int = Query(..., ge=1986, le=1990, description="Plan year"),
+        month: Optional[int] = Query(None, ge=1, le=12, description="Restrict to one month"),
+        product_category: Optional[str] = Query(None, description="Filter by category (STEEL, MACHINERY, ARMAMENTS)"),
+        product_id: Optional[int] = Query(None, description="Filter by product"),
+        db: Session = Depends(get_routed_db)
+):
+    """
+    Production and plan completion for every region at one hierarchy level
+
+    Each region includes all facilities in its subtree, e.g. level=REPUBLIC
+    rolls oblast facilities up into their republic.
+    """
+    level = level.upper()
+    if level not in ("USSR", "REPUBLIC", "OBLAST"):
+        raise HTTPException(status_code=400, detail=f"Unknown hierarchy level {level}")
+
+    return run_rollup(db, "anc.region_type = :level", {"level": level},
+                      plan_year, month, product_category, product_id)
+
+
+@router.get("/{region_id}/rollup", response_model=List[RegionRollupResponse])
+def get_region_rollup(
+        region_id: int,
+        plan_year: int = Query(..., ge=1986, le=1990, description="Plan year"),
+        month: Optional[int] = Query(None, ge=1, le=12, description="Restrict to one month"),
+        product_category: Optional[str] = Query(None, description="Filter by category (STEEL, MACHINERY, ARMAMENTS)"),
+        product_id: Optional[int] = Query(None, description="Filter by product"),
+        db: Session = Depends(get_routed_db)
+):
+    """
+    Production and plan completion for one region and everything beneath it
+
+    Example: Ukrainian SSR steel output for 1988 is
+    /regions/3/rollup?plan_year=1988&product_category=STEEL
+    """
+    region_exists = db.execute(
+        text("SELECT 1 FROM regions WHERE region_id = :region_id"),
+        {"region_id": region_id}
+    ).first()
+
+    if not region_exists:
+        raise HTTPException(status_code=404, detail=f"Region {region_id} not found")
+
+    return run_rollup(db, "rc.ancestor_id = :region_id", {"region_id": region_id},
+                      plan_year, month, product_category, product_id)
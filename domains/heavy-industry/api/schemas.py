@@ -60,6 +60,22 @@ class ProductionRecordResponse(BaseModel):
     workers_on_shift: Optional[int] = None
     equipment_downtime_hours: Optional[float] = None
     defect_count: Optional[int] = None
+    facility_id: Optional[int] = None
+    product_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ProductionTargetResponse(BaseModel):
+    target_id: int
+    facility_id: int
+    product_id: int
+    plan_year: int
+    quarter: int
+    month: Optional[int] = None
+    target_quantity: float
+    target_set_date: date
 
     class Config:
         from_attributes = True
@@ -74,6 +90,8 @@ class DailyProductionSummary(BaseModel):
     avg_downtime: Optional[float] = None
     total_defects: int
     shift_count: int
+    rolling_7d_quantity: Optional[float] = None
+    rolling_30d_quantity: Optional[float] = None
 
 
 # ============================================================================
@@ -98,6 +116,30 @@ class FacilityPerformance(BaseModel):
     avg_completion_rate: float
     total_production: float
     avg_quality_score: float
+    facility_id: Optional[int] = None
+    rank: Optional[int] = None
+    rolling_7d_output: Optional[float] = None
+    rolling_30d_output: Optional[float] = None
+    defect_rate: Optional[float] = None
+    total_downtime_hours: Optional[float] = None
+
+
+class PlanCompletionForecast(BaseModel):
+    facility_id: int
+    facility_name: str
+    product_id: int
+    product_name: str
+    plan_year: int
+    as_of: Optional[date] = None  # latest production date the forecast starts from
+    target: float
+    actual_to_date: float
+    profile: str  # learning-curve profile that best fits the actuals
+    runs: int
+    p10_completion: float
+    p50_completion: float
+    p90_completion: float
+    probability_meeting_target: float
+    data_version: str
 
 
 # ============================================================================
@@ -109,6 +151,38 @@ class RegionResponse(BaseModel):
     region_code: str
     region_name: str
     region_type: str
+    parent_region_id: Optional[int] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class RegionRollupResponse(BaseModel):
+    region_id: int
+    region_code: str
+    region_name: str
+    region_type: str
+    product_category: str
+    unit_of_measure: str
+    plan_year: int
+    month: Optional[int] = None
+    facility_count: int
+    actual_quantity: float
+    planned_quantity: Optional[float] = None
+    completion_percentage: Optional[float] = None
+
+
+# ============================================================================
+# AUDIT SCHEMAS
+# ============================================================================
+
+class AuditLogEntry(BaseModel):
+    audit_id: int
+    table_name: str
+    record_id: int
+    operation: str
+    old_values: Optional[dict] = None
+    new_values: Optional[dict] = None
+    changed_by: Optional[str] = None
+    changed_at: datetime
+    source: str  # 'hot' (Postgres partition) or 'archive' (MinIO Parquet)
@@ -0,0 +1,53 @@
+"""
+Fast JSON responses for row-oriented endpoints
+Pyatiletka Project
+
+Query rows are encoded straight to JSON bytes with orjson and returned as a
+Response, which FastAPI sends as-is: no per-row Pydantic models and no second
+validation pass through response_model. The route's response_model still
+drives the OpenAPI schema, and columns are emitted in the schema's field order
+so the payload is identical to the validated path.
+"""
+
+from decimal import Decimal
+from typing import Iterable, List, Sequence, Type
+import os
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+# Set FAST_RESPONSES=false to fall back to Pydantic validation of every response
+FAST_RESPONSES = os.getenv("FAST_RESPONSES", "true").lower() in ("1", "true", "yes")
+
+
+def _default(value):
+    # NUMERIC columns arrive as Decimal; the schemas declare them as float
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def schema_fields(schema: Type[BaseModel], columns: Sequence = None) -> List[str]:
+    """
+    Field names of a response schema in serialization order
+
+    When query columns are given, they must line up with the fields one to one,
+    so a schema change cannot silently shift values into the wrong keys.
+    """
+    fields = list(schema.model_fields)
+    if columns is not None and [column.key for column in columns] != fields:
+        raise ValueError(f"Columns do not match {schema.__name__} fields {fields}")
+    return fields
+
+
+def rows_response(rows: Iterable[Sequence], fields: Sequence[str]) -> Response:
+    """Encode query rows (tuples in fields order) as a JSON array"""
+    body = orjson.dumps([dict(zip(fields, row)) for row in rows], default=_default)
+    return Response(content=body, media_type="application/json")
+
+
+def row_response(row: Sequence, fields: Sequence[str]) -> Response:
+    """Encode a single query row as a JSON object"""
+    body = orjson.dumps(dict(zip(fields, row)), default=_default)
+    return Response(content=body, media_type="application/json")
@@ -120,7 +120,9 @@ CREATE TABLE actual_production (
     CONSTRAINT chk_quality_valid CHECK (quality_grade IN ('A', 'B', 'C')),
     CONSTRAINT chk_workers_positive CHECK (workers_on_shift >= 0),
     CONSTRAINT chk_downtime_valid CHECK (equipment_downtime_hours >= 0 AND equipment_downtime_hours <= 24),
-    CONSTRAINT chk_defects_positive CHECK (defect_count >= 0)
+    CONSTRAINT chk_defects_positive CHECK (defect_count >= 0),
+    -- One report per shift; the data generator upserts on this natural key
+    CONSTRAINT uk_production_shift UNIQUE (facility_id, product_id, production_date, shift_number)
 );
 
 CREATE INDEX idx_production_facility ON actual_production(facility_id);
@@ -166,19 +168,22 @@ CREATE INDEX idx_consumption_type ON resource_consumption(resource_type);
 -- AUDIT TABLE
 -- ============================================================================
 
--- Audit log for all data modifications
+-- Audit log for all data modifications, partitioned by month of changed_at.
+-- Monthly partitions are created ahead of time and archived to MinIO once
+-- they leave the hot window (see 06-audit-log-partitions.sql).
 CREATE TABLE audit_log (
-    audit_id SERIAL PRIMARY KEY,
+    audit_id BIGSERIAL,
     table_name VARCHAR(100) NOT NULL,
     record_id INTEGER NOT NULL,
     operation VARCHAR(20) NOT NULL, -- 'INSERT', 'UPDATE', 'DELETE'
     old_values JSONB,
     new_values JSONB,
     changed_by VARCHAR(255),
-    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (audit_id, changed_at)
+) PARTITION BY RANGE (changed_at);
 
-CREATE INDEX idx_audit_table ON audit_log(table_name);
+CREATE INDEX idx_audit_table ON audit_log(table_name, record_id);
 CREATE INDEX idx_audit_date ON audit_log(changed_at);
 
 -- ============================================================================
@@ -0,0 +1,13 @@
+#!/bin/bash
+# Streaming replication setup for Heavy Industry read replicas
+# Runs once, when the primary data directory is first initialized
+
+set -e
+
+psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<-EOSQL
+    CREATE ROLE ${REPLICATION_USER:-replicator} WITH REPLICATION LOGIN PASSWORD '${REPLICATION_PASSWORD:-replicator_pass}';
+    SELECT pg_create_physical_replication_slot('heavy_industry_replica_1');
+EOSQL
+
+# Allow replicas on the compose network to stream WAL
+echo "host replication ${REPLICATION_USER:-replicator} all scram-sha-256" >> "$PGDATA/pg_hba.conf"
@@ -0,0 +1,108 @@
+-- Region Hierarchy Closure Table
+-- Gosplan Data Mesh Project
+-- Database: heavy_industry
+--
+-- Every (ancestor, descendant) pair in the USSR → Republic → Oblast tree, including
+-- each region paired with itself at depth 0. Roll-ups at any level become a single
+-- indexed join instead of a recursive CTE per request.
+-- Safe to re-run against an existing database.
+
+-- ============================================================================
+-- CLOSURE TABLE
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS region_closure (
+    ancestor_id INTEGER NOT NULL REFERENCES regions(region_id) ON DELETE CASCADE,
+    descendant_id INTEGER NOT NULL REFERENCES regions(region_id) ON DELETE CASCADE,
+    depth INTEGER NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id),
+    CONSTRAINT chk_closure_depth CHECK (depth >= 0)
+);
+
+CREATE INDEX IF NOT EXISTS idx_region_closure_descendant ON region_closure(descendant_id, ancestor_id);
+
+-- Roll-ups join facilities → production by facility and date range
+CREATE INDEX IF NOT EXISTS idx_production_facility_date
+    ON actual_production(facility_id, production_date) INCLUDE (product_id, quantity_produced);
+
+-- ============================================================================
+-- MAINTENANCE TRIGGERS
+-- ============================================================================
+
+-- New region: copy the parent's ancestor paths one level deeper, plus the self path
+CREATE OR REPLACE FUNCTION region_closure_on_insert() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO region_closure (ancestor_id, descendant_id, depth)
+    SELECT ancestor_id, NEW.region_id, depth + 1
+    FROM region_closure
+    WHERE descendant_id = NEW.parent_region_id
+    UNION ALL
+    SELECT NEW.region_id, NEW.region_id, 0;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Re-parented region: detach its subtree from the old ancestors, attach it under the new parent
+CREATE OR REPLACE FUNCTION region_closure_on_move() RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM region_closure
+        WHERE ancestor_id = NEW.region_id AND descendant_id = NEW.parent_region_id
+    ) THEN
+        RAISE EXCEPTION 'Region % cannot be moved under its own descendant %',
+            NEW.region_id, NEW.parent_region_id;
+    END IF;
+
+    DELETE FROM region_closure c
+    WHERE c.descendant_id IN (
+            SELECT descendant_id FROM region_closure WHERE ancestor_id = NEW.region_id
+        )
+      AND c.ancestor_id NOT IN (
+            SELECT descendant_id FROM region_closure WHERE ancestor_id = NEW.region_id
+        );
+
+    INSERT INTO region_closure (ancestor_id, descendant_id, depth)
+    SELECT above.ancestor_id, below.descendant_id, above.depth + below.depth + 1
+    FROM region_closure above
+    CROSS JOIN region_closure below
+    WHERE above.descendant_id = NEW.parent_region_id
+      AND below.ancestor_id = NEW.region_id;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_region_closure_insert ON regions;
+CREATE TRIGGER trg_region_closure_insert
+    AFTER INSERT ON regions
+    FOR EACH ROW EXECUTE FUNCTION region_closure_on_insert();
+
+DROP TRIGGER IF EXISTS trg_region_closure_move ON regions;
+CREATE TRIGGER trg_region_closure_move
+    AFTER UPDATE OF parent_region_id ON regions
+    FOR EACH ROW
+    WHEN (OLD.parent_region_id IS DISTINCT FROM NEW.parent_region_id)
+    EXECUTE FUNCTION region_closure_on_move();
+
+-- Deletes need no trigger: ON DELETE CASCADE removes every path through the region
+
+-- ============================================================================
+-- BACKFILL EXISTING REGIONS
+-- ============================================================================
+
+INSERT INTO region_closure (ancestor_id, descendant_id, depth)
+WITH RECURSIVE paths AS (
+    SELECT region_id AS ancestor_id, region_id AS descendant_id, 0 AS depth
+    FROM regions
+    UNION ALL
+    SELECT p.ancestor_id, r.region_id, p.depth + 1
+    FROM paths p
+    JOIN regions r ON r.parent_region_id = p.descendant_id
+)
+SELECT ancestor_id, descendant_id, depth FROM paths
+ON CONFLICT (ancestor_id, descendant_id) DO NOTHING;
+
+COMMENT ON TABLE region_closure IS 'Closure of the region hierarchy: every ancestor/descendant pair with its depth';
+
+GRANT SELECT ON region_closure TO heavy_industry_user;
@@ -0,0 +1,91 @@
+-- Live Production Notifications
+-- Gosplan Data Mesh Project
+-- Database: heavy_industry
+--
+-- Publishes every new or corrected shift report on the 'production_events'
+-- channel. The API holds one LISTEN connection per process and fans events out
+-- to its live feed subscribers. Safe to re-run against an existing database.
+--
+-- The triggers are statement-level with transition tables, so a bulk load
+-- costs one facilities join per statement rather than one lookup per row.
+-- Rows are published in JSON arrays of up to 20 events, well under the 8000
+-- byte NOTIFY payload limit. Updates that leave the reported figures unchanged
+-- (e.g. an ON CONFLICT DO UPDATE rerun of the data generator) are not
+-- published at all.
+
+DROP TRIGGER IF EXISTS trg_production_notify ON actual_production;
+DROP FUNCTION IF EXISTS notify_production_event();
+
+-- Send events in chunks of 20 per notification
+CREATE OR REPLACE FUNCTION publish_production_events(events JSON[]) RETURNS VOID AS $$
+BEGIN
+    FOR i IN 1..COALESCE(array_length(events, 1), 0) BY 20 LOOP
+        PERFORM pg_notify('production_events', array_to_json(events[i:i + 19])::text);
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION notify_production_inserts() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM publish_production_events(ARRAY(
+        SELECT json_build_object(
+            'operation', 'INSERT',
+            'production_id', n.production_id,
+            'facility_id', n.facility_id,
+            'product_id', n.product_id,
+            'region_id', f.region_id,
+            'production_date', n.production_date,
+            'shift_number', n.shift_number,
+            'quantity_produced', n.quantity_produced,
+            'quality_grade', n.quality_grade,
+            'defect_count', n.defect_count,
+            'equipment_downtime_hours', n.equipment_downtime_hours
+        )
+        FROM new_rows n
+        JOIN facilities f ON f.facility_id = n.facility_id
+        ORDER BY n.production_id
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION notify_production_updates() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM publish_production_events(ARRAY(
+        SELECT json_build_object(
+            'operation', 'UPDATE',
+            'production_id', n.production_id,
+            'facility_id', n.facility_id,
+            'product_id', n.product_id,
+            'region_id', f.region_id,
+            'production_date', n.production_date,
+            'shift_number', n.shift_number,
+            'quantity_produced', n.quantity_produced,
+            'quality_grade', n.quality_grade,
+            'defect_count', n.defect_count,
+            'equipment_downtime_hours', n.equipment_downtime_hours
+        )
+        FROM new_rows n
+        JOIN old_rows o ON o.production_id = n.production_id
+        JOIN facilities f ON f.facility_id = n.facility_id
+        WHERE (o.quantity_produced, o.quality_grade, o.defect_count, o.equipment_downtime_hours)
+              IS DISTINCT FROM (n.quantity_produced, n.quality_grade, n.defect_count, n.equipment_downtime_hours)
+        ORDER BY n.production_id
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_production_notify_insert ON actual_production;
+CREATE TRIGGER trg_production_notify_insert
+    AFTER INSERT ON actual_production
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_production_inserts();
+
+-- Transition tables cannot be combined with an UPDATE OF column list, so
+-- unchanged rows are filtered in the function instead
+DROP TRIGGER IF EXISTS trg_production_notify_update ON actual_production;
+CREATE TRIGGER trg_production_notify_update
+    AFTER UPDATE ON actual_production
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_production_updates();
@@ -0,0 +1,80 @@
+-- Audit Log Partition Management
+-- Gosplan Data Mesh Project
+-- Database: heavy_industry
+--
+-- audit_log is range-partitioned by month (audit_log_yYYYYmMM). Upcoming
+-- partitions are created ahead of time by create_audit_log_partitions(), which
+-- the heavy_industry_audit_maintenance DAG calls daily; anything that still
+-- falls outside them lands in audit_log_default. Partitions older than the hot
+-- window are exported to MinIO as Parquet, recorded in audit_log_archive, then
+-- detached and dropped, so retention never needs a bulk DELETE.
+-- Safe to re-run against an existing database.
+
+-- ============================================================================
+-- ARCHIVE CATALOG
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS audit_log_archive (
+    partition_name VARCHAR(63) PRIMARY KEY,
+    range_start TIMESTAMP NOT NULL,
+    range_end TIMESTAMP NOT NULL,
+    bucket VARCHAR(63) NOT NULL,
+    object_name TEXT NOT NULL,
+    row_count BIGINT NOT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_audit_archive_range ON audit_log_archive(range_start, range_end);
+
+-- ============================================================================
+-- PARTITION CREATION
+-- ============================================================================
+
+-- Create the partition for one month if it does not exist yet. Rows already
+-- sitting in the default partition for that month are moved into it, since
+-- Postgres refuses to add a partition that the default partition overlaps.
+CREATE OR REPLACE FUNCTION create_audit_log_partition(month_start DATE) RETURNS BOOLEAN AS $$
+DECLARE
+    range_start DATE := date_trunc('month', month_start)::date;
+    range_end DATE := (date_trunc('month', month_start) + INTERVAL '1 month')::date;
+    partition_name TEXT := format('audit_log_y%sm%s', to_char(range_start, 'YYYY'), to_char(range_start, 'MM'));
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE audit_log INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name);
+
+    IF to_regclass('audit_log_default') IS NOT NULL THEN
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM audit_log_default WHERE changed_at >= %L AND changed_at < %L RETURNING *) '
+            'INSERT INTO %I SELECT * FROM moved',
+            range_start, range_end, partition_name
+        );
+    END IF;
+
+    EXECUTE format(
+        'ALTER TABLE audit_log ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, range_start, range_end
+    );
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Make sure the current month and the next months_ahead months have partitions
+CREATE OR REPLACE FUNCTION create_audit_log_partitions(months_ahead INTEGER DEFAULT 3) RETURNS INTEGER AS $$
+DECLARE
+    created INTEGER := 0;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        IF create_audit_log_partition((date_trunc('month', CURRENT_DATE) + make_interval(months => i))::date) THEN
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TABLE IF NOT EXISTS audit_log_default PARTITION OF audit_log DEFAULT;
+
+SELECT create_audit_log_partitions(3);
@@ -0,0 +1,40 @@
+-- Data Version Counters
+-- Gosplan Data Mesh Project
+-- Database: heavy_industry
+--
+-- One counter per table, bumped once per statement that writes to it. Caches
+-- keyed on these (e.g. the plan-completion forecasts) can check for new or
+-- corrected data with a primary-key lookup instead of scanning the table, and
+-- the counters replicate to the read replicas with the data they describe.
+-- Safe to re-run against an existing database.
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name VARCHAR(100) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO data_versions (table_name)
+VALUES ('actual_production'), ('production_targets')
+ON CONFLICT (table_name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE data_versions
+    SET version = version + 1, changed_at = CURRENT_TIMESTAMP
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_data_version ON actual_production;
+CREATE TRIGGER trg_data_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON actual_production
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+
+DROP TRIGGER IF EXISTS trg_data_version ON production_targets;
+CREATE TRIGGER trg_data_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON production_targets
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+
+GRANT SELECT ON data_versions TO heavy_industry_user;
@@ -0,0 +1,31 @@
+#!/bin/bash
+# Heavy Industry read replica entrypoint
+# Clones the primary with pg_basebackup on first start, then runs as a hot standby
+
+set -e
+
+PGDATA=${PGDATA:-/var/lib/postgresql/data}
+
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+    echo "Cloning primary ${PRIMARY_HOST}:${PRIMARY_PORT:-5432}..."
+    until pg_basebackup \
+        --pgdata="$PGDATA" \
+        --host="$PRIMARY_HOST" \
+        --port="${PRIMARY_PORT:-5432}" \
+        --username="$REPLICATION_USER" \
+        --slot="$REPLICATION_SLOT" \
+        --wal-method=stream \
+        --write-recovery-conf \
+        --progress
+    do
+        echo "Waiting for primary to accept replication connections..."
+        rm -rf "${PGDATA:?}"/*
+        sleep 2
+    done
+    chmod 0700 "$PGDATA"
+fi
+
+exec postgres \
+    -c hot_standby=on \
+    -c hot_standby_feedback=on \
+    -c max_standby_streaming_delay=30s
@@ -0,0 +1,75 @@
+"""
+Heavy Industry Audit Log Maintenance
+Pyatiletka Project
+
+Daily retention for the partitioned audit_log table:
+
+ensure_partitions → upcoming monthly partitions created ahead of time
+archive_partitions → partitions past the hot window exported to MinIO as Parquet, then dropped
+
+Retention is a partition drop, never a bulk DELETE. See plugins/audit_archive.py.
+"""
+
+from datetime import datetime, timedelta
+import os
+
+from airflow.decorators import dag, task
+from minio import Minio
+
+from audit_archive import archive_expired_partitions, ensure_partitions
+
+# Configuration
+MINIO_ENDPOINT = os.getenv('MINIO_ENDPOINT', 'minio:9000')
+MINIO_ACCESS_KEY = os.getenv('MINIO_ACCESS_KEY', 'minio_admin')
+MINIO_SECRET_KEY = os.getenv('MINIO_SECRET_KEY', 'minio_password')
+
+default_args = {
+    'owner': 'pyatiletka',
+    'depends_on_past': False,
+    'email_on_failure': False,
+    'email_on_retry': False,
+    'retries': 1,
+    'retry_delay': timedelta(minutes=10),
+}
+
+
+def get_minio_client():
+    """Create MinIO client"""
+    return Minio(
+        MINIO_ENDPOINT,
+        access_key=MINIO_ACCESS_KEY,
+        secret_key=MINIO_SECRET_KEY,
+        secure=False  # Use HTTP (not HTTPS) for local development
+    )
+
+
+@dag(
+    dag_id='heavy_industry_audit_maintenance',
+    default_args=default_args,
+    description='Create upcoming audit_log partitions and archive expired ones to MinIO',
+    schedule='@daily',
+    start_date=datetime(2024, 1, 1),
+    catchup=False,
+    max_active_runs=1,
+    tags=['heavy-industry', 'audit', 'maintenance'],
+)
+def heavy_industry_audit_maintenance():
+
+    @task
+    def create_partitions() -> int:
+        """
+        Make sure writes for the coming months land in their own partition
+        """
+        return ensure_partitions()
+
+    @task
+    def archive_partitions(**context) -> list:
+        """
+        Move partitions that left the hot window to the archive bucket
+        """
+        return archive_expired_partitions(get_minio_client(), context=context)
+
+    create_partitions() >> archive_partitions()
+
+
+heavy_industry_audit_maintenance()
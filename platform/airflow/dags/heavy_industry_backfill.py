@@ -0,0 +1,320 @@
+"""
+Heavy Industry Bronze Backfill
+Pyatiletka Project
+
+Rebuilds the bronze fact tables for the 1986-1990 plan period in parallel:
+
+snapshot_dimensions → plan_partitions → backfill_partition × (table, year, month) → commit_manifests
+
+Each mapped task extracts one month of one table from the Heavy Industry API
+(keyset-paginated), validates it against the dimension snapshot and writes a
+bronze object named after the DAG run, so any task can be retried or the whole
+DAG re-run without duplicating data. Concurrency is bounded by the
+heavy_industry_backfill pool. Manifests are only committed once every partition
+has succeeded, and the objects they stop listing are deleted after that, so
+readers never see a half-finished backfill.
+
+Trigger with a config to limit the range, e.g.
+    {"start_year": 1987, "end_year": 1987, "tables": ["actual_production"]}
+"""
+
+from datetime import datetime, timedelta
+from io import BytesIO
+import os
+
+from airflow.decorators import dag, task
+import requests
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from minio import Minio
+
+from bronze_manifest import commit_manifest, partition_key, partition_object
+from bronze_quality import BRONZE_BUCKET, check_partition
+from etl_telemetry import stage
+
+# Configuration
+HEAVY_INDUSTRY_API_URL = os.getenv('HEAVY_INDUSTRY_API_URL', 'http://heavy-industry-api:8000')
+MINIO_ENDPOINT = os.getenv('MINIO_ENDPOINT', 'minio:9000')
+MINIO_ACCESS_KEY = os.getenv('MINIO_ACCESS_KEY', 'minio_admin')
+MINIO_SECRET_KEY = os.getenv('MINIO_SECRET_KEY', 'minio_password')
+
+BACKFILL_POOL = 'heavy_industry_backfill'
+PAGE_SIZE = int(os.getenv('BACKFILL_PAGE_SIZE', '10000'))
+PLAN_YEARS = (1986, 1990)
+
+# Fact tables: API endpoint, keyset column and bronze schema
+FACT_TABLES = {
+    'actual_production': {
+        'endpoint': 'production',
+        'key': 'production_id',
+        'schema': pa.schema([
+            ('production_id', pa.int64()),
+            ('facility_id', pa.int64()),
+            ('product_id', pa.int64()),
+            ('facility_name', pa.string()),
+            ('product_name', pa.string()),
+            ('production_date', pa.date32()),
+            ('quantity_produced', pa.float64()),
+            ('quality_grade', pa.string()),
+            ('shift_number', pa.int64()),
+            ('workers_on_shift', pa.int64()),
+            ('equipment_downtime_hours', pa.float64()),
+            ('defect_count', pa.int64()),
+        ]),
+    },
+    'production_targets': {
+        'endpoint': 'targets',
+        'key': 'target_id',
+        'schema': pa.schema([
+            ('target_id', pa.int64()),
+            ('facility_id', pa.int64()),
+            ('product_id', pa.int64()),
+            ('plan_year', pa.int64()),
+            ('quarter', pa.int64()),
+            ('month', pa.int64()),
+            ('target_quantity', pa.float64()),
+            ('target_set_date', pa.date32()),
+        ]),
+    },
+}
+
+# Dimensions snapshotted at the start of the run, in reference order, with the
+# page size of endpoints that page by skip/limit (None: one unpaged response)
+DIMENSIONS = [
+    ('regions', '/regions', None),
+    ('products', '/products', None),
+    ('facilities', '/facilities', 500),
+]
+# Dimension keys the fact tables reference
+DIMENSION_KEYS = {'facilities': 'facility_id', 'products': 'product_id'}
+
+default_args = {
+    'owner': 'pyatiletka',
+    'depends_on_past': False,
+    'email_on_failure': False,
+    'email_on_retry': False,
+    'retries': 2,
+    'retry_delay': timedelta(minutes=2),
+}
+
+
+def get_minio_client():
+    """Create MinIO client"""
+    return Minio(
+        MINIO_ENDPOINT,
+        access_key=MINIO_ACCESS_KEY,
+        secret_key=MINIO_SECRET_KEY,
+        secure=False  # Use HTTP (not HTTPS) for local development
+    )
+
+
+def records_to_table(records, schema: pa.Schema) -> pa.Table:
+    """Arrow table with a fixed schema, so every partition of a table is identical in layout"""
+    if not records:
+        return schema.empty_table()
+
+    inferred = pa.Table.from_pylist(records)
+    columns = []
+    for field in schema:
+        if field.name not in inferred.column_names:
+            columns.append(pa.nulls(inferred.num_rows, field.type))
+        elif pa.types.is_date(field.type):
+            # JSON carries dates as ISO strings
+            parsed = pc.strptime(inferred.column(field.name), format='%Y-%m-%d', unit='s')
+            columns.append(pc.cast(parsed, field.type))
+        else:
+            columns.append(pc.cast(inferred.column(field.name), field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def put_parquet(minio_client, table: pa.Table, object_name: str) -> str:
+    """Write a table as one Parquet object and return its ETag"""
+    buffer = BytesIO()
+    pq.write_table(table, buffer)
+    length = buffer.tell()
+    buffer.seek(0)
+    result = minio_client.put_object(
+        bucket_name=BRONZE_BUCKET,
+        object_name=object_name,
+        data=buffer,
+        length=length,
+        content_type='application/octet-stream'
+    )
+    return result.etag
+
+
+def read_parquet(minio_client, object_name: str, columns=None) -> pa.Table:
+    response = minio_client.get_object(BRONZE_BUCKET, object_name)
+    try:
+        return pq.read_table(BytesIO(response.read()), columns=columns)
+    finally:
+        response.close()
+        response.release_conn()
+
+
+@dag(
+    dag_id='heavy_industry_backfill',
+    default_args=default_args,
+    description='Parallel (table, year, month) rebuild of the Heavy Industry bronze fact tables',
+    schedule=None,  # Triggered manually
+    start_date=datetime(2024, 1, 1),
+    catchup=False,
+    max_active_runs=1,
+    params={
+        'start_year': PLAN_YEARS[0],
+        'end_year': PLAN_YEARS[1],
+        'tables': list(FACT_TABLES),
+    },
+    tags=['heavy-industry', 'bronze', 'backfill'],
+)
+def heavy_industry_backfill():
+
+    @task
+    def snapshot_dimensions(**context) -> dict:
+        """
+        Extract and validate the dimensions once, for every partition to check against
+        """
+        minio_client = get_minio_client()
+        snapshot_date = context['ds']
+        snapshots, objects = {}, {}
+
+        for table_name, path, page_size in DIMENSIONS:
+            records = []
+            with stage("extract", context, table=table_name) as stats:
+                with requests.Session() as session:
+                    while True:
+                        params = {'skip': len(records), 'limit': page_size} if page_size else None
+                        response = session.get(f"{HEAVY_INDUSTRY_API_URL}{path}", params=params, timeout=60)
+                        response.raise_for_status()
+                        page = response.json()
+                        records.extend(page)
+                        stats.bytes += len(response.content)
+                        # A short page is the last one
+                        if not page_size or len(page) < page_size:
+                            break
+                stats.rows = len(records)
+
+            table = check_partition(
+                minio_client, table_name, pa.Table.from_pylist(records), snapshot_date,
+                context=context, reference_tables=snapshots
+            )
+            snapshots[table_name] = table
+
+            object_name = f'heavy_industry/{table_name}/{snapshot_date}/{table_name}.parquet'
+            with stage("upload", context, object_name=object_name) as stats:
+                put_parquet(minio_client, table, object_name)
+                stats.rows = table.num_rows
+            objects[table_name] = object_name
+
+        return objects
+
+    @task
+    def plan_partitions(**context) -> list:
+        """
+        One partition per (table, year, month) in the requested range
+        """
+        params = context['params']
+        start_year = max(int(params['start_year']), PLAN_YEARS[0])
+        end_year = min(int(params['end_year']), PLAN_YEARS[1])
+        unknown = set(params['tables']) - set(FACT_TABLES)
+        if unknown:
+            raise ValueError(f"Unknown tables {sorted(unknown)}; choose from {sorted(FACT_TABLES)}")
+
+        return [
+            {'table': table_name, 'year': year, 'month': month}
+            for table_name in params['tables']
+            for year in range(start_year, end_year + 1)
+            for month in range(1, 13)
+        ]
+
+    @task(pool=BACKFILL_POOL)
+    def backfill_partition(partition: dict, dimensions: dict, **context) -> dict:
+        """
+        Extract, validate and write one bronze partition, replacing any previous version
+        """
+        table_name, year, month = partition['table'], partition['year'], partition['month']
+        spec = FACT_TABLES[table_name]
+        key = partition_key(year, month)
+        object_name = partition_object(table_name, year, month, context['run_id'])
+
+        records, after_id = [], 0
+        with stage("extract", context, table=table_name, partition=key) as stats:
+            with requests.Session() as session:
+                while True:
+                    response = session.get(
+                        f"{HEAVY_INDUSTRY_API_URL}/{spec['endpoint']}",
+                        params={'plan_year': year, 'month': month, 'after_id': after_id, 'limit': PAGE_SIZE},
+                        timeout=120
+                    )
+                    response.raise_for_status()
+                    page = response.json()
+                    records.extend(page)
+                    stats.bytes += len(response.content)
+                    if len(page) < PAGE_SIZE:
+                        break
+                    after_id = page[-1][spec['key']]
+            stats.rows = len(records)
+
+        with stage("serialize", context, table=table_name, partition=key) as stats:
+            table = records_to_table(records, spec['schema'])
+            stats.rows = table.num_rows
+            stats.bytes = table.nbytes
+
+        minio_client = get_minio_client()
+        references = {
+            name: read_parquet(minio_client, dimensions[name], columns=[column])
+            for name, column in DIMENSION_KEYS.items()
+        }
+        table = check_partition(minio_client, table_name, table, key, context=context, reference_tables=references)
+
+        with stage("upload", context, object_name=object_name) as stats:
+            if table.num_rows:
+                put_parquet(minio_client, table, object_name)
+            stats.rows = table.num_rows
+
+        # The new object replaces the whole partition: the previous run's object, files compaction
+        # may have left and objects of failed runs. They are only removed by commit_manifests,
+        # once the manifest no longer lists them, so readers never see this run's data early.
+        objects = [object_name] if table.num_rows else []
+        partition_prefix = object_name.rsplit('/', 1)[0] + '/'
+        stale = [
+            obj.object_name for obj in minio_client.list_objects(BRONZE_BUCKET, prefix=partition_prefix)
+            if obj.object_name not in objects
+        ]
+
+        return {
+            'table': table_name,
+            'partition': key,
+            'objects': objects,
+            'rows': table.num_rows,
+            'stale': stale,
+        }
+
+    @task
+    def commit_manifests(results, **context):
+        """
+        Publish the new partitions to readers, one manifest per table
+        """
+        minio_client = get_minio_client()
+        by_table = {}
+        for result in results:
+            by_table.setdefault(result['table'], []).append(result)
+
+        for table_name, partitions in by_table.items():
+            manifest = commit_manifest(minio_client, table_name, partitions, context['run_id'])
+            print(f"Committed manifest for {table_name}: {len(manifest['partitions'])} partitions, "
+                  f"{manifest['total_rows']} rows")
+
+            # Replaced objects are only removed once the manifest points at their replacements
+            stale = [name for partition in partitions for name in partition['stale']]
+            for object_name in stale:
+                minio_client.remove_object(BRONZE_BUCKET, object_name)
+            print(f"Removed {len(stale)} replaced objects from {table_name}")
+
+    dimensions = snapshot_dimensions()
+    results = backfill_partition.partial(dimensions=dimensions).expand(partition=plan_partitions())
+    commit_manifests(results)
+
+
+heavy_industry_backfill()
@@ -0,0 +1,77 @@
+"""
+Heavy Industry Bronze Maintenance
+Pyatiletka Project
+
+Weekly housekeeping of the bronze layer:
+
+dedup_snapshots × dimension    → identical daily snapshots collapsed into validity ranges
+compact_partitions × fact table → small files merged into target-sized files
+
+Both publish table manifests under heavy_industry/_manifests/, which readers
+use instead of listing prefixes.
+"""
+
+from datetime import datetime, timedelta
+import os
+
+from airflow.decorators import dag, task
+from minio import Minio
+
+from bronze_compaction import PARTITIONED_TABLES, SNAPSHOT_TABLES, compact_table, deduplicate_snapshots
+
+# Configuration
+MINIO_ENDPOINT = os.getenv('MINIO_ENDPOINT', 'minio:9000')
+MINIO_ACCESS_KEY = os.getenv('MINIO_ACCESS_KEY', 'minio_admin')
+MINIO_SECRET_KEY = os.getenv('MINIO_SECRET_KEY', 'minio_password')
+
+default_args = {
+    'owner': 'pyatiletka',
+    'depends_on_past': False,
+    'email_on_failure': False,
+    'email_on_retry': False,
+    'retries': 1,
+    'retry_delay': timedelta(minutes=10),
+}
+
+
+def get_minio_client():
+    """Create MinIO client"""
+    return Minio(
+        MINIO_ENDPOINT,
+        access_key=MINIO_ACCESS_KEY,
+        secret_key=MINIO_SECRET_KEY,
+        secure=False  # Use HTTP (not HTTPS) for local development
+    )
+
+
+@dag(
+    dag_id='heavy_industry_bronze_maintenance',
+    default_args=default_args,
+    description='Deduplicate dimension snapshots and compact fact partitions in the bronze layer',
+    schedule='@weekly',
+    start_date=datetime(2024, 1, 1),
+    catchup=False,
+    max_active_runs=1,
+    tags=['heavy-industry', 'bronze', 'maintenance'],
+)
+def heavy_industry_bronze_maintenance():
+
+    @task
+    def dedup_snapshots(table_name: str, **context) -> dict:
+        """
+        Keep one snapshot per distinct version of a dimension
+        """
+        return deduplicate_snapshots(get_minio_client(), table_name, context['run_id'], context=context)
+
+    @task
+    def compact_partitions(table_name: str, **context) -> dict:
+        """
+        Merge fragmented partitions of a fact table
+        """
+        return compact_table(get_minio_client(), table_name, context['run_id'], context=context)
+
+    dedup_snapshots.expand(table_name=list(SNAPSHOT_TABLES))
+    compact_partitions.expand(table_name=PARTITIONED_TABLES)
+
+
+heavy_industry_bronze_maintenance()
@@ -2,7 +2,8 @@
 Heavy Industry ETL Pipeline
 Pyatiletka Project
 
-Extracts data from Heavy Industry API → Writes to MinIO as Parquet
+Extracts data from Heavy Industry API → Validates → Writes to MinIO as Parquet
+→ Records each dimension snapshot in its bronze manifest
 """
 
 from datetime import timedelta
@@ -17,6 +18,10 @@ from minio import Minio
 from io import BytesIO
 import os
 
+from bronze_compaction import record_snapshot
+from bronze_quality import check_partition
+from etl_telemetry import stage
+
 # Configuration
 HEAVY_INDUSTRY_API_URL = os.getenv('HEAVY_INDUSTRY_API_URL', 'http://heavy-industry-api:8000')
 MINIO_ENDPOINT = os.getenv('MINIO_ENDPOINT', 'minio:9000')
@@ -61,10 +66,14 @@ def extract_facilities(**context):
     """
     print(f"Extracting facilities from {HEAVY_INDUSTRY_API_URL}/facilities")
 
-    response = requests.get(f"{HEAVY_INDUSTRY_API_URL}/facilities")
-    response.raise_for_status()
+    with stage("extract", context, table="facilities") as stats:
+        response = requests.get(f"{HEAVY_INDUSTRY_API_URL}/facilities")
+        response.raise_for_status()
+
+        data = response.json()
+        stats.rows = len(data)
+        stats.bytes = len(response.content)
 
-    data = response.json()
     print(f"Extracted {len(data)} facilities")
 
     # Push to XCom for next task
@@ -78,10 +87,14 @@ def extract_products(**context):
     """
     print(f"Extracting products from {HEAVY_INDUSTRY_API_URL}/products")
 
-    response = requests.get(f"{HEAVY_INDUSTRY_API_URL}/products")
-    response.raise_for_status()
+    with stage("extract", context, table="products") as stats:
+        response = requests.get(f"{HEAVY_INDUSTRY_API_URL}/products")
+        response.raise_for_status()
+
+        data = response.json()
+        stats.rows = len(data)
+        stats.bytes = len(response.content)
 
-    data = response.json()
     print(f"Extracted {len(data)} products")
 
     context['task_instance'].xcom_push(key='products_data', value=data)
@@ -94,10 +107,14 @@ def extract_regions(**context):
     """
     print(f"Extracting regions from {HEAVY_INDUSTRY_API_URL}/regions")
 
-    response = requests.get(f"{HEAVY_INDUSTRY_API_URL}/regions")
-    response.raise_for_status()
+    with stage("extract", context, table="regions") as stats:
+        response = requests.get(f"{HEAVY_INDUSTRY_API_URL}/regions")
+        response.raise_for_status()
+
+        data = response.json()
+        stats.rows = len(data)
+        stats.bytes = len(response.content)
 
-    data = response.json()
     print(f"Extracted {len(data)} regions")
 
     context['task_instance'].xcom_push(key='regions_data', value=data)
@@ -119,38 +136,50 @@ def load_to_bronze(**context):
     # Initialize MinIO client
     minio_client = get_minio_client()
 
-    # Helper function to write DataFrame to MinIO as Parquet
-    def write_to_minio(df, object_name):
-        # Convert DataFrame to Parquet in memory
-        buffer = BytesIO()
-        table = pa.Table.from_pandas(df)
-        pq.write_table(table, buffer)
-        buffer.seek(0)
+    # Helper function to convert records to an Arrow table
+    def to_arrow(records, table_name):
+        with stage("serialize", context, table=table_name) as stats:
+            table = pa.Table.from_pandas(pd.DataFrame(records), preserve_index=False)
+            stats.rows = table.num_rows
+            stats.bytes = table.nbytes
+        return table
+
+    # Helper function to write an Arrow table to MinIO as Parquet
+    def write_to_minio(table, object_name):
+        with stage("parquet_write", context, object_name=object_name) as stats:
+            buffer = BytesIO()
+            pq.write_table(table, buffer)
+            buffer.seek(0)
+            stats.rows = table.num_rows
+            stats.bytes = buffer.getbuffer().nbytes
 
         # Upload to MinIO
-        minio_client.put_object(
-            bucket_name='bronze',
-            object_name=object_name,
-            data=buffer,
-            length=buffer.getbuffer().nbytes,
-            content_type='application/octet-stream'
-        )
+        with stage("upload", context, object_name=object_name) as stats:
+            minio_client.put_object(
+                bucket_name='bronze',
+                object_name=object_name,
+                data=buffer,
+                length=buffer.getbuffer().nbytes,
+                content_type='application/octet-stream'
+            )
+            stats.rows = table.num_rows
+            stats.bytes = buffer.getbuffer().nbytes
         print(f"Uploaded {object_name} to bronze bucket")
 
-    # Write facilities
-    if facilities:
-        df_facilities = pd.DataFrame(facilities)
-        write_to_minio(df_facilities, f'heavy_industry/facilities/{execution_date}/facilities.parquet')
-
-    # Write products
-    if products:
-        df_products = pd.DataFrame(products)
-        write_to_minio(df_products, f'heavy_industry/products/{execution_date}/products.parquet')
-
-    # Write regions
-    if regions:
-        df_regions = pd.DataFrame(regions)
-        write_to_minio(df_regions, f'heavy_industry/regions/{execution_date}/regions.parquet')
+    # Validate and write each table; regions go first so facilities can be checked against them
+    snapshots = {}
+    for table_name, records in [('regions', regions), ('products', products), ('facilities', facilities)]:
+        if not records:
+            continue
+        table = check_partition(
+            minio_client, table_name, to_arrow(records, table_name), execution_date,
+            context=context, reference_tables=snapshots
+        )
+        snapshots[table_name] = table
+        object_name = f'heavy_industry/{table_name}/{execution_date}/{table_name}.parquet'
+        write_to_minio(table, object_name)
+        # Readers find snapshots through the manifest, not by listing dated prefixes
+        record_snapshot(minio_client, table_name, object_name, execution_date, context['run_id'])
 
     print(f"Successfully loaded all data to bronze layer for {execution_date}")
 
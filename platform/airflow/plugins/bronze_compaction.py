@@ -0,0 +1,308 @@
+"""
+Bronze compaction and snapshot deduplication
+Pyatiletka Project
+
+The daily pipeline writes a full snapshot of every dimension under a dated
+prefix, and most days nothing has changed. Fact partitions can also collect
+several small files. Both slow readers down, which spend their time listing
+and opening tiny objects. This maintenance pass:
+
+- hashes the content of each dimension snapshot and keeps only the first of a
+  run of identical snapshots; the manifest records a validity range
+  [valid_from, valid_to) for each distinct version
+- rewrites fact partitions holding several small files into files of about
+  COMPACTION_TARGET_BYTES
+- publishes the result in the table manifests (see bronze_manifest)
+
+The daily load records each new dimension snapshot with record_snapshot, so
+the manifest is current between maintenance runs; deduplication rebuilds the
+versions from the full listing and removes the redundant files.
+
+New objects and the manifest are written before anything is deleted.
+Snapshots younger than DEDUP_MIN_AGE_DAYS are never removed, because running
+pipelines may still read them.
+"""
+
+import hashlib
+import math
+import os
+from collections import defaultdict
+from datetime import date, timedelta
+from io import BytesIO
+from typing import Dict, List
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from bronze_manifest import read_manifest, run_tag, write_manifest
+from bronze_quality import BRONZE_BUCKET, DOMAIN_PREFIX
+from etl_telemetry import stage
+
+COMPACTION_TARGET_BYTES = int(os.getenv('COMPACTION_TARGET_BYTES', str(128 * 1024 * 1024)))
+# Files below this size make a partition worth compacting
+COMPACTION_SMALL_FILE_BYTES = int(os.getenv('COMPACTION_SMALL_FILE_BYTES', str(32 * 1024 * 1024)))
+DEDUP_MIN_AGE_DAYS = int(os.getenv('DEDUP_MIN_AGE_DAYS', '7'))
+
+# Dimension snapshots and the key that orders their rows for hashing
+SNAPSHOT_TABLES = {
+    'regions': 'region_id',
+    'products': 'product_id',
+    'facilities': 'facility_id',
+}
+# Fact tables written as year=/month= partitions by the backfill
+PARTITIONED_TABLES = ['actual_production', 'production_targets']
+
+
+def _read_parquet(minio_client, object_name: str) -> pa.Table:
+    response = minio_client.get_object(BRONZE_BUCKET, object_name)
+    try:
+        return pq.read_table(BytesIO(response.read()))
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def _put_parquet(minio_client, table: pa.Table, object_name: str):
+    buffer = BytesIO()
+    pq.write_table(table, buffer)
+    length = buffer.tell()
+    buffer.seek(0)
+    minio_client.put_object(
+        bucket_name=BRONZE_BUCKET,
+        object_name=object_name,
+        data=buffer,
+        length=length,
+        content_type='application/octet-stream'
+    )
+
+
+# ============================================================================
+# SNAPSHOT DEDUPLICATION
+# ============================================================================
+
+def content_hash(table: pa.Table, key: str) -> str:
+    """
+    Hash of a snapshot's rows, independent of row order and file encoding
+
+    Rows are sorted by the table key, and schema metadata (e.g. the pandas
+    index written by from_pandas) is dropped before hashing the Arrow IPC
+    stream, so two snapshots with the same data hash the same.
+    """
+    if key in table.column_names:
+        table = table.sort_by(key)
+    table = table.replace_schema_metadata(None).combine_chunks()
+
+    sink = pa.BufferOutputStream()
+    with ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return hashlib.sha256(sink.getvalue().to_pybytes()).hexdigest()
+
+
+def list_snapshots(minio_client, table_name: str) -> Dict[str, dict]:
+    """Dated snapshots of a dimension: snapshot date -> object name and etag"""
+    prefix = f'{DOMAIN_PREFIX}/{table_name}/'
+    snapshots = {}
+    for obj in minio_client.list_objects(BRONZE_BUCKET, prefix=prefix, recursive=True):
+        snapshot_date, _, file_name = obj.object_name[len(prefix):].partition('/')
+        if file_name != f'{table_name}.parquet':
+            continue
+        try:
+            date.fromisoformat(snapshot_date)
+        except ValueError:
+            continue
+        snapshots[snapshot_date] = {'object': obj.object_name, 'etag': obj.etag}
+    return dict(sorted(snapshots.items()))
+
+
+def deduplicate_snapshots(minio_client, table_name: str, run_id: str, context=None, today: date = None) -> dict:
+    """
+    Collapse runs of identical snapshots into versions with validity ranges
+
+    Content hashes are reused from the previous manifest while an object's
+    ETag is unchanged, so only new snapshots are downloaded.
+    """
+    key = SNAPSHOT_TABLES[table_name]
+    today = today or date.today()
+    keep_after = (today - timedelta(days=DEDUP_MIN_AGE_DAYS)).isoformat()
+
+    manifest = read_manifest(minio_client, table_name) or {}
+    known_hashes = {
+        version['etag']: version['content_hash']
+        for version in manifest.get('versions', []) if version.get('etag')
+    }
+
+    versions, redundant = [], []
+    with stage('dedup', context, table=table_name) as stats:
+        for snapshot_date, snapshot in list_snapshots(minio_client, table_name).items():
+            digest = known_hashes.get(snapshot['etag'])
+            if digest is None:
+                table = _read_parquet(minio_client, snapshot['object'])
+                digest = content_hash(table, key)
+                stats.rows += table.num_rows
+                stats.bytes += table.nbytes
+
+            if versions and versions[-1]['content_hash'] == digest:
+                if snapshot_date <= keep_after:
+                    redundant.append(snapshot['object'])
+                continue
+
+            if versions:
+                versions[-1]['valid_to'] = snapshot_date
+            versions.append({
+                'valid_from': snapshot_date,
+                'valid_to': None,  # still current
+                'content_hash': digest,
+                'object': snapshot['object'],
+                'etag': snapshot['etag'],
+            })
+
+    manifest['versions'] = versions
+    manifest = write_manifest(minio_client, table_name, manifest, run_id)
+
+    for object_name in redundant:
+        minio_client.remove_object(BRONZE_BUCKET, object_name)
+
+    print(f"[dedup {table_name}] {len(versions)} versions, removed {len(redundant)} duplicate snapshots")
+    return {'table': table_name, 'versions': len(versions), 'removed': len(redundant)}
+
+
+def record_snapshot(minio_client, table_name: str, object_name: str, snapshot_date: str, run_id: str) -> dict:
+    """
+    Add a freshly written dimension snapshot to the table's manifest
+
+    Called by the daily load, so readers see each snapshot the day it lands
+    rather than after the next maintenance run. A snapshot identical to the
+    current version extends it (valid_to stays open); a changed one closes the
+    current version and opens a new one. A rerun for the same date replaces
+    that date's version, and snapshots older than the current version are
+    left to deduplicate_snapshots.
+    """
+    manifest = read_manifest(minio_client, table_name) or {}
+    versions = manifest.get('versions', [])
+
+    # Hash what readers will read back, exactly as deduplicate_snapshots does
+    table = _read_parquet(minio_client, object_name)
+    digest = content_hash(table, SNAPSHOT_TABLES[table_name])
+    etag = minio_client.stat_object(BRONZE_BUCKET, object_name).etag
+
+    if versions and versions[-1]['valid_from'] > snapshot_date:
+        print(f"[snapshot {table_name}] {snapshot_date} is older than the current version; not recorded")
+        return manifest
+    if versions and versions[-1]['valid_from'] == snapshot_date:
+        versions.pop()
+        if versions:
+            versions[-1]['valid_to'] = None
+
+    if versions and versions[-1]['content_hash'] == digest:
+        action = f"extends the version from {versions[-1]['valid_from']}"
+    else:
+        if versions:
+            versions[-1]['valid_to'] = snapshot_date
+        versions.append({
+            'valid_from': snapshot_date,
+            'valid_to': None,  # still current
+            'content_hash': digest,
+            'object': object_name,
+            'etag': etag,
+        })
+        action = 'opens a new version'
+
+    manifest['versions'] = versions
+    manifest = write_manifest(minio_client, table_name, manifest, run_id)
+    print(f"[snapshot {table_name}] {snapshot_date} {action}")
+    return manifest
+
+
+# ============================================================================
+# PARTITION COMPACTION
+# ============================================================================
+
+def list_partitions(minio_client, table_name: str) -> Dict[str, List]:
+    """Parquet objects of a partitioned table, grouped by partition prefix"""
+    prefix = f'{DOMAIN_PREFIX}/{table_name}/'
+    partitions = defaultdict(list)
+    for obj in minio_client.list_objects(BRONZE_BUCKET, prefix=prefix, recursive=True):
+        if obj.object_name.endswith('.parquet'):
+            partition = obj.object_name[len(prefix):].rsplit('/', 1)[0]
+            partitions[partition].append(obj)
+    return dict(sorted(partitions.items()))
+
+
+def needs_compaction(objects) -> bool:
+    return len(objects) > 1 and any(obj.size < COMPACTION_SMALL_FILE_BYTES for obj in objects)
+
+
+def compact_partition(minio_client, table_name: str, partition: str, objects, run_id: str,
+                      context=None) -> dict:
+    """
+    Rewrite a partition's files as few files of about the target size
+
+    Output names carry the run id, so they never collide with the files the
+    current manifest lists; readers keep using those until the new manifest is
+    written.
+    """
+    prefix = f'{DOMAIN_PREFIX}/{table_name}/{partition}/'
+    inputs = [obj.object_name for obj in objects]
+
+    with stage('compact', context, table=table_name, partition=partition) as stats:
+        table = pa.concat_tables(
+            [_read_parquet(minio_client, name) for name in inputs], promote_options='default'
+        )
+        stats.rows = table.num_rows
+        stats.bytes = sum(obj.size for obj in objects)
+
+        # Size the output from the compressed size of the inputs
+        bytes_per_row = stats.bytes / max(table.num_rows, 1)
+        rows_per_file = max(1, int(COMPACTION_TARGET_BYTES / max(bytes_per_row, 1)))
+        file_count = max(1, math.ceil(table.num_rows / rows_per_file))
+
+        outputs = [f'{prefix}part-{run_tag(run_id)}-{index:05d}.parquet' for index in range(file_count)]
+
+        for index, object_name in enumerate(outputs):
+            _put_parquet(minio_client, table.slice(index * rows_per_file, rows_per_file), object_name)
+
+    return {
+        'partition': partition,
+        'objects': outputs,
+        'rows': table.num_rows,
+        'inputs': inputs,
+    }
+
+
+def compact_table(minio_client, table_name: str, run_id: str, context=None) -> dict:
+    """
+    Compact every fragmented partition of a table and list all partitions in its manifest
+    """
+    manifest = read_manifest(minio_client, table_name) or {}
+    entries = manifest.get('partitions', {})
+    compacted = []
+
+    for partition, objects in list_partitions(minio_client, table_name).items():
+        if partition in entries:
+            # Objects the manifest does not list (e.g. left by a failed backfill) are not data
+            listed = set(entries[partition]['objects'])
+            objects = [obj for obj in objects if obj.object_name in listed]
+        if needs_compaction(objects):
+            result = compact_partition(minio_client, table_name, partition, objects, run_id, context)
+            compacted.append(result)
+            entries[partition] = {'objects': result['objects'], 'rows': result['rows'], 'run_id': run_id}
+        elif partition not in entries:
+            # Written outside the backfill; this read happens once, until it is listed
+            rows = sum(_read_parquet(minio_client, obj.object_name).num_rows for obj in objects)
+            entries[partition] = {'objects': [obj.object_name for obj in objects], 'rows': rows, 'run_id': run_id}
+
+    manifest['partitions'] = dict(sorted(entries.items()))
+    manifest['total_rows'] = sum(p['rows'] for p in manifest['partitions'].values())
+    write_manifest(minio_client, table_name, manifest, run_id)
+
+    # Inputs are only removed once the manifest points at their replacements
+    removed = 0
+    for result in compacted:
+        for object_name in set(result['inputs']) - set(result['objects']):
+            minio_client.remove_object(BRONZE_BUCKET, object_name)
+            removed += 1
+
+    print(f"[compact {table_name}] compacted {len(compacted)} partitions, removed {removed} files")
+    return {'table': table_name, 'compacted': len(compacted), 'removed': removed}
+
@@ -0,0 +1,109 @@
+"""
+Bronze table manifests
+Pyatiletka Project
+
+A manifest lists what makes up a bronze table, so readers never have to list
+S3 prefixes:
+
+- fact tables: the objects and row count of each year/month partition
+- dimension tables: content versions, each with the snapshot object that holds
+  it and the date range it was valid for (see bronze_compaction)
+
+Objects are written first and the manifest last, in a single PUT, so readers
+that go through the manifest never see a half-finished backfill or compaction.
+Committing partitions merges into the existing manifest, so rebuilding some
+months leaves the others listed as they were.
+
+Layout: heavy_industry/_manifests/<table>/manifest.json
+"""
+
+import json
+import re
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import Dict, Iterable, Optional
+
+from minio.error import S3Error
+
+from bronze_quality import BRONZE_BUCKET, DOMAIN_PREFIX
+
+
+def manifest_object(table_name: str) -> str:
+    return f'{DOMAIN_PREFIX}/_manifests/{table_name}/manifest.json'
+
+
+def run_tag(run_id: str) -> str:
+    """A DAG run id reduced to characters that are safe in object names and S3 URLs"""
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', run_id)
+
+
+def partition_object(table_name: str, year: int, month: int, run_id: str) -> str:
+    """
+    Bronze object of one (year, month) partition as written by one DAG run
+
+    Names are run-scoped so a rerun never overwrites an object the current
+    manifest lists; the object it replaces is removed after the commit.
+    """
+    return f'{DOMAIN_PREFIX}/{table_name}/{partition_key(year, month)}/{table_name}-{run_tag(run_id)}.parquet'
+
+
+def partition_key(year: int, month: int) -> str:
+    # Zero-padded so partition keys sort chronologically
+    return f'year={year}/month={month:02d}'
+
+
+def read_manifest(minio_client, table_name: str) -> Optional[dict]:
+    """Current manifest of a table, or None before the first commit"""
+    try:
+        response = minio_client.get_object(BRONZE_BUCKET, manifest_object(table_name))
+    except S3Error as exc:
+        if exc.code == 'NoSuchKey':
+            return None
+        raise
+    try:
+        return json.loads(response.read())
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def write_manifest(minio_client, table_name: str, manifest: dict, run_id: str) -> dict:
+    """Stamp and publish a manifest in one PUT"""
+    manifest['table'] = table_name
+    manifest['run_id'] = run_id
+    manifest['committed_at'] = datetime.now(timezone.utc).isoformat()
+
+    payload = json.dumps(manifest, indent=2).encode()
+    minio_client.put_object(
+        bucket_name=BRONZE_BUCKET,
+        object_name=manifest_object(table_name),
+        data=BytesIO(payload),
+        length=len(payload),
+        content_type='application/json'
+    )
+    return manifest
+
+
+def commit_manifest(minio_client, table_name: str, partitions: Iterable[Dict], run_id: str) -> dict:
+    """
+    Merge written partitions into the table's manifest and publish it
+
+    Each partition is a dict with partition, objects and rows. Partitions that
+    came back empty are dropped from the manifest.
+    """
+    manifest = read_manifest(minio_client, table_name) or {}
+    entries = manifest.get('partitions', {})
+
+    for partition in partitions:
+        if partition['rows']:
+            entries[partition['partition']] = {
+                'objects': partition['objects'],
+                'rows': partition['rows'],
+                'run_id': run_id,
+            }
+        else:
+            entries.pop(partition['partition'], None)
+
+    manifest['partitions'] = dict(sorted(entries.items()))
+    manifest['total_rows'] = sum(p['rows'] for p in manifest['partitions'].values())
+    return write_manifest(minio_client, table_name, manifest, run_id)
@@ -0,0 +1,347 @@
+"""
+Bronze data-quality validation
+Pyatiletka Project
+
+Checks every table on its way into the bronze layer, one Arrow record batch at
+a time with pyarrow.compute, so fact tables are validated without a Python
+loop over rows:
+
+- row rules mirroring the domain schema's CHECK constraints
+- referential integrity against the dimension snapshot of the same run
+- volume and distribution drift against the previous partition's metrics
+
+Rows failing any rule are written to the quarantine prefix with the names of
+the rules they broke; only passing rows reach bronze. Quality metrics for each
+partition are written next to the data under the _quality prefix, and each
+batch is recorded as an ETL telemetry stage.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Callable, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from opentelemetry import trace
+
+from etl_telemetry import stage
+
+BRONZE_BUCKET = 'bronze'
+DOMAIN_PREFIX = 'heavy_industry'
+
+DQ_BATCH_ROWS = int(os.getenv('DQ_BATCH_ROWS', '65536'))
+# Fail the task when more than this fraction of a partition is quarantined
+DQ_MAX_QUARANTINE_FRACTION = float(os.getenv('DQ_MAX_QUARANTINE_FRACTION', '0.1'))
+# Row count may change by this fraction versus the previous partition
+DQ_VOLUME_TOLERANCE = float(os.getenv('DQ_VOLUME_TOLERANCE', '0.5'))
+# Column means may move by this fraction versus the previous partition
+DQ_MEAN_TOLERANCE = float(os.getenv('DQ_MEAN_TOLERANCE', '0.5'))
+DQ_FAIL_ON_DRIFT = os.getenv('DQ_FAIL_ON_DRIFT', 'false').lower() in ('1', 'true', 'yes')
+
+
+class DataQualityError(Exception):
+    """A partition failed validation badly enough that it must not be published"""
+
+
+# ============================================================================
+# RULES
+# ============================================================================
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    column: str
+    # Returns a boolean array, true where the row passes
+    check: Callable[[pa.Array], pa.Array]
+    # Like SQL CHECK constraints, a NULL passes unless the rule is about NULLs
+    null_passes: bool = True
+
+    def passes(self, batch: pa.RecordBatch) -> pa.Array:
+        index = batch.schema.get_field_index(self.column)
+        if index < 0:
+            # A missing column fails every row
+            return pa.array([False] * batch.num_rows, type=pa.bool_())
+        result = self.check(batch.column(index))
+        return pc.fill_null(result, self.null_passes)
+
+
+def not_null(column):
+    return Rule(f'{column}_not_null', column, pc.is_valid, null_passes=False)
+
+
+def positive(column):
+    return Rule(f'{column}_positive', column, lambda values: pc.greater(values, 0))
+
+
+def non_negative(column):
+    return Rule(f'{column}_non_negative', column, lambda values: pc.greater_equal(values, 0))
+
+
+def between(column, low, high):
+    return Rule(
+        f'{column}_between_{low}_{high}', column,
+        lambda values: pc.and_(pc.greater_equal(values, low), pc.less_equal(values, high))
+    )
+
+
+def one_of(column, allowed):
+    value_set = pa.array(allowed)
+    return Rule(f'{column}_in_set', column, lambda values: pc.is_in(values, value_set=value_set))
+
+
+def references(column, table, ref_values: pa.Array):
+    """Every non-null value must exist in the referenced dimension snapshot"""
+    value_set = ref_values.unique()
+    return Rule(
+        f'{column}_references_{table}', column,
+        lambda values: pc.is_in(values.cast(value_set.type), value_set=value_set)
+    )
+
+
+# Row rules per table, mirroring the CHECK constraints in 01-schema.sql
+TABLE_RULES: Dict[str, List[Rule]] = {
+    'regions': [
+        not_null('region_id'),
+        not_null('region_code'),
+        one_of('region_type', ['USSR', 'REPUBLIC', 'OBLAST']),
+    ],
+    'products': [
+        not_null('product_id'),
+        not_null('product_code'),
+        not_null('unit_of_measure'),
+    ],
+    'facilities': [
+        not_null('facility_id'),
+        not_null('facility_code'),
+        positive('capacity_per_day'),
+        non_negative('workforce_size'),
+        one_of('status', ['ACTIVE', 'MAINTENANCE', 'INACTIVE']),
+    ],
+    'actual_production': [
+        not_null('production_id'),
+        not_null('production_date'),
+        non_negative('quantity_produced'),
+        one_of('quality_grade', ['A', 'B', 'C']),
+        between('shift_number', 1, 3),
+        non_negative('workers_on_shift'),
+        between('equipment_downtime_hours', 0, 24),
+        non_negative('defect_count'),
+    ],
+    'production_targets': [
+        not_null('target_id'),
+        positive('target_quantity'),
+        between('plan_year', 1986, 1990),
+        between('quarter', 1, 4),
+        between('month', 1, 12),
+    ],
+}
+
+# Foreign keys checked against dimension snapshots: column -> (table, column)
+TABLE_REFERENCES: Dict[str, Dict[str, tuple]] = {
+    'facilities': {'region_name': ('regions', 'region_name')},
+    'actual_production': {
+        'facility_id': ('facilities', 'facility_id'),
+        'product_id': ('products', 'product_id'),
+    },
+    'production_targets': {
+        'facility_id': ('facilities', 'facility_id'),
+        'product_id': ('products', 'product_id'),
+    },
+}
+
+
+# ============================================================================
+# VALIDATION
+# ============================================================================
+
+@dataclass
+class QualityResult:
+    valid: pa.Table
+    quarantined: pa.Table
+    metrics: dict
+
+
+def _column_profile(table: pa.Table) -> dict:
+    """Null fraction for every column, and mean for numeric ones"""
+    profile = {}
+    for name in table.column_names:
+        column = table.column(name)
+        entry = {'null_fraction': column.null_count / table.num_rows if table.num_rows else 0.0}
+        if pa.types.is_integer(column.type) or pa.types.is_floating(column.type) \
+                or pa.types.is_decimal(column.type):
+            mean = pc.mean(column).as_py()
+            entry['mean'] = float(mean) if mean is not None else None
+        profile[name] = entry
+    return profile
+
+
+def validate_table(table_name: str, table: pa.Table, reference_tables: Optional[Dict[str, pa.Table]] = None,
+                   context=None) -> QualityResult:
+    """Split a table into passing and quarantined rows, batch by batch"""
+    rules = list(TABLE_RULES.get(table_name, []))
+    for column, (ref_table, ref_column) in TABLE_REFERENCES.get(table_name, {}).items():
+        if reference_tables and ref_table in reference_tables:
+            ref_values = reference_tables[ref_table].column(ref_column).combine_chunks()
+            rules.append(references(column, ref_table, ref_values))
+
+    failures = {rule.name: 0 for rule in rules}
+    quarantine_schema = table.schema.append(pa.field('dq_failed_rules', pa.string()))
+    valid_batches, quarantined_batches = [], []
+
+    for index, batch in enumerate(table.to_batches(max_chunksize=DQ_BATCH_ROWS)):
+        with stage('validate', context, table=table_name, batch=index) as stats:
+            passes = pa.array([True] * batch.num_rows, type=pa.bool_())
+            # One nullable string per rule, set only where that rule failed
+            failed_names = []
+            for rule in rules:
+                rule_passes = rule.passes(batch)
+                failed = pc.invert(rule_passes)
+                failures[rule.name] += pc.sum(failed).as_py() or 0
+                failed_names.append(pc.if_else(failed, pa.scalar(rule.name), pa.scalar(None, pa.string())))
+                passes = pc.and_(passes, rule_passes)
+
+            valid_batches.append(batch.filter(passes))
+            bad_rows = pc.invert(passes)
+            if failed_names and pc.any(bad_rows).as_py():
+                # Join only the failing rows: every one of them has at least one rule name,
+                # and a row whose inputs are all null would be dropped by the join
+                reasons = pc.binary_join_element_wise(
+                    *[names.filter(bad_rows) for names in failed_names], ',', null_handling='skip'
+                )
+                bad = batch.filter(bad_rows)
+                quarantined_batches.append(
+                    pa.RecordBatch.from_arrays(bad.columns + [reasons], schema=quarantine_schema)
+                )
+
+            stats.rows = batch.num_rows
+            stats.bytes = batch.nbytes
+            trace.get_current_span().set_attribute(
+                'dq.quarantined_rows', batch.num_rows - valid_batches[-1].num_rows
+            )
+
+    valid = pa.Table.from_batches(valid_batches, schema=table.schema)
+    quarantined = pa.Table.from_batches(quarantined_batches, schema=quarantine_schema)
+
+    metrics = {
+        'table': table_name,
+        'row_count': table.num_rows,
+        'valid_rows': valid.num_rows,
+        'quarantined_rows': quarantined.num_rows,
+        'rule_failures': failures,
+        'columns': _column_profile(valid),
+    }
+    return QualityResult(valid, quarantined, metrics)
+
+
+def detect_drift(metrics: dict, previous: Optional[dict]) -> List[str]:
+    """Compare a partition's metrics with the previous partition's"""
+    if not previous:
+        return []
+
+    findings = []
+    before, after = previous.get('valid_rows', 0), metrics['valid_rows']
+    if before and abs(after - before) / before > DQ_VOLUME_TOLERANCE:
+        findings.append(f'row count {before} -> {after}')
+
+    for name, profile in metrics['columns'].items():
+        old = previous.get('columns', {}).get(name)
+        if old is None:
+            findings.append(f'new column {name}')
+            continue
+        if profile['null_fraction'] - old['null_fraction'] > DQ_VOLUME_TOLERANCE:
+            findings.append(f"{name} null fraction {old['null_fraction']:.2f} -> {profile['null_fraction']:.2f}")
+        old_mean, new_mean = old.get('mean'), profile.get('mean')
+        if old_mean and new_mean is not None and abs(new_mean - old_mean) / abs(old_mean) > DQ_MEAN_TOLERANCE:
+            findings.append(f'{name} mean {old_mean:.2f} -> {new_mean:.2f}')
+
+    for name in previous.get('columns', {}):
+        if name not in metrics['columns']:
+            findings.append(f'missing column {name}')
+    return findings
+
+
+# ============================================================================
+# STORAGE
+# ============================================================================
+
+def quarantine_object(table_name: str, partition: str) -> str:
+    return f'{DOMAIN_PREFIX}/quarantine/{table_name}/{partition}/{table_name}.parquet'
+
+
+def metrics_prefix(table_name: str) -> str:
+    return f'{DOMAIN_PREFIX}/_quality/{table_name}/'
+
+
+def metrics_object(table_name: str, partition: str) -> str:
+    return f'{metrics_prefix(table_name)}{partition}/metrics.json'
+
+
+def _put(minio_client, object_name: str, payload: bytes, content_type: str):
+    minio_client.put_object(
+        bucket_name=BRONZE_BUCKET,
+        object_name=object_name,
+        data=BytesIO(payload),
+        length=len(payload),
+        content_type=content_type
+    )
+
+
+def previous_metrics(minio_client, table_name: str, partition: str) -> Optional[dict]:
+    """Metrics of the latest partition before this one; partition keys sort chronologically"""
+    prefix = metrics_prefix(table_name)
+    earlier = [
+        obj.object_name for obj in minio_client.list_objects(BRONZE_BUCKET, prefix=prefix, recursive=True)
+        if obj.object_name.endswith('/metrics.json')
+        and obj.object_name[len(prefix):-len('/metrics.json')] < partition
+    ]
+    if not earlier:
+        return None
+    response = minio_client.get_object(BRONZE_BUCKET, max(earlier))
+    try:
+        return json.loads(response.read())
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def check_partition(minio_client, table_name: str, table: pa.Table, partition: str, context=None,
+                    reference_tables: Optional[Dict[str, pa.Table]] = None) -> pa.Table:
+    """
+    Validate one bronze partition and return the rows that may be published
+
+    Quarantined rows and the partition's metrics are written as a side effect.
+    Both objects are replaced on rerun, and the quarantine object is removed
+    when nothing is quarantined, so the check is idempotent.
+    """
+    result = validate_table(table_name, table, reference_tables, context)
+    metrics = result.metrics
+    metrics['partition'] = partition
+    metrics['drift'] = detect_drift(metrics, previous_metrics(minio_client, table_name, partition))
+
+    if result.quarantined.num_rows:
+        buffer = BytesIO()
+        pq.write_table(result.quarantined, buffer)
+        _put(minio_client, quarantine_object(table_name, partition), buffer.getvalue(),
+             'application/octet-stream')
+    else:
+        # A clean rerun must not leave an earlier run's quarantine behind
+        minio_client.remove_object(BRONZE_BUCKET, quarantine_object(table_name, partition))
+
+    _put(minio_client, metrics_object(table_name, partition),
+         json.dumps(metrics, indent=2).encode(), 'application/json')
+
+    failing = {rule: count for rule, count in metrics['rule_failures'].items() if count}
+    print(f"[quality {table_name}/{partition}] valid={metrics['valid_rows']} "
+          f"quarantined={metrics['quarantined_rows']} failures={failing} drift={metrics['drift']}")
+
+    if table.num_rows and result.quarantined.num_rows / table.num_rows > DQ_MAX_QUARANTINE_FRACTION:
+        raise DataQualityError(
+            f'{table_name}/{partition}: {result.quarantined.num_rows} of {table.num_rows} rows quarantined'
+        )
+    if metrics['drift'] and DQ_FAIL_ON_DRIFT:
+        raise DataQualityError(f"{table_name}/{partition}: drift {metrics['drift']}")
+
+    return result.valid
@@ -0,0 +1,72 @@
+"""
+ETL stage telemetry
+Pyatiletka Project
+
+Wraps each pipeline stage in an OpenTelemetry span carrying rows, bytes and
+seconds, and logs the same numbers to the task log. Spans are exported when
+OTEL_EXPORTER_OTLP_ENDPOINT is set; otherwise only the log line is written.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+from opentelemetry import trace
+
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "pyatiletka-airflow")
+
+
+def _configure_tracing():
+    if not os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+    provider = TracerProvider(resource=Resource.create({"service.name": OTEL_SERVICE_NAME}))
+    # Task processes are short-lived; export each span as it ends
+    provider.add_span_processor(SimpleSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+
+
+_configure_tracing()
+tracer = trace.get_tracer("pyatiletka-etl")
+
+
+class StageStats:
+    """Counters a stage fills in while it runs"""
+
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+
+@contextmanager
+def stage(name, context=None, **attributes):
+    """
+    Time one ETL stage and record rows/bytes/seconds
+
+    Usage:
+        with stage("extract", context, table="facilities") as stats:
+            stats.rows = len(data)
+    """
+    stats = StageStats()
+    if context is not None:
+        attributes.setdefault("airflow.dag_id", context['dag'].dag_id)
+        attributes.setdefault("airflow.task_id", context['task_instance'].task_id)
+        attributes.setdefault("airflow.run_id", context['run_id'])
+
+    with tracer.start_as_current_span(f"etl.{name}", attributes=attributes) as span:
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.seconds = time.perf_counter() - start
+            span.set_attribute("etl.rows", stats.rows)
+            span.set_attribute("etl.bytes", stats.bytes)
+            span.set_attribute("etl.seconds", stats.seconds)
+            details = " ".join(f"{k}={v}" for k, v in attributes.items() if not k.startswith("airflow."))
+            print(f"[stage {name}] {details} rows={stats.rows} bytes={stats.bytes} seconds={stats.seconds:.3f}")
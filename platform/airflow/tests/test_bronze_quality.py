@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pyarrow as pa
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'plugins'))
+
+from bronze_quality import validate_table  # noqa: E402
+
+
+def test_mixed_batch_quarantines_only_failing_rows():
+    facilities = pa.table({
+        'facility_id': [1, 2, 3],
+        'facility_code': ['F-1', 'F-2', 'F-3'],
+        'capacity_per_day': [100.0, -5.0, 250.0],
+        'workforce_size': [40, 12, 80],
+        'status': ['ACTIVE', 'CLOSED', 'MAINTENANCE'],
+    })
+
+    result = validate_table('facilities', facilities)
+
+    assert result.valid.column('facility_id').to_pylist() == [1, 3]
+    assert result.quarantined.column('facility_id').to_pylist() == [2]
+    assert result.quarantined.column('dq_failed_rules').to_pylist() == [
+        'capacity_per_day_positive,status_in_set'
+    ]
+    assert result.metrics['quarantined_rows'] == 1
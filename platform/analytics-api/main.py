@@ -0,0 +1,193 @@
+"""
+Analytics API
+Pyatiletka Project - Five Year Plan Data Mesh
+
+Read-only analytical queries over the dbt marts in the DuckDB warehouse and the
+bronze Parquet layer in MinIO. Heavy aggregations run on the columnar engine and
+never touch the domain OLTP databases.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+
+import duckdb
+import orjson
+import pyarrow as pa
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import Response
+
+from queries import QUERIES
+from warehouse import WarehouseUnavailable, manifest_objects, read_bronze_manifest, warehouse
+
+# Bronze-backed results change with each DAG run, so they also expire on a timer
+BRONZE_CACHE_TTL_SECONDS = float(os.getenv("BRONZE_CACHE_TTL_SECONDS", "300"))
+RESULT_CACHE_ENTRIES = int(os.getenv("RESULT_CACHE_ENTRIES", "256"))
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+app = FastAPI(
+    title="Analytics API",
+    description="Read-only analytical queries over the DuckDB warehouse - Pyatiletka Project",
+    version="1.0.0",
+    docs_url="/docs",
+    redoc_url="/redoc"
+)
+
+
+class ResultCache:
+    """LRU of Arrow tables keyed by query, parameters and snapshot version"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            table = self._entries.get(key)
+            if table is not None:
+                self._entries.move_to_end(key)
+            return table
+
+    def set(self, key, table: pa.Table):
+        with self._lock:
+            self._entries[key] = table
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+result_cache = ResultCache(RESULT_CACHE_ENTRIES)
+
+
+def _default(value):
+    # DECIMAL results arrive as Decimal; the domain APIs return them as numbers
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def coerce_params(query, request: Request) -> dict:
+    """Bind every declared parameter, converting query-string values to their declared type"""
+    params = {}
+    for name, kind in query.params.items():
+        raw = request.query_params.get(name)
+        if raw is None:
+            params[name] = None
+        elif kind is bool:
+            params[name] = raw.lower() in ("1", "true", "yes")
+        else:
+            try:
+                params[name] = kind(raw)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Parameter {name} must be {kind.__name__}")
+    return params
+
+
+# ============================================================================
+# HEALTH CHECK ENDPOINT
+# ============================================================================
+
+@app.get("/", tags=["Health"])
+def health_check():
+    """
+    Health check endpoint with the warehouse snapshot being served
+    """
+    return {
+        "status": "healthy",
+        "service": "Analytics API",
+        "project": "Pyatiletka",
+        "version": "1.0.0",
+        "warehouse_snapshot": warehouse.version
+    }
+
+
+# ============================================================================
+# QUERY ENDPOINTS
+# ============================================================================
+
+@app.get("/queries", tags=["Queries"])
+def list_queries():
+    """
+    List available queries and their parameters
+    """
+    return [
+        {
+            "name": q.name,
+            "description": q.description,
+            "params": {name: kind.__name__ for name, kind in q.params.items()},
+            "source": "bronze" if q.reads_bronze else "warehouse"
+        }
+        for q in QUERIES.values()
+    ]
+
+
+@app.get("/queries/{query_name}", tags=["Queries"])
+def run_query(
+        query_name: str,
+        request: Request,
+        format: str = Query("json", pattern="^(json|arrow)$", description="json or arrow (IPC stream)")
+):
+    """
+    Run a named query; parameters are passed as query-string values
+
+    Results are cached per warehouse snapshot, so repeated dashboard queries are
+    served from memory until dbt rebuilds the warehouse.
+    """
+    query = QUERIES.get(query_name)
+    if query is None:
+        raise HTTPException(status_code=404, detail=f"Query {query_name} not found")
+
+    params = coerce_params(query, request)
+
+    try:
+        version, cursor = warehouse.cursor()
+    except WarehouseUnavailable as exc:
+        if not query.reads_bronze:
+            raise HTTPException(status_code=503, detail=str(exc))
+        # Bronze queries never touch the warehouse, so they do not wait for dbt
+        version, cursor = "none", warehouse.bronze_cursor()
+
+    sql = query.sql
+    cache_key = (query.name, tuple(sorted(params.items())), version)
+    if query.reads_bronze:
+        cache_key += (int(time.time() // BRONZE_CACHE_TTL_SECONDS),)
+    for table_name in query.manifests:
+        try:
+            manifest = read_bronze_manifest(table_name)
+        except OSError as exc:
+            cursor.close()
+            raise HTTPException(status_code=503, detail=f"Manifest for {table_name} unavailable: {exc}")
+        objects = manifest_objects(manifest)
+        if not objects:
+            cursor.close()
+            raise HTTPException(status_code=503, detail=f"No committed {table_name} objects yet")
+        listing = "[" + ", ".join("'" + o.replace("'", "''") + "'" for o in objects) + "]"
+        sql = sql.replace(f"{{objects:{table_name}}}", listing)
+        cache_key += (manifest.get("committed_at"),)
+
+    table = result_cache.get(cache_key)
+    if table is None:
+        try:
+            table = cursor.execute(sql, params).arrow()
+        except duckdb.Error as exc:
+            raise HTTPException(status_code=502, detail=f"Query {query_name} failed: {exc}")
+        finally:
+            cursor.close()
+        result_cache.set(cache_key, table)
+    else:
+        cursor.close()
+
+    headers = {"X-Warehouse-Snapshot": version}
+
+    if format == "arrow":
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(content=sink.getvalue().to_pybytes(), media_type=ARROW_STREAM_MEDIA_TYPE, headers=headers)
+
+    body = orjson.dumps(table.to_pylist(), option=orjson.OPT_NON_STR_KEYS, default=_default)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,244 @@
+"""
+Parameterized analytical queries
+Pyatiletka Project
+
+Every query the Analytics API can run is declared here. Clients choose a query
+by name and supply its parameters; SQL text is never taken from a request.
+Parameters are bound as DuckDB prepared-statement values ($name), and a
+parameter left out is bound as NULL, which each query treats as "no filter".
+
+Bronze queries never glob object paths. Compaction and snapshot dedup rename
+and remove files, so each bronze table a query names in manifests has the
+objects its manifest lists substituted for {objects:<table>}.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+from warehouse import BRONZE_BUCKET_URL, BRONZE_ROOT
+
+# dbt-duckdb places the "marts" custom schema under the target schema: main_marts
+MARTS_SCHEMA = os.getenv("MARTS_SCHEMA", "main_marts")
+
+
+@dataclass(frozen=True)
+class AnalyticsQuery:
+    name: str
+    description: str
+    sql: str
+    # Parameter name -> Python type used to coerce the query string value
+    params: Dict[str, type] = field(default_factory=dict)
+    # Queries over bronze Parquet change with every DAG run, not with dbt builds
+    reads_bronze: bool = False
+    # Bronze tables whose manifests supply the {objects:<table>} lists
+    manifests: Tuple[str, ...] = ()
+
+
+QUERIES = {q.name: q for q in [
+    AnalyticsQuery(
+        name="capacity_by_region",
+        description="Facilities, yearly capacity and workforce per region and facility category",
+        sql=f"""
+            SELECT
+                region_name,
+                region_type,
+                facility_category,
+                COUNT(*) AS facility_count,
+                SUM(capacity_per_year) AS capacity_per_year,
+                SUM(workforce_size) AS workforce_size
+            FROM {MARTS_SCHEMA}.mart_facilities
+            WHERE ($facility_category IS NULL OR facility_category = $facility_category)
+              AND ($active_only IS NULL OR NOT $active_only OR is_active)
+            GROUP BY region_name, region_type, facility_category
+            ORDER BY capacity_per_year DESC
+        """,
+        params={"facility_category": str, "active_only": bool},
+    ),
+    AnalyticsQuery(
+        name="facility_capacity",
+        description="Facilities ranked by yearly capacity, optionally for one region or category",
+        sql=f"""
+            SELECT
+                facility_id,
+                facility_code,
+                facility_name,
+                facility_category,
+                region_name,
+                capacity_per_day,
+                capacity_per_year,
+                workforce_size,
+                years_operational,
+                status
+            FROM {MARTS_SCHEMA}.mart_facilities
+            WHERE ($region_name IS NULL OR region_name = $region_name)
+              AND ($facility_category IS NULL OR facility_category = $facility_category)
+            ORDER BY capacity_per_year DESC
+            LIMIT COALESCE($limit, 100)
+        """,
+        params={"region_name": str, "facility_category": str, "limit": int},
+    ),
+    AnalyticsQuery(
+        name="product_mix",
+        description="Products per product group and measurement type",
+        sql=f"""
+            SELECT
+                product_group,
+                measurement_type,
+                COUNT(*) AS product_count,
+                LIST(product_name ORDER BY product_name) AS products
+            FROM {MARTS_SCHEMA}.mart_products
+            WHERE ($product_group IS NULL OR product_group = $product_group)
+            GROUP BY product_group, measurement_type
+            ORDER BY product_group, measurement_type
+        """,
+        params={"product_group": str},
+    ),
+    AnalyticsQuery(
+        name="bronze_facility_snapshots",
+        description="Facility count and total daily capacity per version of the facilities dimension",
+        sql=f"""
+            WITH versions AS (
+                SELECT UNNEST(versions) AS v
+                FROM read_json_auto('{BRONZE_ROOT}/_manifests/facilities/manifest.json')
+            ),
+            snapshots AS (
+                SELECT
+                    filename,
+                    COUNT(*) AS facility_count,
+                    SUM(capacity_per_day) AS capacity_per_day
+                FROM read_parquet({{objects:facilities}}, filename = true)
+                GROUP BY filename
+            )
+            SELECT
+                v.valid_from,
+                v.valid_to,
+                s.facility_count,
+                s.capacity_per_day
+            FROM versions
+            JOIN snapshots s ON s.filename = '{BRONZE_BUCKET_URL}/' || v.object
+            WHERE $since IS NULL OR v.valid_to IS NULL OR v.valid_to > $since
+            ORDER BY v.valid_from DESC
+        """,
+        params={"since": str},
+        reads_bronze=True,
+        manifests=("facilities",),
+    ),
+    AnalyticsQuery(
+        name="bronze_facility_versions",
+        description="Distinct versions of the facilities dimension and the dates each was valid",
+        sql=f"""
+            SELECT
+                v.valid_from,
+                v.valid_to,
+                v.content_hash,
+                v.object
+            FROM (
+                SELECT UNNEST(versions) AS v
+                FROM read_json_auto('{BRONZE_ROOT}/_manifests/facilities/manifest.json')
+            )
+            WHERE $as_of IS NULL
+               OR (v.valid_from <= $as_of AND (v.valid_to IS NULL OR v.valid_to > $as_of))
+            ORDER BY v.valid_from
+        """,
+        params={"as_of": str},
+        reads_bronze=True,
+    ),
+    AnalyticsQuery(
+        name="bronze_monthly_production",
+        description="Production, defects and downtime per month from the backfilled bronze partitions",
+        sql="""
+            SELECT
+                year,
+                month,
+                COUNT(*) AS shift_reports,
+                SUM(quantity_produced) AS quantity_produced,
+                SUM(defect_count) AS defect_count,
+                SUM(equipment_downtime_hours) AS downtime_hours
+            FROM read_parquet({objects:actual_production}, hive_partitioning = true)
+            WHERE ($year IS NULL OR year = $year)
+              AND ($facility_id IS NULL OR facility_id = $facility_id)
+            GROUP BY year, month
+            ORDER BY year, month
+        """,
+        params={"year": int, "facility_id": int},
+        reads_bronze=True,
+        manifests=("actual_production",),
+    ),
+    AnalyticsQuery(
+        name="bronze_plan_vs_actual_by_republic",
+        description="Monthly plan vs actual per republic and product category from the bronze layer",
+        # The dbt marts carry no production yet, so this reads bronze facts and the
+        # latest dimension snapshots directly
+        sql="""
+            WITH regions AS (
+                SELECT region_id, region_code, region_name, region_type, parent_region_id
+                FROM read_parquet({objects:regions}, filename = true, union_by_name = true)
+                QUALIFY filename = MAX(filename) OVER ()
+            ),
+            facilities AS (
+                SELECT facility_id, region_name
+                FROM read_parquet({objects:facilities}, filename = true)
+                QUALIFY filename = MAX(filename) OVER ()
+            ),
+            products AS (
+                SELECT product_id, product_category, unit_of_measure
+                FROM read_parquet({objects:products}, filename = true)
+                QUALIFY filename = MAX(filename) OVER ()
+            ),
+            facility_republics AS (
+                -- Facilities sit in an oblast or directly in a republic
+                SELECT f.facility_id, rep.region_code AS republic_code, rep.region_name AS republic_name
+                FROM facilities f
+                JOIN regions r ON r.region_name = f.region_name
+                JOIN regions rep ON rep.region_id = CASE
+                    WHEN r.region_type = 'REPUBLIC' THEN r.region_id
+                    ELSE r.parent_region_id
+                END
+                WHERE rep.region_type = 'REPUBLIC'
+            ),
+            targets AS (
+                SELECT facility_id, product_id, plan_year, month, SUM(target_quantity) AS planned
+                FROM read_parquet({objects:production_targets})
+                WHERE month IS NOT NULL
+                  AND ($plan_year IS NULL OR plan_year = $plan_year)
+                GROUP BY facility_id, product_id, plan_year, month
+            ),
+            actuals AS (
+                SELECT
+                    facility_id,
+                    product_id,
+                    EXTRACT(YEAR FROM production_date) AS plan_year,
+                    EXTRACT(MONTH FROM production_date) AS month,
+                    SUM(quantity_produced) AS actual
+                FROM read_parquet({objects:actual_production}, hive_partitioning = true)
+                WHERE $plan_year IS NULL OR year = $plan_year
+                GROUP BY ALL
+            )
+            SELECT
+                fr.republic_code,
+                fr.republic_name,
+                p.product_category,
+                p.unit_of_measure,
+                t.plan_year,
+                t.month,
+                SUM(t.planned) AS planned,
+                SUM(COALESCE(a.actual, 0)) AS actual,
+                ROUND(100 * SUM(COALESCE(a.actual, 0)) / NULLIF(SUM(t.planned), 0), 2) AS completion_percentage
+            FROM targets t
+            LEFT JOIN actuals a
+                ON a.facility_id = t.facility_id
+               AND a.product_id = t.product_id
+               AND a.plan_year = t.plan_year
+               AND a.month = t.month
+            JOIN facility_republics fr ON fr.facility_id = t.facility_id
+            JOIN products p ON p.product_id = t.product_id
+            WHERE $republic_code IS NULL OR fr.republic_code = $republic_code
+            GROUP BY ALL
+            ORDER BY fr.republic_code, p.product_category, t.plan_year, t.month
+        """,
+        params={"plan_year": int, "republic_code": str},
+        reads_bronze=True,
+        manifests=("regions", "facilities", "products", "production_targets", "actual_production"),
+    ),
+]}
@@ -0,0 +1,163 @@
+"""
+DuckDB warehouse access for the Analytics API
+Pyatiletka Project
+
+The warehouse file is owned by dbt, and DuckDB allows no readers while a writer
+holds it. So the API never serves from the live file. Whenever the file changes,
+it is copied to a local snapshot while a short read-only connection keeps dbt
+out, and every query runs against that immutable snapshot. The snapshot version
+(file mtime and size) doubles as the result cache key. Until the first dbt
+build, bronze-only queries run on an in-memory database instead.
+"""
+
+import logging
+import os
+import shutil
+import threading
+from typing import List, Optional, Tuple
+
+import duckdb
+import orjson
+from pyarrow import fs
+
+logger = logging.getLogger(__name__)
+
+DUCKDB_PATH = os.getenv("DUCKDB_PATH", "/data/warehouse/pyatiletka_warehouse.duckdb")
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "/tmp/warehouse-snapshots")
+DUCKDB_THREADS = int(os.getenv("DUCKDB_THREADS", "4"))
+
+BRONZE_ROOT = os.getenv("BRONZE_ROOT", "s3://bronze/heavy_industry")
+# Manifests name objects relative to the bucket
+BRONZE_BUCKET_URL = "s3://" + BRONZE_ROOT[len("s3://"):].split("/")[0]
+MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "minio:9000")
+MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY", "minio_admin")
+MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY", "minio_password")
+
+
+def read_bronze_manifest(table_name: str) -> dict:
+    """
+    A bronze table manifest (see the Airflow bronze_manifest plugin)
+
+    Raises FileNotFoundError before the table's first commit.
+    """
+    filesystem = fs.S3FileSystem(
+        access_key=MINIO_ACCESS_KEY,
+        secret_key=MINIO_SECRET_KEY,
+        endpoint_override=MINIO_ENDPOINT,
+        scheme="http"
+    )
+    path = f"{BRONZE_ROOT[len('s3://'):]}/_manifests/{table_name}/manifest.json"
+    with filesystem.open_input_stream(path) as stream:
+        return orjson.loads(stream.read())
+
+
+def manifest_objects(manifest: dict) -> List[str]:
+    """S3 URLs of every object a manifest lists: fact partitions or dimension versions"""
+    names = [name for entry in manifest.get("partitions", {}).values() for name in entry["objects"]]
+    names += [version["object"] for version in manifest.get("versions", [])]
+    return [f"{BRONZE_BUCKET_URL}/{name}" for name in names]
+
+
+class WarehouseUnavailable(Exception):
+    """No snapshot could be taken and none is loaded yet"""
+
+
+def warehouse_version() -> Optional[str]:
+    """Identity of the current warehouse file, or None if it does not exist yet"""
+    try:
+        stat = os.stat(DUCKDB_PATH)
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def connect_s3(connection):
+    """Point a DuckDB connection at MinIO for reading bronze Parquet"""
+    connection.execute("LOAD httpfs; LOAD parquet;")
+    connection.execute(f"""
+        SET s3_endpoint = '{MINIO_ENDPOINT}';
+        SET s3_access_key_id = '{MINIO_ACCESS_KEY}';
+        SET s3_secret_access_key = '{MINIO_SECRET_KEY}';
+        SET s3_use_ssl = false;
+        SET s3_url_style = 'path';
+    """)
+    return connection
+
+
+class Warehouse:
+    """Read-only DuckDB connection over the latest warehouse snapshot"""
+
+    def __init__(self):
+        self.version = None
+        self._connection = None
+        self._bronze_connection = None
+        self._lock = threading.Lock()
+
+    def _take_snapshot(self, version: str) -> str:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        snapshot_path = os.path.join(SNAPSHOT_DIR, f"warehouse-{version}.duckdb")
+        # Holding a read-only connection blocks dbt from writing mid-copy
+        guard = duckdb.connect(DUCKDB_PATH, read_only=True)
+        try:
+            shutil.copyfile(DUCKDB_PATH, snapshot_path)
+        finally:
+            guard.close()
+        return snapshot_path
+
+    def _open(self, snapshot_path: str):
+        return connect_s3(duckdb.connect(snapshot_path, read_only=True, config={"threads": DUCKDB_THREADS}))
+
+    def refresh(self):
+        """Switch to a new snapshot if dbt has rebuilt the warehouse"""
+        version = warehouse_version()
+        if version is None or version == self.version:
+            return
+
+        with self._lock:
+            if version == self.version:
+                return
+            try:
+                snapshot_path = self._take_snapshot(version)
+            except duckdb.IOException as exc:
+                # dbt is writing right now; keep serving the previous snapshot
+                logger.info("Warehouse busy, keeping snapshot %s: %s", self.version, exc)
+                return
+
+            previous_version = self.version
+            self._connection = self._open(snapshot_path)
+            self.version = version
+            logger.info("Serving warehouse snapshot %s", version)
+
+            # In-flight cursors keep the old database open; unlinking only frees it once they finish
+            if previous_version is not None:
+                os.remove(os.path.join(SNAPSHOT_DIR, f"warehouse-{previous_version}.duckdb"))
+
+    def cursor(self) -> Tuple[str, duckdb.DuckDBPyConnection]:
+        """
+        The snapshot version and a cursor on that same snapshot
+
+        Both are read together, so a concurrent refresh cannot pair a cached
+        result with the wrong version. DuckDB cursors must not be shared
+        between threads.
+        """
+        self.refresh()
+        with self._lock:
+            version, connection = self.version, self._connection
+        if connection is None:
+            raise WarehouseUnavailable(f"No warehouse snapshot available from {DUCKDB_PATH}")
+        return version, connection.cursor()
+
+    def bronze_cursor(self) -> duckdb.DuckDBPyConnection:
+        """
+        A cursor for bronze-only queries before dbt has built any warehouse
+
+        Bronze queries read Parquet straight from MinIO, so an in-memory
+        database is enough to serve them.
+        """
+        with self._lock:
+            if self._bronze_connection is None:
+                self._bronze_connection = connect_s3(duckdb.connect(":memory:", config={"threads": DUCKDB_THREADS}))
+            return self._bronze_connection.cursor()
+
+
+warehouse = Warehouse()
@@ -0,0 +1,75 @@
+"""
+Shared response cache for the Gosplan gateway
+Pyatiletka Project
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class AsyncTTLCache:
+    """
+    Cache shared by every request the gateway serves, with per-entry expiry.
+
+    Concurrent misses on the same key are collapsed: the first caller fetches
+    while the others await the same future, so a dashboard refresh sends one
+    request per domain no matter how many panels ask at once. Failures are not
+    cached.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = {}
+        self._pending = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            # Evict the entry closest to expiry
+            oldest = min(self._entries, key=lambda k: self._entries[k][0])
+            del self._entries[oldest]
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, fetching it at most once per expiry"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an unawaited failure is not logged as lost
+            future.exception()
+            raise
+        else:
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._pending.pop(key, None)
+
+    def invalidate(self):
+        self._entries.clear()
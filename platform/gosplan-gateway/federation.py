@@ -0,0 +1,222 @@
+"""
+Concurrent fan-out to the ministry domain APIs
+Pyatiletka Project
+
+Every domain gets its own pooled HTTP client, total-time budget and circuit
+breaker. A request is sent to all domains at once, so a federated call takes
+as long as the slowest healthy domain. A domain that is down, slow or
+tripped is reported in the result instead of failing the whole call.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from cache import AsyncTTLCache
+
+logger = logging.getLogger("gosplan.federation")
+
+# name=url pairs; every ministry exposes the same read contract
+GATEWAY_DOMAINS = os.getenv(
+    "GATEWAY_DOMAINS",
+    "heavy_industry=http://heavy-industry-api:8000,"
+    "agriculture=http://agriculture-api:8000,"
+    "consumer_goods=http://consumer-goods-api:8000"
+)
+DOMAIN_TIMEOUT_SECONDS = float(os.getenv("DOMAIN_TIMEOUT_SECONDS", "5"))
+# Per-domain overrides, e.g. "heavy_industry=10,agriculture=2"
+DOMAIN_TIMEOUTS = os.getenv("DOMAIN_TIMEOUTS", "")
+DOMAIN_MAX_CONNECTIONS = int(os.getenv("DOMAIN_MAX_CONNECTIONS", "20"))
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+
+GATEWAY_CACHE_TTL_SECONDS = float(os.getenv("GATEWAY_CACHE_TTL_SECONDS", "60"))
+
+
+def parse_mapping(value: str) -> Dict[str, str]:
+    """Parse "a=1,b=2" into a dict, ignoring blanks"""
+    pairs = (item.split("=", 1) for item in value.split(",") if "=" in item)
+    return {name.strip(): setting.strip() for name, setting in pairs}
+
+
+class DomainUnavailable(Exception):
+    """The domain failed in a way that counts against its circuit breaker"""
+
+
+# ============================================================================
+# CIRCUIT BREAKER
+# ============================================================================
+
+class CircuitBreaker:
+    """
+    Stops calling a domain after repeated failures
+
+    CLOSED: calls go through; consecutive failures are counted.
+    OPEN: calls are refused until reset_seconds have passed.
+    HALF_OPEN: one trial call is let through; success closes the circuit,
+    failure opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                return False
+            self.state = self.HALF_OPEN
+        if self._trial_in_flight:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def end_trial(self):
+        """
+        Release a half-open trial that ended without a verdict
+
+        A trial cancelled mid-request (client disconnect, shutdown) or answered
+        by another request's coalesced fetch records neither success nor
+        failure; without this the circuit would stay refused for good.
+        """
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning("Circuit opened after %d failures", self.failures)
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+# ============================================================================
+# DOMAINS
+# ============================================================================
+
+@dataclass
+class DomainResult:
+    domain: str
+    status: str  # ok, timeout, error, circuit_open
+    data: Any = None
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+
+class Domain:
+    """One ministry API behind a pooled client and its own breaker"""
+
+    def __init__(self, name: str, base_url: str, timeout_seconds: float):
+        self.name = name
+        self.base_url = base_url
+        self.timeout_seconds = timeout_seconds
+        self.breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS)
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=httpx.Timeout(timeout_seconds),
+            limits=httpx.Limits(
+                max_connections=DOMAIN_MAX_CONNECTIONS,
+                max_keepalive_connections=DOMAIN_MAX_CONNECTIONS
+            )
+        )
+
+    async def get_json(self, path: str, params: Dict) -> Any:
+        """GET within the domain's total time budget; breaker-relevant failures raise DomainUnavailable"""
+        try:
+            response = await asyncio.wait_for(
+                self.client.get(path, params={k: v for k, v in params.items() if v is not None}),
+                timeout=self.timeout_seconds
+            )
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            self.breaker.record_failure()
+            raise
+        except httpx.HTTPError as exc:
+            self.breaker.record_failure()
+            raise DomainUnavailable(f"{type(exc).__name__}: {exc}")
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+            raise DomainUnavailable(f"HTTP {response.status_code}")
+
+        # A 4xx is the caller's fault, not the domain's
+        self.breaker.record_success()
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class Federation:
+    """Fans a read out to every domain and collects per-domain results"""
+
+    def __init__(self, domains: List[Domain], cache: AsyncTTLCache):
+        self.domains = {domain.name: domain for domain in domains}
+        self.cache = cache
+
+    @classmethod
+    def from_env(cls) -> "Federation":
+        timeouts = parse_mapping(DOMAIN_TIMEOUTS)
+        domains = [
+            Domain(name, url, float(timeouts.get(name, DOMAIN_TIMEOUT_SECONDS)))
+            for name, url in parse_mapping(GATEWAY_DOMAINS).items()
+        ]
+        return cls(domains, AsyncTTLCache(GATEWAY_CACHE_TTL_SECONDS))
+
+    async def fetch(self, domain: Domain, path: str, params: Dict) -> DomainResult:
+        start = time.perf_counter()
+
+        def elapsed():
+            return round((time.perf_counter() - start) * 1000, 1)
+
+        key = (domain.name, path, tuple(sorted(params.items())))
+        missing = object()
+        cached = self.cache.get(key, missing)
+        if cached is not missing:
+            return DomainResult(domain.name, "ok", cached, elapsed_ms=elapsed())
+
+        if not domain.breaker.allow():
+            return DomainResult(domain.name, "circuit_open", error="Circuit open", elapsed_ms=elapsed())
+        trial = domain.breaker.state == CircuitBreaker.HALF_OPEN
+
+        try:
+            data = await self.cache.get_or_fetch(key, lambda: domain.get_json(path, params))
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            return DomainResult(domain.name, "timeout",
+                                error=f"No response within {domain.timeout_seconds}s", elapsed_ms=elapsed())
+        except (DomainUnavailable, httpx.HTTPError, ValueError) as exc:
+            return DomainResult(domain.name, "error", error=str(exc), elapsed_ms=elapsed())
+        finally:
+            if trial:
+                domain.breaker.end_trial()
+
+        return DomainResult(domain.name, "ok", data, elapsed_ms=elapsed())
+
+    async def fan_out(self, path: str, params: Dict, domains: Optional[List[str]] = None) -> List[DomainResult]:
+        """Call every (or the named) domain concurrently"""
+        targets = [self.domains[name] for name in (domains or self.domains)]
+        return await asyncio.gather(*(self.fetch(domain, path, params) for domain in targets))
+
+    async def aclose(self):
+        await asyncio.gather(*(domain.aclose() for domain in self.domains.values()))
@@ -0,0 +1,123 @@
+"""
+Gosplan Gateway
+Pyatiletka Project - Five Year Plan Data Mesh
+
+Single entry point for cross-ministry questions. Each request is fanned out
+concurrently to the domain APIs (Heavy Industry, Agriculture, Consumer Goods)
+and the answers are merged, so a federated view costs the latency of the
+slowest domain rather than the sum of all of them.
+"""
+
+from fastapi import FastAPI, Query
+from pydantic import ValidationError
+from typing import List, Optional
+
+from federation import Federation
+from schemas import DomainStatus, EconomyPlanCompletion, MinistryPlanCompletion, PlanLine
+
+# Path every ministry serves its monthly plan vs actual lines on
+PLAN_COMPLETION_PATH = "/analytics/plan-completion"
+
+app = FastAPI(
+    title="Gosplan Gateway",
+    description="Federated queries across the ministry domain APIs - Pyatiletka Project",
+    version="1.0.0",
+    docs_url="/docs",
+    redoc_url="/redoc"
+)
+
+federation = Federation.from_env()
+
+
+@app.on_event("shutdown")
+async def close_domain_clients():
+    await federation.aclose()
+
+
+# ============================================================================
+# HEALTH CHECK ENDPOINTS
+# ============================================================================
+
+@app.get("/", tags=["Health"])
+async def health_check():
+    """
+    Health check endpoint
+    """
+    return {
+        "status": "healthy",
+        "service": "Gosplan Gateway",
+        "project": "Pyatiletka",
+        "version": "1.0.0"
+    }
+
+
+@app.get("/domains", response_model=List[DomainStatus], tags=["Health"])
+async def get_domains():
+    """
+    Federated domains with their timeout and circuit breaker state
+    """
+    return [
+        DomainStatus(
+            domain=domain.name,
+            base_url=domain.base_url,
+            timeout_seconds=domain.timeout_seconds,
+            circuit=domain.breaker.state
+        )
+        for domain in federation.domains.values()
+    ]
+
+
+# ============================================================================
+# PLAN COMPLETION ENDPOINT
+# ============================================================================
+
+@app.get("/plan-completion", response_model=EconomyPlanCompletion, tags=["Plan Completion"])
+async def get_plan_completion(
+        plan_year: int = Query(..., ge=1986, le=1990, description="Plan year"),
+        month: Optional[int] = Query(None, ge=1, le=12, description="Restrict to one month"),
+        include_lines: bool = Query(False, description="Include every facility-product plan line"),
+):
+    """
+    Plan completion across the whole economy
+
+    Ministries that time out, fail or have an open circuit are listed with
+    their status and left out of the totals; the response is then marked
+    partial instead of failing.
+    """
+    results = await federation.fan_out(PLAN_COMPLETION_PATH, {"plan_year": plan_year, "month": month})
+
+    ministries, all_lines = [], []
+    for result in results:
+        ministry = MinistryPlanCompletion(
+            domain=result.domain,
+            status=result.status,
+            elapsed_ms=result.elapsed_ms,
+            error=result.error
+        )
+        if result.status == "ok":
+            try:
+                lines = [PlanLine(domain=result.domain, **line) for line in result.data]
+            except (TypeError, ValidationError) as exc:
+                ministry.status, ministry.error = "error", f"Unexpected response: {exc}"
+                ministries.append(ministry)
+                continue
+            ministry.plan_lines = len(lines)
+            ministry.lines_meeting_plan = sum(1 for line in lines if line.completion_percentage >= 100)
+            if lines:
+                ministry.avg_completion_percentage = round(
+                    sum(line.completion_percentage for line in lines) / len(lines), 2)
+            all_lines.extend(lines)
+        ministries.append(ministry)
+
+    # Units differ between ministries (tons, head, meters), so only percentages are combined
+    return EconomyPlanCompletion(
+        plan_year=plan_year,
+        month=month,
+        plan_lines=len(all_lines),
+        lines_meeting_plan=sum(m.lines_meeting_plan for m in ministries),
+        avg_completion_percentage=round(
+            sum(line.completion_percentage for line in all_lines) / len(all_lines), 2) if all_lines else None,
+        partial=any(m.status != "ok" for m in ministries),
+        ministries=ministries,
+        lines=all_lines if include_lines else None
+    )
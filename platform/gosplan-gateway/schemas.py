@@ -0,0 +1,58 @@
+"""
+Pydantic schemas for the Gosplan gateway
+Pyatiletka Project
+"""
+
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+# ============================================================================
+# DOMAIN SCHEMAS
+# ============================================================================
+
+class DomainStatus(BaseModel):
+    domain: str
+    base_url: str
+    timeout_seconds: float
+    circuit: str
+
+
+class DomainCallStatus(BaseModel):
+    domain: str
+    status: str
+    elapsed_ms: float
+    error: Optional[str] = None
+
+
+# ============================================================================
+# PLAN COMPLETION SCHEMAS
+# ============================================================================
+
+class PlanLine(BaseModel):
+    domain: str
+    plan_year: int
+    month: int
+    facility_name: str
+    product_name: str
+    planned: float
+    actual: float
+    completion_percentage: float
+
+
+class MinistryPlanCompletion(DomainCallStatus):
+    plan_lines: int = 0
+    lines_meeting_plan: int = 0
+    avg_completion_percentage: Optional[float] = None
+
+
+class EconomyPlanCompletion(BaseModel):
+    plan_year: int
+    month: Optional[int] = None
+    plan_lines: int
+    lines_meeting_plan: int
+    avg_completion_percentage: Optional[float] = None
+    # True when at least one ministry did not answer
+    partial: bool
+    ministries: List[MinistryPlanCompletion]
+    lines: Optional[List[PlanLine]] = None
@@ -0,0 +1,96 @@
+"""
+Stub ministry API
+Pyatiletka Project
+
+Stands in for the Agriculture and Consumer Goods domains until they have
+their own databases. Serves the same plan-completion contract as the Heavy
+Industry API with deterministic synthetic data, and can be slowed down or
+made to fail so the gateway's timeouts and circuit breakers can be exercised.
+
+    STUB_DOMAIN=agriculture uvicorn stub_domain:app --port 8000
+"""
+
+import asyncio
+import os
+import random
+from calendar import monthrange
+
+from fastapi import FastAPI, HTTPException, Query
+from typing import Optional
+
+STUB_DOMAIN = os.getenv("STUB_DOMAIN", "agriculture")
+# Added to every request, to simulate a slow ministry
+STUB_LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "0"))
+# Fraction of requests answered with HTTP 503
+STUB_ERROR_RATE = float(os.getenv("STUB_ERROR_RATE", "0"))
+
+# Facilities and (product, daily plan) per ministry, after the ministry pages
+CATALOGS = {
+    "agriculture": {
+        "facilities": [
+            "Krasnodar Kolkhoz No. 1", "Kuban Sovkhoz", "Virgin Lands Sovkhoz",
+            "Ukrainian Grain Kolkhoz", "Stavropol Livestock Kolkhoz"
+        ],
+        "products": [("Winter Wheat", 450.0), ("Barley", 220.0), ("Sugar Beet", 300.0), ("Cattle", 12.0)],
+    },
+    "consumer_goods": {
+        "facilities": [
+            "ZIL Refrigerator Works", "Petrodvorets Watch Factory", "LOMO Camera Works",
+            "Bolshevichka Garment Factory", "Skorokhod Footwear Factory"
+        ],
+        "products": [("Refrigerators", 900.0), ("Wristwatches", 7000.0),
+                     ("Cameras", 2700.0), ("Textiles (m)", 55000.0), ("Footwear (pairs)", 16000.0)],
+    },
+}
+
+app = FastAPI(
+    title=f"Stub {STUB_DOMAIN.replace('_', ' ').title()} API",
+    description="Synthetic ministry domain for the Gosplan gateway - Pyatiletka Project",
+    version="1.0.0"
+)
+
+
+@app.get("/", tags=["Health"])
+async def health_check():
+    """
+    Health check endpoint
+    """
+    return {"status": "healthy", "service": f"Stub {STUB_DOMAIN} API", "project": "Pyatiletka"}
+
+
+@app.get("/analytics/plan-completion", tags=["Analytics"])
+async def get_plan_completion(
+        plan_year: int = Query(..., ge=1986, le=1990, description="Plan year"),
+        month: Optional[int] = Query(None, ge=1, le=12, description="Restrict to one month")
+):
+    """
+    Monthly plan vs actual per facility and product, same shape as Heavy Industry
+    """
+    if STUB_LATENCY_MS:
+        await asyncio.sleep(STUB_LATENCY_MS / 1000)
+    if STUB_ERROR_RATE and random.random() < STUB_ERROR_RATE:
+        raise HTTPException(status_code=503, detail="Stub failure")
+
+    catalog = CATALOGS.get(STUB_DOMAIN)
+    if catalog is None:
+        raise HTTPException(status_code=500, detail=f"No catalog for domain {STUB_DOMAIN}")
+
+    lines = []
+    for m in ([month] if month else range(1, 13)):
+        days = monthrange(plan_year, m)[1]
+        for facility_index, facility_name in enumerate(catalog["facilities"]):
+            for product_name, daily_plan in catalog["products"]:
+                # Same numbers for the same line on every call
+                rng = random.Random(f"{STUB_DOMAIN}:{plan_year}:{m}:{facility_name}:{product_name}")
+                planned = round(daily_plan * days, 2)
+                completion = rng.gauss(92 + facility_index * 2, 8)
+                lines.append({
+                    "plan_year": plan_year,
+                    "month": m,
+                    "facility_name": facility_name,
+                    "product_name": product_name,
+                    "planned": planned,
+                    "actual": round(planned * completion / 100, 2),
+                    "completion_percentage": round(completion, 2)
+                })
+    return lines
@@ -1,11 +1,20 @@
 # Only generating data for heavy industry for now
-
+#
+# Generation is checkpointed per (year, facility, product) unit in the
+# generation_progress table, so an interrupted load can simply be re-run:
+#
+#   python data-generator.py --years 1986 1987 1988 1989 1990 --seed 1986
+#
+# Completed units are skipped, and rows are upserted on their natural key, so
+# a unit that was cut off mid-way is rewritten rather than duplicated.
+
+import argparse
 import random
 import math
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional
 import psycopg2
-from psycopg2.extras import execute_batch
+from psycopg2.extras import execute_values
 
 # Database connection parameters
 DB_CONFIG = {
@@ -24,6 +33,9 @@ PLAN_END = datetime(1990, 12, 31)
 QUALITY_GRADES = ['A', 'B', 'C']
 QUALITY_WEIGHTS = [0.70, 0.25, 0.05]  # 70% A, 25% B, 5% C
 
+# Facility performance profiles (some perform better than others)
+PROFILES = ['high_performer', 'average', 'average', 'average', 'struggling']
+
 
 class ProductionDataGenerator:
     """Generates realistic production data"""
@@ -258,39 +270,110 @@ class ProductionDataGenerator:
 
         return targets
 
-    def insert_production_batch(self, records: List[tuple]):
-        """Batch insert production records"""
+    def insert_production_batch(self, records: List[tuple], commit: bool = True):
+        """Batch upsert production records on (facility, product, date, shift)"""
 
         query = """
             INSERT INTO actual_production (
                 facility_id, product_id, production_date, quantity_produced,
                 quality_grade, shift_number, workers_on_shift, 
                 equipment_downtime_hours, defect_count, notes, reported_by, reported_at
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT DO NOTHING;
+            ) VALUES %s
+            ON CONFLICT (facility_id, product_id, production_date, shift_number) DO UPDATE SET
+                quantity_produced = EXCLUDED.quantity_produced,
+                quality_grade = EXCLUDED.quality_grade,
+                workers_on_shift = EXCLUDED.workers_on_shift,
+                equipment_downtime_hours = EXCLUDED.equipment_downtime_hours,
+                defect_count = EXCLUDED.defect_count,
+                notes = EXCLUDED.notes,
+                reported_by = EXCLUDED.reported_by,
+                reported_at = EXCLUDED.reported_at,
+                updated_at = CURRENT_TIMESTAMP;
         """
 
-        execute_batch(self.cursor, query, records, page_size=1000)
-        self.conn.commit()
-        print(f"Inserted {len(records)} production records")
+        execute_values(self.cursor, query, records, page_size=1000)
+        if commit:
+            self.conn.commit()
+        print(f"Upserted {len(records)} production records")
 
-    def insert_targets_batch(self, records: List[tuple]):
-        """Batch insert target records"""
+    def insert_targets_batch(self, records: List[tuple], commit: bool = True):
+        """Batch upsert target records"""
 
         query = """
             INSERT INTO production_targets (
                 facility_id, product_id, plan_year, quarter, month,
                 target_quantity, target_set_date, notes
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (facility_id, product_id, plan_year, month) DO NOTHING;
+            ) VALUES %s
+            ON CONFLICT (facility_id, product_id, plan_year, month) DO UPDATE SET
+                quarter = EXCLUDED.quarter,
+                target_quantity = EXCLUDED.target_quantity,
+                target_set_date = EXCLUDED.target_set_date,
+                notes = EXCLUDED.notes,
+                updated_at = CURRENT_TIMESTAMP;
         """
 
-        execute_batch(self.cursor, query, records, page_size=100)
+        execute_values(self.cursor, query, records, page_size=1000)
+        if commit:
+            self.conn.commit()
+        print(f"Upserted {len(records)} target records")
+
+    # ========================================================================
+    # CHECKPOINTING
+    # ========================================================================
+
+    def ensure_progress_table(self):
+        """Create the checkpoint table used by resumable generation"""
+
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS generation_progress (
+                plan_year INTEGER NOT NULL,
+                facility_id INTEGER NOT NULL REFERENCES facilities(facility_id),
+                product_id INTEGER NOT NULL REFERENCES products(product_id),
+                seed BIGINT,
+                rows_written INTEGER NOT NULL,
+                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (plan_year, facility_id, product_id)
+            );
+        """)
         self.conn.commit()
-        print(f"Inserted {len(records)} target records")
 
-    def generate_all_data(self, years: List[int] = [1986, 1987, 1988, 1989, 1990]):
-        """Generate complete dataset for specified years"""
+    def completed_units(self, years: List[int]) -> set:
+        """(year, facility_id, product_id) units already written in full"""
+
+        self.cursor.execute(
+            "SELECT plan_year, facility_id, product_id FROM generation_progress WHERE plan_year = ANY(%s)",
+            (list(years),)
+        )
+        return set(self.cursor.fetchall())
+
+    def reset_progress(self, years: List[int]):
+        """Forget checkpoints so the given years are generated again"""
+
+        self.cursor.execute("DELETE FROM generation_progress WHERE plan_year = ANY(%s)", (list(years),))
+        self.conn.commit()
+
+    def mark_completed(self, year: int, facility_product: Dict, seed: Optional[int], rows_written: int):
+        """Record a finished unit; called inside the unit's own transaction"""
+
+        self.cursor.execute("""
+            INSERT INTO generation_progress (plan_year, facility_id, product_id, seed, rows_written)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (plan_year, facility_id, product_id) DO UPDATE SET
+                seed = EXCLUDED.seed,
+                rows_written = EXCLUDED.rows_written,
+                completed_at = CURRENT_TIMESTAMP;
+        """, (year, facility_product['facility_id'], facility_product['product_id'], seed, rows_written))
+
+    def generate_all_data(self, years: List[int] = [1986, 1987, 1988, 1989, 1990],
+                          seed: Optional[int] = None, resume: bool = True):
+        """
+        Generate complete dataset for specified years
+
+        Each (year, facility, product) unit is written and checkpointed in one
+        transaction. With resume, units already in generation_progress are
+        skipped. With a seed, every unit draws from its own seeded generator,
+        so a re-generated unit reproduces exactly the rows it had before.
+        """
 
         print("=" * 60)
         print("GOSPLAN HEAVY INDUSTRY DATA GENERATION")
@@ -300,15 +383,19 @@ class ProductionDataGenerator:
         facility_products = self.get_facilities_and_products()
         print(f"\nFound {len(facility_products)} facility-product combinations")
 
-        # Assign profiles to facilities (some perform better than others)
-        profiles = ['high_performer', 'average', 'average', 'average', 'struggling']
+        self.ensure_progress_table()
+        if not resume:
+            self.reset_progress(years)
+        completed = self.completed_units(years)
+        if completed:
+            print(f"Resuming: {len(completed)} units already generated")
 
         for year in years:
             print(f"\n{'=' * 60}")
             print(f"Generating data for year {year}")
             print(f"{'=' * 60}")
 
-            # Generate targets for this year
+            # Targets are cheap and upserted, so they are always rewritten
             print(f"\nGenerating targets for {year}...")
             all_targets = []
             for fp in facility_products:
@@ -325,7 +412,16 @@ class ProductionDataGenerator:
             for idx, fp in enumerate(facility_products):
                 facility_name = fp['facility_name']
                 product_name = fp['product_name']
-                profile = random.choice(profiles)
+                unit = (year, fp['facility_id'], fp['product_id'])
+
+                if unit in completed:
+                    print(f"  [{idx + 1}/{len(facility_products)}] {facility_name} - {product_name} (done)")
+                    continue
+
+                # The generator draws from the global random module
+                if seed is not None:
+                    random.seed(f"{seed}:{year}:{fp['facility_id']}:{fp['product_id']}")
+                profile = random.choice(PROFILES)
 
                 print(f"  [{idx + 1}/{len(facility_products)}] {facility_name} - {product_name} ({profile})")
 
@@ -333,7 +429,13 @@ class ProductionDataGenerator:
                     fp, start_date, end_date, profile
                 )
 
-                self.insert_production_batch(records)
+                try:
+                    self.insert_production_batch(records, commit=False)
+                    self.mark_completed(year, fp, seed, len(records))
+                    self.conn.commit()
+                except Exception:
+                    self.conn.rollback()
+                    raise
 
         print("\n" + "=" * 60)
         print("DATA GENERATION COMPLETE!")
@@ -370,22 +472,35 @@ class ProductionDataGenerator:
             print(f"  {result}")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate heavy industry production data")
+    parser.add_argument(
+        "--years", type=int, nargs="+", default=[1986],
+        help="Plan years to generate (default: 1986; the full plan is 1986 1987 1988 1989 1990)"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None,
+        help="Seed each unit's random generator so re-runs reproduce identical rows"
+    )
+    parser.add_argument(
+        "--no-resume", dest="resume", action="store_false",
+        help="Ignore checkpoints and regenerate every unit of the given years"
+    )
+    return parser.parse_args()
+
+
 def main():
     """Main execution function"""
 
+    args = parse_args()
+
     print("Connecting to database...")
     try:
         conn = psycopg2.connect(**DB_CONFIG)
         print("✓ Connected successfully\n")
 
         generator = ProductionDataGenerator(conn)
-
-        # Generate data for all 5 years
-        # For testing, you might want to start with just 1986
-        generator.generate_all_data(years=[1986])  # Start with just 1986
-
-        # To generate all years, uncomment:
-        # generator.generate_all_data(years=[1986, 1987, 1988, 1989, 1990])
+        generator.generate_all_data(years=args.years, seed=args.seed, resume=args.resume)
 
         conn.close()
         print("\n✓ Database connection closed")
@@ -396,4 +511,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()